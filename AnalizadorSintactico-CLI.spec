@@ -10,7 +10,8 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    # The CLI never loads the GUI; keep Tk and unused test/doc tooling out of the bundle
+    excludes=['tkinter', '_tkinter', 'semantic_analyzer_gui', 'unittest', 'doctest', 'pydoc'],
     noarchive=False,
     optimize=0,
 )
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Caché de Resultados del Analizador Sintáctico
+Autor: Edwin Espinal
+Descripción: Guarda en disco los resultados del análisis indexados por el hash SHA-256
+del código fuente, para no volver a analizar archivos que no han cambiado.
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+
+
+DEFAULT_MAX_BYTES = 64 * 2**20
+ENTRY_SUFFIX = ".json"
+
+
+class AnalysisCache:
+    """Content-addressed on-disk cache bounded in size with LRU eviction.
+    
+    Each entry is a JSON file named after the SHA-256 of the analyzer version
+    and the source text. An entry's modification time is its last use, so
+    eviction removes the least recently used entries first.
+    """
+    
+    def __init__(self, directory: str, version: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.version = version
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        os.makedirs(directory, exist_ok=True)
+        
+        # key -> [size, last use]
+        self.index: Dict[str, list] = {}
+        self.total_bytes = 0
+        for entry in os.scandir(directory):
+            if entry.name.endswith(ENTRY_SUFFIX) and entry.is_file():
+                stat = entry.stat()
+                self.index[entry.name[:-len(ENTRY_SUFFIX)]] = [stat.st_size, stat.st_mtime]
+                self.total_bytes += stat.st_size
+    
+    def key_for(self, source) -> str:
+        """Cache key for a source given as str or bytes-like"""
+        digest = hashlib.sha256(self.version.encode('utf-8') + b'\0')
+        digest.update(source.encode('utf-8') if isinstance(source, str) else source)
+        return digest.hexdigest()
+    
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for key, or None on a miss"""
+        if key in self.index:
+            path = self.path_for(key)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+                os.utime(path)
+            except (OSError, ValueError):
+                self.forget(key)
+            else:
+                self.index[key][1] = os.stat(path).st_mtime
+                self.hits += 1
+                return entry
+        
+        self.misses += 1
+        return None
+    
+    def put(self, key: str, entry: Dict[str, Any]):
+        """Store entry under key, evicting least recently used entries if needed"""
+        data = json.dumps(entry, separators=(',', ':')).encode('utf-8')
+        if len(data) > self.max_bytes:
+            return
+        
+        path = self.path_for(key)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, 'wb') as f:
+                f.write(data)
+            os.replace(temporary, path)
+        except OSError:
+            return
+        
+        if key in self.index:
+            self.total_bytes -= self.index[key][0]
+        self.index[key] = [len(data), os.stat(path).st_mtime]
+        self.total_bytes += len(data)
+        self.evict()
+    
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        if self.total_bytes <= self.max_bytes:
+            return
+        for key in sorted(self.index, key=lambda k: self.index[k][1]):
+            if self.total_bytes <= self.max_bytes:
+                break
+            self.forget(key)
+            self.evictions += 1
+    
+    def forget(self, key: str):
+        size, _ = self.index.pop(key, (0, 0))
+        self.total_bytes -= size
+        try:
+            os.remove(self.path_for(key))
+        except OSError:
+            pass
+    
+    def stats(self) -> str:
+        return (f"Caché: {self.hits} acierto(s), {self.misses} fallo(s), "
+                f"{self.evictions} desalojo(s), {len(self.index)} entrada(s)")
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Perfil del Análisis - Edwin Espinal
+Autor: Edwin Espinal
+Descripción: Mide el tiempo de reloj y de CPU de cada fase del análisis y reúne contadores
+de las partes más usadas del analizador, para las opciones --profile de la línea de comandos.
+"""
+
+import json
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from semantic_analyzer import TOKEN_TYPES
+
+
+PHASE_LABELS = {
+    'read': 'lectura',
+    'tokenize': 'tokenización',
+    'analyze': 'análisis',
+    'report': 'reporte',
+}
+
+
+class AnalysisProfile:
+    """Per-phase wall time, CPU time and tracemalloc peak, plus analyzer counters.
+    
+    Phases are timed with start() and stop(). With trace_memory, memory is
+    traced from the first start() until finish() and each phase records its
+    peak; tracing slows lexing and analysis several times over, so it is off
+    unless asked for. The counters are read from the Counting* classes of
+    semantic_analyzer by collect(). Profiles are plain data, so they can be
+    sent to and from worker processes and added up with merge().
+    """
+    
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        # phase -> [wall seconds, CPU seconds, peak traced bytes]
+        self.phases: Dict[str, list] = {}
+        self.current: Optional[str] = None
+        self.started_wall = 0.0
+        self.started_cpu = 0.0
+        self.token_types: Counter = Counter()
+        self.statements: Counter = Counter()
+        self.lookups = 0
+        self.scopes_walked = 0
+        self.max_scope_depth = 0
+        self.files = 0
+    
+    def start(self, phase: str):
+        if self.current is not None:
+            self.stop()
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        self.current = phase
+        self.started_cpu = time.process_time()
+        self.started_wall = time.perf_counter()
+    
+    def stop(self):
+        wall = time.perf_counter() - self.started_wall
+        cpu = time.process_time() - self.started_cpu
+        peak = tracemalloc.get_traced_memory()[1] if self.trace_memory else 0
+        totals = self.phases.setdefault(self.current, [0.0, 0.0, 0])
+        totals[0] += wall
+        totals[1] += cpu
+        totals[2] = max(totals[2], peak)
+        self.current = None
+    
+    def finish(self):
+        """Stop the running phase and memory tracing"""
+        if self.current is not None:
+            self.stop()
+        if self.trace_memory:
+            tracemalloc.stop()
+        self.files = max(self.files, 1)
+    
+    def count_tokens(self, tokens):
+        """Count a token list or TokenBuffer by type"""
+        types = getattr(tokens, 'types', None)
+        if types is not None:
+            self.token_types.update({TOKEN_TYPES[type_id].name: count for type_id, count in Counter(types).items()})
+        else:
+            self.token_types.update(token.type.name for token in tokens)
+    
+    def count_stream(self, tokens):
+        """Yield tokens from an iterator, counting them by type"""
+        counts = self.token_types
+        for token in tokens:
+            counts[token.type.name] += 1
+            yield token
+    
+    def collect(self, analyzer):
+        """Read the counters of a CountingSemanticAnalyzer and its CountingSymbolTable"""
+        self.statements.update(analyzer.statement_counts)
+        symbol_table = analyzer.symbol_table
+        self.lookups += symbol_table.lookups
+        self.scopes_walked += symbol_table.scopes_walked
+        self.max_scope_depth = max(self.max_scope_depth, symbol_table.max_depth)
+    
+    def merge(self, other: 'AnalysisProfile'):
+        """Add another profile, e.g. one file of a batch, to this one"""
+        for phase, (wall, cpu, peak) in other.phases.items():
+            totals = self.phases.setdefault(phase, [0.0, 0.0, 0])
+            totals[0] += wall
+            totals[1] += cpu
+            totals[2] = max(totals[2], peak)
+        self.token_types.update(other.token_types)
+        self.statements.update(other.statements)
+        self.lookups += other.lookups
+        self.scopes_walked += other.scopes_walked
+        self.max_scope_depth = max(self.max_scope_depth, other.max_scope_depth)
+        self.files += other.files
+        self.trace_memory = self.trace_memory or other.trace_memory
+    
+    def average_lookup_depth(self) -> float:
+        """Scopes a lookup walks on average, the one where the name is found included"""
+        return self.scopes_walked / self.lookups if self.lookups else 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'files': self.files,
+            'phases': {phase: {'wall': wall, 'cpu': cpu, 'peak_bytes': peak if self.trace_memory else None}
+                       for phase, (wall, cpu, peak) in self.phases.items()},
+            'peak_bytes': (max((peak for _, _, peak in self.phases.values()), default=0)
+                           if self.trace_memory else None),
+            'token_types': dict(self.token_types.most_common()),
+            'statements': dict(self.statements.most_common()),
+            'lookups': self.lookups,
+            'average_lookup_depth': self.average_lookup_depth(),
+            'max_scope_depth': self.max_scope_depth,
+        }
+    
+    def dump(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+    
+    def format(self) -> str:
+        """Human-readable report, in the language of the CLI"""
+        data = self.to_dict()
+        lines = ["Perfil del análisis:", "=" * 50]
+        if self.files > 1:
+            lines.append(f"Archivos: {self.files} (tiempos sumados entre archivos)")
+        
+        def memory(peak):
+            return f"{peak / 2**20:>10.2f} MiB" if self.trace_memory else f"{'-':>14}"
+        
+        lines.append(f"{'Fase':<14} {'Reloj':>10} {'CPU':>10} {'Memoria pico':>14}")
+        for phase, totals in data['phases'].items():
+            lines.append(f"{PHASE_LABELS.get(phase, phase):<14} {totals['wall']:>9.4f}s {totals['cpu']:>9.4f}s "
+                         f"{memory(totals['peak_bytes'])}")
+        wall = sum(totals['wall'] for totals in data['phases'].values())
+        cpu = sum(totals['cpu'] for totals in data['phases'].values())
+        lines.append(f"{'total':<14} {wall:>9.4f}s {cpu:>9.4f}s {memory(data['peak_bytes'])}")
+        if self.trace_memory:
+            lines.append("(los tiempos incluyen el costo de tracemalloc)")
+        
+        if self.token_types:
+            lines.append("")
+            lines.append(f"Tokens por tipo ({sum(self.token_types.values()):,}):")
+            lines.extend(f"  {name:<16} {count:>10,}" for name, count in data['token_types'].items())
+        if self.statements:
+            lines.append("")
+            lines.append(f"Sentencias por tipo ({sum(self.statements.values()):,}):")
+            lines.extend(f"  {kind:<16} {count:>10,}" for kind, count in data['statements'].items())
+        lines.append("")
+        lines.append(f"Búsquedas de símbolos: {self.lookups:,} "
+                     f"(ámbitos recorridos en promedio: {self.average_lookup_depth():.2f})")
+        lines.append(f"Profundidad máxima de ámbitos: {self.max_scope_depth}")
+        return "\n".join(lines)
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Servidor de Análisis - Edwin Espinal
+Autor: Edwin Espinal
+Descripción: Proceso de larga duración que atiende peticiones JSON-RPC 2.0 por stdio o por
+un socket Unix, manteniendo el análisis de cada documento entre peticiones.
+"""
+
+import json
+import os
+import stat
+import sys
+from typing import Any, BinaryIO, Callable, Dict, Optional
+from urllib.parse import unquote, urlparse
+
+from incremental_analyzer import IncrementalAnalyzer
+from semantic_analyzer import TokenType, symbol_to_dict
+
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+
+class RequestError(Exception):
+    """An error to report in a JSON-RPC response"""
+    
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def path_from_uri(uri: str) -> str:
+    """The file path of a file:// URI, or uri itself when it is a plain path"""
+    if uri.startswith('file://'):
+        return unquote(urlparse(uri).path)
+    return uri
+
+
+def document_uri(params: dict) -> str:
+    uri = params.get('uri')
+    if not isinstance(uri, str):
+        raise RequestError(INVALID_PARAMS, "'uri' must be a string")
+    return uri
+
+
+def read_document(uri: str) -> str:
+    try:
+        with open(path_from_uri(uri), 'r') as f:
+            return f.read()
+    except OSError as e:
+        raise RequestError(INVALID_PARAMS, f"Cannot read '{uri}': {e}")
+
+
+def token_end(token, text: str) -> int:
+    """Offset just past a token in text, closing quote included when the string has one"""
+    end = token.offset + len(token.value)
+    if token.type == TokenType.STRING:
+        end += 1  # Opening quote
+        if end < len(text) and text[end] == text[token.offset]:
+            end += 1
+    return end
+
+
+class AnalysisServer:
+    """Answers JSON-RPC 2.0 requests, one per line, keeping an IncrementalAnalyzer per document.
+    
+    Documents are identified by a uri (a path or a file:// URI). analyze
+    takes the document text, or reads the file when no text is given;
+    analyzing a new version of a document only re-analyzes what changed.
+    symbols and hover answer from the last analysis of a document.
+    """
+    
+    def __init__(self):
+        self.documents: Dict[str, IncrementalAnalyzer] = {}
+        self.running = True
+        self.methods: Dict[str, Callable[[dict], Any]] = {
+            'analyze': self.analyze,
+            'symbols': self.symbols,
+            'hover': self.hover,
+            'close': self.close,
+            'shutdown': self.shutdown,
+        }
+    
+    def document(self, params: dict, text: Optional[str] = None) -> IncrementalAnalyzer:
+        """The analyzer of the document named in params, brought up to date with text if given.
+        
+        A document that is not open yet is read from its file.
+        """
+        uri = document_uri(params)
+        analyzer = self.documents.get(uri)
+        if text is None:
+            if analyzer is not None:
+                return analyzer
+            text = read_document(uri)
+        
+        if analyzer is None:
+            analyzer = self.documents[uri] = IncrementalAnalyzer()
+        try:
+            analyzer.update(text)
+        except Exception:
+            # A half-updated analyzer cannot be reused
+            del self.documents[uri]
+            raise
+        return analyzer
+    
+    def analyze(self, params: dict) -> dict:
+        """Errors of the document's text, or of its file (read again) when no text is given"""
+        text = params.get('text')
+        if text is None:
+            text = read_document(document_uri(params))
+        elif not isinstance(text, str):
+            raise RequestError(INVALID_PARAMS, "'text' must be a string")
+        analyzer = self.document(params, text)
+        
+        return {
+            'token_count': analyzer.token_count,
+            'errors': [{'line': error.line, 'column': error.column, 'message': error.message}
+                       for error in analyzer.errors],
+            'reanalyzed_statements': analyzer.reanalyzed_statements,
+            'reused_statements': analyzer.reused_statements,
+        }
+    
+    def symbols(self, params: dict) -> list:
+        """Global symbols of the document, as in the symbol table report"""
+        analyzer = self.document(params)
+        return [symbol_to_dict(symbol) for symbol in analyzer.symbol_table.get_current_scope_symbols().values()]
+    
+    def hover(self, params: dict) -> Optional[dict]:
+        """The token at a 1-based line and column, with the global symbol it names if any"""
+        line, column = params.get('line'), params.get('column')
+        if not isinstance(line, int) or not isinstance(column, int):
+            raise RequestError(INVALID_PARAMS, "'line' and 'column' must be integers")
+        analyzer = self.document(params)
+        
+        starts = analyzer.lines.starts
+        if not 1 <= line <= len(starts) or column < 1:
+            return None
+        offset = starts[line - 1] + column - 1
+        
+        for token in analyzer.chunks[analyzer.chunk_at(offset)].current_tokens():
+            if token.offset > offset or token.type == TokenType.EOF:
+                break
+            if offset < token_end(token, analyzer.text):
+                symbol = None
+                if token.type == TokenType.IDENTIFIER:
+                    symbol = analyzer.symbol_table.scopes[0].get(token.value)
+                return {
+                    'type': token.type.name,
+                    'value': token.value,
+                    'line': token.line,
+                    'column': token.column,
+                    'symbol': None if symbol is None else symbol_to_dict(symbol),
+                }
+        return None
+    
+    def close(self, params: dict) -> bool:
+        """Forget a document; returns whether it was open"""
+        return self.documents.pop(params.get('uri'), None) is not None
+    
+    def shutdown(self, params: dict) -> None:
+        self.running = False
+    
+    def handle_message(self, message: Any) -> Optional[dict]:
+        """Answer one request object; notifications (requests without an id) get no response"""
+        if not isinstance(message, dict) or not isinstance(message.get('method'), str):
+            return {'jsonrpc': '2.0', 'id': None,
+                    'error': {'code': INVALID_REQUEST, 'message': "Invalid request"}}
+        
+        request_id = message.get('id')
+        try:
+            method = self.methods.get(message['method'])
+            if method is None:
+                raise RequestError(METHOD_NOT_FOUND, f"Unknown method '{message['method']}'")
+            params = message.get('params', {})
+            if not isinstance(params, dict):
+                raise RequestError(INVALID_PARAMS, "params must be an object")
+            response = {'jsonrpc': '2.0', 'id': request_id, 'result': method(params)}
+        except RequestError as e:
+            response = {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': e.code, 'message': e.message}}
+        except Exception as e:
+            response = {'jsonrpc': '2.0', 'id': request_id,
+                        'error': {'code': INTERNAL_ERROR, 'message': f"{type(e).__name__}: {e}"}}
+        
+        return response if 'id' in message else None
+    
+    def handle_line(self, line: bytes) -> Optional[bytes]:
+        """Answer one line holding a request or a batch of requests"""
+        try:
+            message = json.loads(line)
+        except ValueError as e:
+            response = {'jsonrpc': '2.0', 'id': None, 'error': {'code': PARSE_ERROR, 'message': str(e)}}
+        else:
+            if isinstance(message, list) and message:
+                response = [r for r in map(self.handle_message, message) if r is not None] or None
+            else:
+                response = self.handle_message(message)
+        
+        if response is None:
+            return None
+        return json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n'
+    
+    def serve(self, reader: BinaryIO, writer: BinaryIO):
+        """Answer requests read from reader until it is exhausted or shutdown is requested"""
+        for line in reader:
+            if not line.strip():
+                continue
+            response = self.handle_line(line)
+            if response is not None:
+                writer.write(response)
+                writer.flush()
+            if not self.running:
+                break
+
+
+def serve_unix_socket(server: AnalysisServer, path: str):
+    """Serve connections on a Unix socket at path, one at a time, until shutdown is requested"""
+    import socket
+    
+    if os.path.exists(path):
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            raise OSError(f"'{path}' exists and is not a socket")
+        os.remove(path)
+    
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        listener.bind(path)
+        listener.listen()
+        while server.running:
+            connection, _ = listener.accept()
+            with connection, connection.makefile('rb') as reader, connection.makefile('wb') as writer:
+                server.serve(reader, writer)
+    finally:
+        listener.close()
+        os.remove(path)
+
+
+def main(argv=None):
+    """Main function to run the analysis server"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(prog='run_analyzer.py --serve',
+                                     description='Servidor JSON-RPC del analizador (una petición por línea)')
+    parser.add_argument('--socket', metavar='PATH',
+                        help='escuchar en un socket Unix en PATH en lugar de stdin/stdout')
+    args = parser.parse_args(argv)
+    
+    server = AnalysisServer()
+    if args.socket:
+        import socket
+        if not hasattr(socket, 'AF_UNIX'):
+            parser.error("los sockets Unix no están disponibles en esta plataforma")
+        try:
+            serve_unix_socket(server, args.socket)
+        except KeyboardInterrupt:
+            pass
+    else:
+        server.serve(sys.stdin.buffer, sys.stdout.buffer)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,735 @@
+#!/usr/bin/env python3
+"""
+Pruebas del Analizador Sintáctico - Edwin Espinal
+Autor: Edwin Espinal
+Descripción: Pruebas sobre los archivos de ejemplo y comprobaciones de paridad entre los
+distintos modos del analizador, ejecutadas con `python run_analyzer.py -t`.
+"""
+
+import os
+import sys
+
+
+def run_tests():
+    """Run tests on sample files"""
+    print("Running tests on sample files...")
+    print()
+    
+    test_files = [
+        ("test_with_errors.txt", "File with semantic errors"),
+        ("test_no_errors.txt", "File without errors")
+    ]
+    
+    for filename, description in test_files:
+        if os.path.exists(filename):
+            print(f"Testing: {description}")
+            print(f"File: {filename}")
+            print("-" * 50)
+            
+            try:
+                from semantic_analyzer import Lexer, SemanticAnalyzer
+                
+                with open(filename, 'r') as f:
+                    source_code = f.read()
+                
+                # Tokenize
+                lexer = Lexer(source_code)
+                tokens = lexer.tokenize()
+                
+                # Analyze
+                analyzer = SemanticAnalyzer(tokens)
+                errors = analyzer.analyze()
+                
+                print(f"Tokens processed: {len(tokens)}")
+                
+                if errors:
+                    print(f"Errors found: {len(errors)}")
+                    for i, error in enumerate(errors[:5], 1):  # Show first 5 errors
+                        print(f"  {i}. {error}")
+                    if len(errors) > 5:
+                        print(f"  ... and {len(errors) - 5} more errors")
+                else:
+                    print("✓ No semantic errors found!")
+                
+                print()
+            
+            except Exception as e:
+                print(f"Error testing {filename}: {e}")
+                print()
+        else:
+            print(f"Warning: Test file '{filename}' not found")
+            print()
+    
+    print("Testing: Lexer engine parity")
+    print("-" * 50)
+    sources = list(LEXER_PARITY_SNIPPETS)
+    for filename, _ in test_files:
+        if os.path.exists(filename):
+            with open(filename, 'r') as f:
+                sources.append(f.read())
+    
+    mismatch = check_lexer_parity(sources)
+    if mismatch:
+        print(f"✗ Regex engine differs from character engine: {mismatch}")
+        sys.exit(1)
+    else:
+        print(f"✓ Regex engine matches character engine on {len(sources)} inputs")
+    print()
+    
+    print("Testing: Token kinds")
+    print("-" * 50)
+    problem = check_token_kinds()
+    if problem:
+        print(f"✗ {problem}")
+        sys.exit(1)
+    else:
+        print("✓ Token kinds are their TokenBuffer ids and every lexeme lexes to its kind")
+    print()
+    
+    print("Testing: Streaming analyzer parity")
+    print("-" * 50)
+    mismatch = check_streaming_parity(sources)
+    if mismatch:
+        print(f"✗ Streaming analyzer differs from list-based analyzer: {mismatch}")
+        sys.exit(1)
+    else:
+        print(f"✓ Streaming analyzer matches list-based analyzer on {len(sources)} inputs")
+    print()
+    
+    print("Testing: TokenBuffer parity")
+    print("-" * 50)
+    mismatch = check_token_buffer_parity(sources)
+    if mismatch:
+        print(f"✗ TokenBuffer differs from token list: {mismatch}")
+        sys.exit(1)
+    else:
+        print(f"✓ TokenBuffer matches token list on {len(sources)} inputs")
+    print()
+    
+    print("Testing: Memory-mapped input parity")
+    print("-" * 50)
+    mismatch = check_mmap_parity([filename for filename, _ in test_files if os.path.exists(filename)])
+    if mismatch:
+        print(f"✗ Memory-mapped scan differs from text scan: {mismatch}")
+        sys.exit(1)
+    else:
+        print("✓ Memory-mapped scan matches text scan on the sample files")
+    print()
+    
+    print("Testing: Scoped symbol table parity")
+    print("-" * 50)
+    mismatch = check_symbol_table_parity(sources)
+    if mismatch:
+        print(f"✗ ScopedSymbolTable differs from SymbolTable: {mismatch}")
+        sys.exit(1)
+    else:
+        print(f"✓ ScopedSymbolTable matches SymbolTable on {len(sources)} inputs")
+    print()
+    
+    print("Testing: Incremental analysis parity")
+    print("-" * 50)
+    mismatch = check_incremental_parity(sources)
+    if mismatch:
+        print(f"✗ Incremental analysis differs from full analysis: {mismatch}")
+        sys.exit(1)
+    else:
+        print(f"✓ Incremental analysis matches full analysis after edits to {len(sources)} inputs")
+    print()
+    
+    print("Testing: Token cache round trip")
+    print("-" * 50)
+    mismatch = check_token_cache_parity(sources)
+    if mismatch:
+        print(f"✗ Cached tokens differ from lexed tokens: {mismatch}")
+        sys.exit(1)
+    else:
+        print(f"✓ Cached tokens and symbols match lexing on {len(sources)} inputs")
+    print()
+    
+    print("Testing: Syntax tree analysis parity")
+    print("-" * 50)
+    # Malformed snippets are left out: the parser reports syntax errors there
+    tree_sources = list(TREE_PARITY_SNIPPETS) + sources[len(LEXER_PARITY_SNIPPETS):]
+    mismatch = check_tree_parity(tree_sources)
+    if mismatch:
+        print(f"✗ Tree analysis differs from token analysis: {mismatch}")
+        sys.exit(1)
+    else:
+        print(f"✓ Tree analysis matches token analysis on {len(tree_sources)} well-formed inputs")
+    print()
+    
+    print("Testing: Expected diagnostics")
+    print("-" * 50)
+    mismatch = check_expected_diagnostics()
+    if mismatch:
+        print(f"✗ {mismatch}")
+        sys.exit(1)
+    else:
+        print(f"✓ Both analyzers give the expected types and errors on "
+              f"{len(EXPRESSION_TYPES) + len(EXPECTED_DIAGNOSTICS)} inputs")
+    print()
+    
+    print("Testing: Parallel function analysis parity")
+    print("-" * 50)
+    parallel_sources = sources + list(TREE_PARITY_SNIPPETS) + list(PARALLEL_PARITY_SNIPPETS)
+    mismatch = check_parallel_parity(parallel_sources)
+    if mismatch:
+        print(f"✗ Parallel analysis differs from sequential analysis: {mismatch}")
+        sys.exit(1)
+    else:
+        print(f"✓ Parallel analysis matches sequential analysis on {len(parallel_sources)} inputs")
+    print()
+    
+    print("Testing: Streamed diagnostic output")
+    print("-" * 50)
+    mismatch = check_diagnostic_output(sources)
+    if mismatch:
+        print(f"✗ Streamed diagnostics differ from collected errors: {mismatch}")
+        sys.exit(1)
+    else:
+        print(f"✓ JSON Lines and SARIF output match collected errors on {len(sources)} inputs")
+    print()
+    
+    print("Testing: CLI diagnostic stream")
+    print("-" * 50)
+    mismatch = check_cli_diagnostic_stream("test_with_errors.txt")
+    if mismatch:
+        print(f"✗ run_analyzer.py -c mixes other output into the diagnostics: {mismatch}")
+        sys.exit(1)
+    else:
+        print("✓ run_analyzer.py -c --format jsonl and sarif write only diagnostics to stdout")
+    print()
+    
+    print("Testing: Analysis server")
+    print("-" * 50)
+    server_sources = sources + [SELF_ASSIGNING_FUNCTION]
+    mismatch = check_server_parity(server_sources)
+    if mismatch:
+        print(f"✗ Analysis server differs from direct analysis: {mismatch}")
+        sys.exit(1)
+    else:
+        print(f"✓ Server analyze and hover requests match direct analysis on {len(server_sources)} inputs")
+    print()
+    
+    print("Testing: Profiling analyzer parity")
+    print("-" * 50)
+    mismatch = check_profile_parity(sources)
+    if mismatch:
+        print(f"✗ Profiled analysis differs from plain analysis: {mismatch}")
+        sys.exit(1)
+    else:
+        print(f"✓ Counting analyzer and symbol table match plain analysis on {len(sources)} inputs")
+    print()
+    
+    print("Testing: CLI imports")
+    print("-" * 50)
+    unexpected = check_cli_imports()
+    if unexpected:
+        print(f"✗ The CLI path imports GUI modules: {', '.join(unexpected)}")
+        sys.exit(1)
+    else:
+        print("✓ run_analyzer.py -c does not import tkinter or the GUI")
+    print()
+
+
+# Inputs that exercise the edges of the lexer beyond the sample files
+LEXER_PARITY_SNIPPETS = [
+    'var string s = "multi\nline" ;',
+    "var string t = 'unterminated\nstring",
+    "1.2.3 1..2 x.y 7.",
+    "a&b|c && || == = != ! <= < >= > @ # $",
+    "café _x9 x² 12² ٣4 \u00a0 \t\r\n",
+    'x = 1; // "quoted" /* not a block\ny = 2 / 3; /* multi\nline */ z = 4 /* unterminated\n"',
+    "a//b\n/**/c/*/d*/ e / * f // é\n/",
+    "",
+]
+
+
+def check_lexer_parity(sources):
+    """Check that the regex lexer engine reproduces the character engine"""
+    from semantic_analyzer import Lexer
+    
+    for source in sources:
+        expected = Lexer(source).tokenize()
+        actual = Lexer(source, engine='regex').tokenize()
+        if actual != expected:
+            for index, (want, got) in enumerate(zip(expected, actual)):
+                if want != got:
+                    return f"token {index}: expected {want}, got {got}"
+            return f"expected {len(expected)} tokens, got {len(actual)}"
+    return None
+
+
+def check_token_kinds():
+    """Check the numbering of TokenType and the lexeme tables both lexer engines use"""
+    from semantic_analyzer import KEYWORDS, OPERATOR_TOKENS, TOKEN_LEXEMES, TOKEN_TYPES, Lexer
+    
+    for index, token_type in enumerate(TOKEN_TYPES):
+        if token_type != index:
+            return f"{token_type.name} is {int(token_type)} but has TokenBuffer id {index}"
+    
+    for lexeme, token_type in {**KEYWORDS, **OPERATOR_TOKENS}.items():
+        if TOKEN_LEXEMES.get(token_type) != lexeme:
+            return f"TOKEN_LEXEMES spells {token_type.name} as {TOKEN_LEXEMES.get(token_type)!r}, not {lexeme!r}"
+        for engine in Lexer.ENGINES:
+            tokens = Lexer(f" {lexeme} ", engine=engine).tokenize()
+            actual = [(token.type, token.value) for token in tokens[:-1]]
+            if actual != [(token_type, lexeme)]:
+                return f"{engine} engine lexes {lexeme!r} as {[(t.name, v) for t, v in actual]}"
+    return None
+
+
+def check_streaming_parity(sources):
+    """Check that the streaming analyzer reports the same errors as the list-based one"""
+    from semantic_analyzer import Lexer, SemanticAnalyzer, StreamingSemanticAnalyzer
+    
+    for source in sources:
+        expected = [str(e) for e in SemanticAnalyzer(Lexer(source).tokenize()).analyze()]
+        actual = [str(e) for e in StreamingSemanticAnalyzer(Lexer(source).iter_tokens()).analyze()]
+        if actual != expected:
+            return f"expected {expected}, got {actual}"
+    return None
+
+
+def check_token_buffer_parity(sources):
+    """Check that a TokenBuffer indexes to the same tokens and errors as a token list"""
+    from semantic_analyzer import Lexer, SemanticAnalyzer
+    
+    for source in sources:
+        tokens = Lexer(source).tokenize()
+        buffer = Lexer(source).tokenize_buffer()
+        if len(buffer) != len(tokens):
+            return f"expected {len(tokens)} tokens, got {len(buffer)}"
+        for index, token in enumerate(tokens):
+            if buffer[index] != token:
+                return f"token {index}: expected {token}, got {buffer[index]}"
+        expected = [str(e) for e in SemanticAnalyzer(tokens).analyze()]
+        actual = [str(e) for e in SemanticAnalyzer(buffer).analyze()]
+        if actual != expected:
+            return f"expected {expected}, got {actual}"
+    return None
+
+
+def check_symbol_table_parity(sources):
+    """Check that analyzing with ScopedSymbolTable gives the same errors and symbols as SymbolTable"""
+    from semantic_analyzer import Lexer, ScopedSymbolTable, SemanticAnalyzer
+    
+    for source in sources:
+        tokens = Lexer(source).tokenize()
+        expected_analyzer = SemanticAnalyzer(tokens)
+        expected = ([str(e) for e in expected_analyzer.analyze()], expected_analyzer.get_symbol_table_report())
+        actual_analyzer = SemanticAnalyzer(tokens, ScopedSymbolTable())
+        actual = ([str(e) for e in actual_analyzer.analyze()], actual_analyzer.get_symbol_table_report())
+        if actual != expected:
+            return f"expected {expected}, got {actual}"
+    return None
+
+
+def check_mmap_parity(filenames):
+    """Check that scanning a memory-mapped file matches lexing its decoded text"""
+    from semantic_analyzer import Lexer, SemanticAnalyzer, map_source_file
+    
+    for filename in filenames:
+        mapped = map_source_file(filename)
+        if mapped is None:
+            continue
+        with open(filename, 'r') as f:
+            tokens = Lexer(f.read()).tokenize()
+        buffer = Lexer(mapped, engine='regex').tokenize_buffer()
+        for index, token in enumerate(tokens):
+            lazy = buffer[index]
+            if (lazy.type, lazy.value, lazy.line, lazy.column) != (token.type, token.value, token.line, token.column):
+                return f"{filename}, token {index}: expected {token}, got {buffer.value_at(index)!r}"
+        expected = [str(e) for e in SemanticAnalyzer(tokens).analyze()]
+        actual = [str(e) for e in SemanticAnalyzer(buffer).analyze()]
+        mapped.close()
+        if actual != expected:
+            return f"{filename}: expected {expected}, got {actual}"
+    return None
+
+
+def check_token_cache_parity(sources):
+    """Check that tokens and symbols loaded from a token cache match a fresh lex and analysis"""
+    import tempfile
+    from semantic_analyzer import Lexer, SemanticAnalyzer, TokenBuffer
+    from token_cache import load_token_cache, write_token_cache
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "source.tokc")
+        for source in sources:
+            buffer = Lexer(source).tokenize_buffer()
+            analyzer = SemanticAnalyzer(buffer)
+            expected = ([str(e) for e in analyzer.analyze()], analyzer.get_symbol_table_report())
+            symbols = analyzer.symbol_table.get_current_scope_symbols()
+            write_token_cache(path, source, buffer, symbols)
+            
+            if load_token_cache(path, source + " ") is not None:
+                return f"{source[:40]!r}: cache accepted for a different source"
+            cache = load_token_cache(path, source)
+            if cache is None:
+                return f"{source[:40]!r}: cache rejected for its own source"
+            tokens = TokenBuffer.from_columns(source, cache.types, cache.starts, cache.ends)
+            if list(tokens) != Lexer(source).tokenize():
+                return f"{source[:40]!r}: cached tokens differ"
+            if cache.symbols() != symbols:
+                return f"{source[:40]!r}: expected symbols {symbols}, got {cache.symbols()}"
+            analyzer = SemanticAnalyzer(tokens)
+            actual = ([str(e) for e in analyzer.analyze()], analyzer.get_symbol_table_report())
+            cache.close()
+            if actual != expected:
+                return f"{source[:40]!r}: expected {expected}, got {actual}"
+    return None
+
+
+# Text inserted at random offsets by check_incremental_parity
+INCREMENTAL_EDITS = ['var int q = 1;', 'x = 2;', '\n', '"', '{', '}', ' ', 'é', ';', 'x', '//', '/*', '*/',
+                     'function int f(int a) { return a; }\n', 'if (x) { y = 1; }', 'if (x) q = 2;', '=', '+']
+
+# A function whose body assigns to the function itself while it is being declared
+SELF_ASSIGNING_FUNCTION = 'function int f() { f = 1; return 1; }'
+
+# Successive versions of a document whose edits change tokens that an earlier
+# statement read past its own end (the undefined 'q' is checked by 'if (x)'),
+# or that change a global a function body initializes
+INCREMENTAL_EDIT_SEQUENCES = [
+    ['var int x = 1;\nif (x) q = 2;\n', 'var int x = 1;\nif (x) q == 2;\n'],
+    ['var int x = 1;\nif (x) q = 2;\n', 'var int x = 1;\nif (x) q + 2;\n'],
+    ['var int x = 1;\nif (x) q = 2;\n', 'var int x = 1;\nif (x) qr = 2;\n'],
+    [SELF_ASSIGNING_FUNCTION, SELF_ASSIGNING_FUNCTION.replace('f = 1', 'f = 2'),
+     'var int x;\n' + SELF_ASSIGNING_FUNCTION],
+]
+
+
+def check_incremental_parity(sources, edits_per_source=40):
+    """Check that re-analyzing after random edits matches analyzing the edited text from scratch"""
+    import random
+    from semantic_analyzer import Lexer, SemanticAnalyzer
+    from incremental_analyzer import IncrementalAnalyzer
+    
+    def expected_for(text):
+        tokens = Lexer(text).tokenize()
+        analyzer = SemanticAnalyzer(tokens)
+        return [str(e) for e in analyzer.analyze()], analyzer.get_symbol_table_report(), len(tokens)
+    
+    for versions in INCREMENTAL_EDIT_SEQUENCES:
+        incremental = IncrementalAnalyzer()
+        for text in versions:
+            actual = ([str(e) for e in incremental.update(text)], incremental.get_symbol_table_report(),
+                      incremental.token_count)
+            if actual != expected_for(text):
+                return f"after editing to {text!r}: expected {expected_for(text)}, got {actual}"
+    
+    rng = random.Random(0)
+    for source in sources:
+        incremental = IncrementalAnalyzer()
+        text = source
+        for _ in range(edits_per_source):
+            expected = expected_for(text)
+            actual = ([str(e) for e in incremental.update(text)], incremental.get_symbol_table_report(),
+                      incremental.token_count)
+            if actual != expected:
+                return f"after editing to {text!r}: expected {expected}, got {actual}"
+            
+            position = rng.randint(0, len(text))
+            removed = rng.choice([0, 0, 1, 5, 20])
+            inserted = '' if removed == 20 else rng.choice(INCREMENTAL_EDITS)
+            text = text[:position] + inserted + text[position + removed:]
+    return None
+
+
+# Function bodies that see later globals, initialize globals or swallow the next statement
+PARALLEL_PARITY_SNIPPETS = [
+    'function int f() { return later; } var int later = 1; function int g() { later = f(); return later; }',
+    'var int g; var int h; function bool set() { g = 1; return true; }\n'
+    'function int other(int h) { var int g = 0; g = 2; h = 1; return g; }',
+    'function int f() { var int x = 1 } var int y = 2; function int g() { return y; }',
+    'function int f(int a) { { function int inner() { return a; } } return inner(); } f = 1;',
+    'function int open() { if (true) { return 1; }',
+]
+
+
+def check_parallel_parity(sources):
+    """Check that analyzing function bodies in worker processes matches analyzing the file in order"""
+    from semantic_analyzer import Lexer, SemanticAnalyzer
+    from parallel_analyzer import analyze_in_parallel
+    
+    for source in sources:
+        expected_analyzer = SemanticAnalyzer(Lexer(source).tokenize())
+        expected = ([str(e) for e in expected_analyzer.analyze()], expected_analyzer.get_symbol_table_report())
+        _, actual_analyzer = analyze_in_parallel(source, workers=2)
+        actual = ([str(e) for e in actual_analyzer.errors], actual_analyzer.get_symbol_table_report())
+        if actual != expected:
+            return f"{source[:40]!r}: expected {expected}, got {actual}"
+    return None
+
+
+def check_diagnostic_output(sources):
+    """Check that errors streamed as JSON Lines and SARIF are the ones the analyzer collects"""
+    import io
+    import json
+    from semantic_analyzer import Lexer, SemanticAnalyzer, StreamingSemanticAnalyzer
+    from diagnostic_output import JsonLinesWriter, SarifWriter
+    
+    for source in sources:
+        expected = [(e.line, e.column, e.message) for e in SemanticAnalyzer(Lexer(source).tokenize()).analyze()]
+        
+        for writer_class in (JsonLinesWriter, SarifWriter):
+            stream = io.StringIO()
+            writer = writer_class(stream, 'input.txt')
+            analyzer = StreamingSemanticAnalyzer(Lexer(source).iter_tokens())
+            analyzer.error_sink = writer.write
+            writer.begin()
+            analyzer.analyze()
+            writer.end()
+            if analyzer.errors or analyzer.error_count != writer.count:
+                return f"{source[:40]!r}: {writer_class.__name__} kept {len(analyzer.errors)} error(s)"
+            
+            if writer_class is JsonLinesWriter:
+                records = [json.loads(line) for line in stream.getvalue().splitlines()]
+                actual = [(r['line'], r['column'], r['message']) for r in records]
+            else:
+                results = json.loads(stream.getvalue())['runs'][0]['results']
+                actual = [(r['locations'][0]['physicalLocation']['region']['startLine'],
+                           r['locations'][0]['physicalLocation']['region']['startColumn'],
+                           r['message']['text']) for r in results]
+            if actual != expected:
+                return f"{source[:40]!r} ({writer_class.__name__}): expected {expected}, got {actual}"
+    return None
+
+
+def check_server_parity(sources):
+    """Check that JSON-RPC requests to an AnalysisServer answer what direct analysis finds"""
+    import json
+    from semantic_analyzer import Lexer, SemanticAnalyzer
+    from analysis_server import AnalysisServer, token_end
+    
+    server = AnalysisServer()
+    request_ids = iter(range(1, 1 << 30))
+    
+    def call(method, **params):
+        request = {'jsonrpc': '2.0', 'id': next(request_ids), 'method': method, 'params': params}
+        response = json.loads(server.handle_line(json.dumps(request).encode('utf-8')))
+        return response.get('result', response.get('error'))
+    
+    def analyze_matches(uri, text):
+        """Send text to the server and compare the errors with a cold analysis"""
+        expected = [(e.line, e.column, e.message) for e in SemanticAnalyzer(Lexer(text).tokenize()).analyze()]
+        result = call('analyze', uri=uri, text=text)
+        actual = [(e['line'], e['column'], e['message']) for e in result['errors']]
+        return None if actual == expected else f"{text[:40]!r}: expected {expected}, got {actual}"
+    
+    # Successive requests for a document whose edits reach back into an earlier statement
+    for number, versions in enumerate(INCREMENTAL_EDIT_SEQUENCES):
+        for text in versions:
+            mismatch = analyze_matches(f'edited{number}', text)
+            if mismatch:
+                return mismatch
+    
+    for source in sources:
+        # The same document is edited from one source to the next
+        for text in (source, source + '\nvar int added = 1;\n', source):
+            mismatch = analyze_matches('doc', text)
+            if mismatch:
+                return mismatch
+        tokens = Lexer(source).tokenize()
+        analyzer = SemanticAnalyzer(tokens)
+        analyzer.analyze()
+        
+        for token in tokens[:-1]:
+            hover = call('hover', uri='doc', line=token.line, column=token.column)
+            if not hover or (hover['type'], hover['value']) != (token.type.name, token.value):
+                return f"{source[:40]!r}: hover at {token.line}:{token.column} gave {hover}, expected {token}"
+        
+        expected = list(analyzer.symbol_table.get_current_scope_symbols())
+        actual = [symbol['name'] for symbol in call('symbols', uri='doc')]
+        if actual != expected:
+            return f"{source[:40]!r}: expected symbols {expected}, got {actual}"
+    
+    # A string ends after its closing quote, or at the end of the text when it has none
+    for text, end in (('s = "abc";', 9), ("s = 'abc", 8), ('s = "";', 6), ('s = "', 5)):
+        string = Lexer(text).tokenize()[2]
+        if token_end(string, text) != end:
+            return f"{text!r}: string token ends at {token_end(string, text)}, expected {end}"
+    
+    if call('close', uri='doc') is not True:
+        return "closing the document failed"
+    return None
+
+
+def check_profile_parity(sources):
+    """Check that the counting classes used by --profile analyze like the plain ones and count every token"""
+    from semantic_analyzer import (
+        CountingSemanticAnalyzer, CountingStreamingSemanticAnalyzer, CountingSymbolTable, Lexer, SemanticAnalyzer,
+    )
+    from analysis_profile import AnalysisProfile
+    
+    for source in sources:
+        tokens = Lexer(source).tokenize()
+        expected_analyzer = SemanticAnalyzer(tokens)
+        expected = ([str(e) for e in expected_analyzer.analyze()], expected_analyzer.get_symbol_table_report())
+        
+        for streaming in (False, True):
+            profile = AnalysisProfile()
+            if streaming:
+                analyzer = CountingStreamingSemanticAnalyzer(profile.count_stream(Lexer(source).iter_tokens()),
+                                                             CountingSymbolTable())
+            else:
+                profile.count_tokens(tokens)
+                analyzer = CountingSemanticAnalyzer(tokens, CountingSymbolTable())
+            actual = ([str(e) for e in analyzer.analyze()], analyzer.get_symbol_table_report())
+            if actual != expected:
+                return f"{source[:40]!r}: expected {expected}, got {actual}"
+            
+            profile.collect(analyzer)
+            if sum(profile.token_types.values()) != len(tokens):
+                return f"{source[:40]!r}: counted {sum(profile.token_types.values())} of {len(tokens)} tokens"
+            if source.strip() and not profile.statements:
+                return f"{source[:40]!r}: no statements counted"
+    return None
+
+
+# Modules the CLI path must not load
+GUI_MODULES = ('tkinter', '_tkinter', 'semantic_analyzer_gui')
+
+# Runs the launcher's CLI path and prints the GUI modules left in sys.modules
+CLI_IMPORTS_PROBE = """
+import atexit, runpy, sys
+gui_modules = {gui_modules!r}
+atexit.register(lambda: print(' '.join(name for name in sys.modules
+                                       if name.split('.')[0] in gui_modules), file=sys.stderr))
+sys.argv = ['run_analyzer.py', '-c', 'test_no_errors.txt']
+runpy.run_path('run_analyzer.py', run_name='__main__')
+"""
+
+
+def check_cli_imports():
+    """Return the GUI modules imported by a fresh `run_analyzer.py -c` process"""
+    import subprocess
+    
+    probe = CLI_IMPORTS_PROBE.format(gui_modules=GUI_MODULES)
+    run = subprocess.run([sys.executable, '-c', probe], cwd=os.path.dirname(os.path.abspath(__file__)),
+                         stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    lines = run.stderr.splitlines()
+    return lines[-1].split() if lines else ['(no output from the probe)']
+
+
+def check_cli_diagnostic_stream(filename):
+    """Check that `run_analyzer.py -c file --format jsonl|sarif` writes nothing but the diagnostics to stdout"""
+    import json
+    import subprocess
+    from semantic_analyzer import Lexer, SemanticAnalyzer
+    
+    with open(filename, 'r') as f:
+        expected = len(SemanticAnalyzer(Lexer(f.read()).tokenize()).analyze())
+    for output_format in ('jsonl', 'sarif'):
+        run = subprocess.run([sys.executable, 'run_analyzer.py', '-c', filename, '--format', output_format],
+                             cwd=os.path.dirname(os.path.abspath(__file__)),
+                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        try:
+            if output_format == 'jsonl':
+                actual = len([json.loads(line) for line in run.stdout.splitlines()])
+            else:
+                actual = len(json.loads(run.stdout)['runs'][0]['results'])
+        except ValueError as e:
+            return f"--format {output_format}: stdout is not {output_format} ({e}): {run.stdout[:60]!r}"
+        if actual != expected:
+            return f"--format {output_format}: expected {expected} diagnostics, got {actual}"
+    return None
+
+
+# Well-formed programs with semantic errors for check_tree_parity
+TREE_PARITY_SNIPPETS = [
+    'var int x = 1; var int x = 2; y = x + 1; var string s = x;',
+    'var float f = 1; var int i = 1.5; var bool b = !true; b = "no";',
+    'function int f(int a, float b) { return a; } var int r = f(1, 2.0); f = 3;',
+    'var int n = 0; while (n < 10) { var int m = n * 2; n = n + 1; } m = 1;',
+    'if (true) { var int a = 1; } else { var bool a = false; a = 2; } a = 3;',
+    'var int z = ((1 + 2) * -3) / 4; var bool w = z >= 2 && !(z == 3) || false;',
+    'var int x = 1 + "a"; var bool b = x > 2 && !false; var string s = "a" + "b" * 2;',
+    'var float f = -(1 + 2.5) % 2; var bool n = !1; var int q = -"s"; var bool e = 1 == 1.0 || "a" != true;',
+    'function float g(int a) { return a; } var int r = g(missing, 2 + "x") + 1; r = (r <\n 2);',
+    'function bool h(int a, int a) { if (a > 1) { return; } return "no"; } h(1); h(1, 2.5); r(); return 1;',
+    'function int f(int n) { return n * f(n - 1); } var string s = f(1) + "x"; var int t = f(f(2), 3);',
+    'if (q) b = 1; else c = 2;',
+    'var int x; while (x) y = 1; if (x) x = 1; else x = "s"; if (x) { z = 1; } else w = 2;',
+]
+
+
+def check_tree_parity(sources):
+    """Check that parsing to a syntax tree and analyzing it matches the token analyzer"""
+    from semantic_analyzer import Lexer, SemanticAnalyzer
+    from syntax_tree import parse_and_analyze
+    
+    for source in sources:
+        tokens = Lexer(source).tokenize()
+        expected_analyzer = SemanticAnalyzer(tokens)
+        expected = ([str(e) for e in expected_analyzer.analyze()], expected_analyzer.get_symbol_table_report())
+        _, actual_analyzer = parse_and_analyze(tokens)
+        actual = ([str(e) for e in actual_analyzer.errors], actual_analyzer.get_symbol_table_report())
+        if actual != expected:
+            return f"{source[:40]!r}: expected {expected}, got {actual}"
+    return None
+
+
+# Expressions with the type both analyzers must give them and the errors they must report
+EXPRESSION_TYPES = [
+    ('(1 + 2) * 3.0', 'FLOAT', []),
+    ('1 + 2 * 3', 'INT', []),
+    ('-(1 + 2.5) % 2', 'FLOAT', []),
+    ('"a" + "b"', 'STRING', []),
+    ('1 < 2.5 && !false', 'BOOL', []),
+    ('1 == 1.0 || "a" != "b"', 'BOOL', []),
+    ('!1', 'UNKNOWN', ["Error at line 1, column 1: Invalid operand for '!': int"]),
+    ('-true', 'UNKNOWN', ["Error at line 1, column 1: Invalid operand for '-': bool"]),
+    ('1 + "a"', 'UNKNOWN', ["Error at line 1, column 3: Invalid operands for '+': int and string"]),
+    ('"a" * 2', 'UNKNOWN', ["Error at line 1, column 5: Invalid operands for '*': string and int"]),
+]
+
+# Programs with the exact errors both analyzers must report
+EXPECTED_DIAGNOSTICS = [
+    ('var int x = 1 + "a";', ["Error at line 1, column 15: Invalid operands for '+': int and string"]),
+    ('var bool b = !1;', ["Error at line 1, column 14: Invalid operand for '!': int"]),
+    ('var float f = (1 + 2) * 3.0; var int i = (1 + 2) * 3.0;',
+     ["Error at line 1, column 42: Type mismatch: cannot assign float to int"]),
+    ('var bool c = 1 < "a" || 2;',
+     ["Error at line 1, column 16: Invalid operands for '<': int and string"]),
+    ('var bool d = 1 + 2 < 4 && true;', []),
+    # Function declarations, calls and returns
+    ('function int f(int a) { return a; } var int r = f(1, 2);',
+     ["Error at line 1, column 49: Function 'f' expects 1 argument(s), got 2"]),
+    ('function int f(int a) { return a; } var int r = f("s");',
+     ["Error at line 1, column 51: Argument 1 of 'f': cannot pass string as int"]),
+    ('function int f() { return "s"; }',
+     ["Error at line 1, column 27: Type mismatch: cannot return string from function returning int"]),
+    ('function int f() { return; }', ["Error at line 1, column 20: Missing return value in function returning int"]),
+    ('return 1;', ["Error at line 1, column 1: Return statement outside of function"]),
+    ('function int f(int a, int a) { return a; }', ["Error at line 1, column 27: Parameter 'a' already declared"]),
+    ('var int v = 1; var int r = v(1);', ["Error at line 1, column 28: 'v' is not a function"]),
+    ('function int f(int n) { return f(n - 1) + 1; } var float g = f(2) * 1.5;', []),
+]
+
+
+def check_expected_diagnostics():
+    """Check expression types and the exact errors of both analyzers against known answers"""
+    from semantic_analyzer import DataType, Lexer, SemanticAnalyzer
+    from syntax_tree import Parser, Program, TreeAnalyzer, parse_and_analyze
+    
+    for expression, type_name, messages in EXPRESSION_TYPES:
+        tokens = Lexer(expression).tokenize()
+        token_analyzer = SemanticAnalyzer(tokens)
+        tree_analyzer = TreeAnalyzer(Program([]))
+        for label, analyzer, data_type in (
+                ("token", token_analyzer, token_analyzer.get_expression_type(tokens[:-1])),
+                ("tree", tree_analyzer, tree_analyzer.get_expression_type(Parser(tokens).parse_expression()))):
+            actual = (data_type, [str(e) for e in analyzer.errors])
+            if actual != (DataType[type_name], messages):
+                return f"{label} analyzer types {expression!r} as {actual}, expected {type_name} and {messages}"
+    
+    for source, messages in EXPECTED_DIAGNOSTICS:
+        tokens = Lexer(source).tokenize()
+        token_errors = [str(e) for e in SemanticAnalyzer(tokens).analyze()]
+        tree_errors = [str(e) for e in parse_and_analyze(tokens)[1].errors]
+        for label, actual in (("token", token_errors), ("tree", tree_errors)):
+            if actual != messages:
+                return f"{label} analyzer on {source[:40]!r}: expected {messages}, got {actual}"
+    return None
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Analizador por Lotes - Edwin Espinal
+Autor: Edwin Espinal
+Descripción: Analiza todos los archivos fuente de un proyecto repartiendo el trabajo
+entre varios procesos y combina los diagnósticos en un único reporte ordenado.
+"""
+
+import fnmatch
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from semantic_analyzer import (
+    ANALYZER_VERSION, CountingSemanticAnalyzer, CountingSymbolTable, Lexer, NameTable, SemanticAnalyzer,
+    symbol_to_dict,
+)
+
+
+DEFAULT_PATTERN = "*.txt"
+
+
+@dataclass
+class FileResult:
+    path: str
+    token_count: int = 0
+    errors: List[Tuple[int, int, str]] = field(default_factory=list)  # (line, column, message)
+    symbols: List[Dict[str, Any]] = field(default_factory=list)  # global scope, see symbol_to_dict
+    failure: Optional[str] = None
+    cached: bool = False
+    profile: Any = None  # analysis_profile.AnalysisProfile when profiling
+
+
+def collect_sources(paths: List[str], pattern: str = DEFAULT_PATTERN) -> List[str]:
+    """Expand files, directories (searched recursively for pattern) and globs into a file list"""
+    sources = []
+    seen = set()
+    
+    def add(path):
+        normalized = os.path.normpath(path)
+        if normalized not in seen:
+            seen.add(normalized)
+            sources.append(normalized)
+    
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, subdirectories, filenames in os.walk(path):
+                subdirectories.sort()
+                for filename in sorted(fnmatch.filter(filenames, pattern)):
+                    add(os.path.join(directory, filename))
+        elif glob.has_magic(path):
+            for match in sorted(glob.glob(path, recursive=True)):
+                if os.path.isfile(match):
+                    add(match)
+        else:
+            # Plain paths are kept even if missing so they show up as failures
+            add(path)
+    
+    return sources
+
+
+def analyze_source(path: str, source_code: str, profile=None) -> FileResult:
+    """Lex and analyze one source; runs inside a worker process.
+    
+    With an analysis_profile.AnalysisProfile, the phases are timed and the
+    profile is returned with the result.
+    """
+    if profile:
+        profile.start('tokenize')
+    tokens = Lexer(source_code, engine='regex', names=NameTable()).tokenize()
+    if profile:
+        profile.stop()
+        profile.count_tokens(tokens)
+        profile.start('analyze')
+        analyzer = CountingSemanticAnalyzer(tokens, CountingSymbolTable())
+    else:
+        analyzer = SemanticAnalyzer(tokens)
+    errors = analyzer.analyze()
+    if profile:
+        profile.stop()
+        profile.collect(analyzer)
+        profile.start('report')
+    
+    result = FileResult(
+        path,
+        token_count=len(tokens),
+        errors=[(error.line, error.column, error.message) for error in errors],
+        symbols=[symbol_to_dict(symbol) for symbol in analyzer.symbol_table.get_current_scope_symbols().values()],
+    )
+    if profile:
+        profile.finish()
+        result.profile = profile
+    return result
+
+
+def read_source(path: str):
+    """Return (source, None) or (None, reason the file could not be read)"""
+    try:
+        with open(path, 'r') as f:
+            return f.read(), None
+    except Exception as e:
+        return None, str(e)
+
+
+def analyze_file(path: str, profile=None) -> FileResult:
+    """Read, lex and analyze one file; runs inside a worker process"""
+    if profile:
+        profile.start('read')
+    source_code, failure = read_source(path)
+    if failure:
+        if profile:
+            profile.finish()
+        return FileResult(path, failure=failure)
+    return analyze_source(path, source_code, profile)
+
+
+def map_in_pool(function, jobs: List, workers: Optional[int] = None, *arguments: List,
+                initializer=None, initargs: tuple = ()):
+    """Map function over jobs (and extra argument lists) in a process pool, preserving order.
+    
+    initializer(*initargs) runs once in each worker before its first job, or
+    in this process when the jobs are not worth a pool.
+    """
+    if workers == 1 or len(jobs) <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        yield from map(function, jobs, *arguments)
+        return
+    
+    workers = workers or os.cpu_count() or 1
+    # Hand out jobs in chunks so thousands of small ones don't pay one round trip each
+    chunksize = max(1, len(jobs) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        yield from pool.map(function, jobs, *arguments, chunksize=chunksize)
+
+
+def analyze_files(files: List[str], workers: Optional[int] = None, cache=None, profile=None):
+    """Yield a FileResult per file, in the order of files.
+    
+    With a cache (see analysis_cache.AnalysisCache), sources are read and
+    looked up here and only the misses are sent to the workers. With an
+    AnalysisProfile, each analyzed file's result carries a profile of its
+    own, set up like the given one.
+    """
+    def profiles(count):
+        if profile is None:
+            return [None] * count
+        return [type(profile)(profile.trace_memory) for _ in range(count)]
+    
+    if cache is None:
+        yield from map_in_pool(analyze_file, files, workers, profiles(len(files)))
+        return
+    
+    results: List[Optional[FileResult]] = [None] * len(files)
+    pending = []  # (index, cache key)
+    pending_paths = []
+    pending_sources = []
+    
+    for index, path in enumerate(files):
+        source_code, failure = read_source(path)
+        if failure:
+            results[index] = FileResult(path, failure=failure)
+            continue
+        
+        key = cache.key_for(source_code)
+        entry = cache.get(key)
+        if entry is not None:
+            results[index] = FileResult(path, entry['token_count'],
+                                        [tuple(error) for error in entry['errors']],
+                                        entry['symbols'], cached=True)
+        else:
+            pending.append((index, key))
+            pending_paths.append(path)
+            pending_sources.append(source_code)
+    
+    analyzed = map_in_pool(analyze_source, pending_paths, workers, pending_sources, profiles(len(pending_paths)))
+    for (index, key), result in zip(pending, analyzed):
+        cache.put(key, {'token_count': result.token_count, 'errors': result.errors, 'symbols': result.symbols})
+        results[index] = result
+    
+    yield from results
+
+
+def run_batch(paths: List[str], workers: Optional[int] = None, pattern: str = DEFAULT_PATTERN,
+              cache=None, profile=None) -> int:
+    """Analyze every source under paths and print one combined report.
+    
+    With an AnalysisProfile, the profiles of the analyzed files are merged
+    into it. Returns the aggregate exit code: 0 if every file is clean, 1 if
+    any file has semantic errors, 2 if any file could not be read.
+    """
+    files = collect_sources(paths, pattern)
+    if not files:
+        print("No se encontraron archivos fuente")
+        return 2
+    
+    total_errors = 0
+    total_tokens = 0
+    failed = 0
+    files_with_errors = 0
+    
+    for result in analyze_files(files, workers, cache, profile):
+        if result.profile:
+            profile.merge(result.profile)
+        if result.failure:
+            failed += 1
+            print(f"{result.path}: no se pudo leer el archivo: {result.failure}")
+            continue
+        
+        total_tokens += result.token_count
+        if result.errors:
+            files_with_errors += 1
+            total_errors += len(result.errors)
+            for line, column, message in result.errors:
+                print(f"{result.path}:{line}:{column}: {message}")
+    
+    print()
+    print("=" * 60)
+    print(f"Archivos analizados: {len(files) - failed}")
+    print(f"Tokens procesados: {total_tokens}")
+    print(f"Errores sintácticos: {total_errors} en {files_with_errors} archivo(s)")
+    if failed:
+        print(f"Archivos no leídos: {failed}")
+    if cache:
+        print(cache.stats())
+    
+    if failed:
+        return 2
+    return 1 if total_errors else 0
+
+
+def main(argv=None):
+    """Main function to run the batch analyzer"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(prog='batch_analyzer.py',
+                                     description='Analiza muchos archivos fuente en paralelo')
+    parser.add_argument('paths', nargs='+', help='archivos, directorios o patrones glob')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='número de procesos (por defecto: uno por CPU)')
+    parser.add_argument('--pattern', default=DEFAULT_PATTERN,
+                        help=f'patrón de archivos a buscar en directorios (por defecto: {DEFAULT_PATTERN})')
+    parser.add_argument('--cache-dir', metavar='DIR',
+                        help='reutilizar resultados guardados en DIR para archivos sin cambios')
+    parser.add_argument('--cache-size', type=int, default=64, metavar='MB',
+                        help='tamaño máximo de la caché en MB (por defecto: 64)')
+    parser.add_argument('--profile', action='store_true',
+                        help='mostrar el tiempo de cada fase, la memoria pico y contadores, sumados entre archivos')
+    parser.add_argument('--profile-json', metavar='FILE',
+                        help='guardar el perfil (ver --profile) en FILE en formato JSON')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='incluir en el perfil la memoria pico de cada fase, medida con tracemalloc '
+                             '(hace el análisis varias veces más lento)')
+    args = parser.parse_args(argv)
+    
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs debe ser al menos 1")
+    
+    cache = None
+    if args.cache_dir:
+        from analysis_cache import AnalysisCache
+        cache = AnalysisCache(args.cache_dir, ANALYZER_VERSION, args.cache_size * 2**20)
+    
+    profile = None
+    if args.profile or args.profile_json or args.profile_memory:
+        from analysis_profile import AnalysisProfile
+        profile = AnalysisProfile(trace_memory=args.profile_memory)
+    
+    exit_code = run_batch(args.paths, args.jobs, args.pattern, cache, profile)
+    
+    if profile:
+        if args.profile or args.profile_memory:
+            print("\n" + profile.format())
+        if args.profile_json:
+            profile.dump(args.profile_json)
+            print(f"Perfil guardado en {args.profile_json}")
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,734 @@
+#!/usr/bin/env python3
+"""
+Benchmarks para el Analizador Sintáctico
+Autor: Edwin Espinal
+Descripción: Mide el costo en memoria y tiempo de las distintas partes del analizador
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from semantic_analyzer import (
+    ANALYZER_VERSION, DataType, Lexer, NameTable, ScopedSymbolTable, SemanticAnalyzer, Symbol, SymbolTable,
+    TokenBuffer,
+)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def generate_declarations(token_count):
+    """Generate a program of simple declarations with roughly token_count tokens"""
+    # 'var int vN = N;' is 6 tokens
+    lines = [f"var int v{i} = {i};" for i in range(max(1, token_count // 6))]
+    return "\n".join(lines) + "\n"
+
+
+class ProgramGenerator:
+    """Builds synthetic programs of a given shape from a fixed seed.
+    
+    Every shape emits roughly the requested number of top-level statements;
+    the same arguments always produce the same program, so timings can be
+    compared across commits.
+    """
+    
+    TYPES = [("int", "1"), ("float", "2.5"), ("string", '"text"'), ("bool", "true")]
+    
+    def __init__(self, seed=0, depth=24, terms=40, references=1, body=3):
+        self.random = random.Random(seed)
+        self.depth = depth          # block nesting for the 'nested' shape
+        self.body = body            # statements per function body for the 'functions' shape
+        self.references = references  # assignments in the innermost 'nested' block
+        self.terms = terms          # operands per expression for the 'expressions' shape
+        self.counter = 0
+    
+    def name(self, prefix):
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+    
+    def declaration(self, indent=""):
+        data_type, value = self.random.choice(self.TYPES)
+        return f"{indent}var {data_type} {self.name('v')} = {value};"
+    
+    def flat(self, statements):
+        lines = ["var int total = 0;"]
+        while len(lines) < statements:
+            lines.append(self.declaration())
+            lines.append(f"total = {self.random.randint(0, 999)};")
+        return lines
+    
+    def nested(self, statements):
+        lines = ["var int x = 1;", "var bool flag = true;"]
+        while len(lines) < statements:
+            depth = self.random.randint(1, self.depth)
+            for level in range(depth):
+                indent = "    " * level
+                opener = self.random.choice(["{", "if (x > 1) {", "while (flag) {"])
+                lines.append(indent + opener)
+                lines.append(self.declaration(indent + "    "))
+            lines.extend(["    " * depth + "x = x + 1;"] * self.references)
+            for level in reversed(range(depth)):
+                lines.append("    " * level + "}")
+        return lines
+    
+    def functions(self, statements):
+        lines = ["var int result = 0;"]
+        while len(lines) < statements:
+            name = self.name("f")
+            count = self.random.randint(0, 4)
+            parameters = ", ".join(f"int p{i}" for i in range(count))
+            lines.append(f"function int {name}({parameters}) {{")
+            lines.append("    var int local = 1;")
+            lines.extend(["    local = local + 1;"] * max(1, self.body - 2))
+            lines.append("    return local;")
+            lines.append("}")
+            lines.append(f"result = {name}({', '.join(str(i + 1) for i in range(count))});")
+        return lines
+    
+    def expression(self, terms):
+        """An int expression over a, b and literals, partly parenthesized"""
+        operands = [self.random.choice(["a", "b", str(self.random.randint(1, 99))]) for _ in range(terms)]
+        expression = operands[0]
+        for operand in operands[1:]:
+            expression += f" {self.random.choice(['+', '-', '*', '/', '%'])} {operand}"
+            if self.random.random() < 0.1:
+                expression = f"({expression})"
+        return expression
+    
+    def expressions(self, statements):
+        lines = ["var int a = 1;", "var int b = 2;", "var float y = 0.5;"]
+        while len(lines) < statements:
+            expression = self.expression(self.terms)
+            lines.append(f"{self.random.choice(['a', 'b', 'y'])} = {expression};")
+        return lines
+    
+    def patterns(self, statements):
+        """Expressions repeated from a small pool, like code generated from templates"""
+        lines = ["var int a = 1;", "var int b = 2;", "var float y = 0.5;", "var bool ok = true;"]
+        arithmetic = [self.expression(8) for _ in range(16)]
+        conditions = [f"{self.expression(4)} < {self.expression(4)} && ok" for _ in range(4)]
+        while len(lines) < statements:
+            if self.random.random() < 0.2:
+                lines.append(f"ok = {self.random.choice(conditions)};")
+            else:
+                lines.append(f"{self.random.choice(['a', 'b', 'y'])} = {self.random.choice(arithmetic)};")
+        return lines
+    
+    def scopes(self, statements):
+        lines = [f"var int s{i} = {i};" for i in range(10)]
+        while len(lines) < statements:
+            lines.append("{")
+            for i in self.random.sample(range(10), 3):
+                lines.append(f"    var int s{i} = {i};")  # shadows the global
+                lines.append(f"    s{i} = s{self.random.randint(0, 9)};")
+            lines.append("}")
+        return lines
+    
+    def errors(self, statements):
+        lines = ["var int x = 1;", "var string s = \"a\";"]
+        while len(lines) < statements:
+            lines.append(self.random.choice([
+                f"{self.name('undefined')} = 5;",
+                "var int x = 2;",
+                'x = "not a number";',
+                "s = 3;",
+                f"var int {self.name('v')} = {self.name('missing')};",
+                "var bool b = 1.5;",
+            ]))
+        return lines
+    
+    def statements(self, statements):
+        """Short statements of every kind, so statement dispatch dominates over expressions"""
+        lines = ["var int n = 0;", "var bool done = false;", "function int step(int k) {", "    return k + 1;", "}"]
+        while len(lines) < statements:
+            lines.extend(self.random.choice([
+                [self.declaration()],
+                [f"n = {self.random.randint(0, 9)};"],
+                ["n = step(n);"],
+                ["if (n > 1) {", "    n = 0;", "} else {", "    done = true;", "}"],
+                ["while (done) {", "    done = false;", "}"],
+                ["{", "    var int t = n;", "    t = t + 1;", "}"],
+            ]))
+        return lines
+    
+    def mixed(self, statements):
+        parts = [self.flat, self.nested, self.functions, self.expressions, self.scopes, self.errors]
+        lines = []
+        while len(lines) < statements:
+            lines.extend(self.random.choice(parts)(min(50, statements - len(lines)) or 1))
+        return lines
+    
+    SHAPES = ("flat", "nested", "functions", "expressions", "patterns", "scopes", "errors", "statements", "mixed")
+    
+    def generate(self, shape, statements):
+        return "\n".join(getattr(self, shape)(statements)) + "\n"
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, or None where it can't be measured"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def time_best(function, repeat):
+    """Return (result of the last call, best wall time of repeat calls)"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def run_case(shape, statements, engine, repeat, seed, tree=False):
+    """Time each analysis phase on one generated program; runs in a fresh process"""
+    generator = ProgramGenerator(seed)
+    source = generator.generate(shape, statements)
+    
+    tokens, tokenize_time = time_best(lambda: Lexer(source, engine=engine).tokenize(), repeat)
+    
+    timings = {"tokenize": tokenize_time}
+    if tree:
+        from syntax_tree import Parser, TreeAnalyzer
+        program, timings["parse"] = time_best(lambda: Parser(tokens).parse(), repeat)
+        
+        def analyze():
+            analyzer = TreeAnalyzer(program)
+            return analyzer, analyzer.analyze()
+    else:
+        def analyze():
+            analyzer = SemanticAnalyzer(tokens)
+            return analyzer, analyzer.analyze()
+    (analyzer, errors), timings["analyze"] = time_best(analyze, repeat)
+    
+    _, timings["report"] = time_best(analyzer.get_symbol_table_report, repeat)
+    
+    return {
+        "shape": shape,
+        "statements": statements,
+        "source_bytes": len(source.encode("utf-8")),
+        "tokens": len(tokens),
+        "errors": len(errors),
+        "phases": {name: {"seconds": seconds, "tokens_per_sec": len(tokens) / seconds if seconds else None}
+                   for name, seconds in timings.items()},
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def format_rate(rate):
+    return "-" if rate is None else f"{rate / 1000:,.0f}k"
+
+
+def bench_suite(args):
+    """Time tokenize, analyze and report on generated programs of each shape"""
+    shapes = args.shapes.split(",")
+    for shape in shapes:
+        if shape not in ProgramGenerator.SHAPES:
+            sys.exit(f"Unknown shape '{shape}', choose from {', '.join(ProgramGenerator.SHAPES)}")
+    
+    phase_names = ["tokenize", "parse", "analyze", "report"] if args.ast else ["tokenize", "analyze", "report"]
+    print(f"{'shape':<12} {'tokens':>10} {'errors':>8}  " + " ".join(f"{name:>9}" for name in phase_names) +
+          f"  {'lex tok/s':>10} {'ana tok/s':>10} {'peak RSS':>9}")
+    cases = []
+    for shape in shapes:
+        # A fresh process per case so peak RSS belongs to that case alone
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            case = pool.submit(run_case, shape, args.statements, args.engine, args.repeat, args.seed,
+                               args.ast).result()
+        cases.append(case)
+        phases = case["phases"]
+        rss = case["peak_rss_bytes"]
+        print(f"{shape:<12} {case['tokens']:>10,} {case['errors']:>8,}  " +
+              " ".join(f"{phases[name]['seconds']:>8.3f}s" for name in phase_names) + "  "
+              f"{format_rate(phases['tokenize']['tokens_per_sec']):>10} "
+              f"{format_rate(phases['analyze']['tokens_per_sec']):>10} "
+              f"{'-' if rss is None else f'{rss / 2**20:.1f} MiB':>9}")
+    
+    results = {
+        "commit": git_commit(),
+        "analyzer_version": ANALYZER_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "engine": args.engine,
+        "pipeline": "ast" if args.ast else "tokens",
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "cases": cases,
+    }
+    
+    if args.compare:
+        with open(args.compare) as f:
+            compare_results(json.load(f), results)
+    
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to {args.json}")
+
+
+def compare_results(baseline, results):
+    """Print how each phase's time changed relative to a saved baseline"""
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'} (time ratio, < 1.00 is faster):")
+    previous = {(case["shape"], case["statements"]): case for case in baseline["cases"]}
+    for case in results["cases"]:
+        old = previous.get((case["shape"], case["statements"]))
+        if old is None:
+            print(f"  {case['shape']:<12} no baseline for {case['statements']} statements")
+            continue
+        ratios = []
+        for phase, timing in case["phases"].items():
+            if phase not in old["phases"]:
+                continue
+            old_seconds = old["phases"][phase]["seconds"]
+            ratios.append(f"{phase} {timing['seconds'] / old_seconds:.2f}" if old_seconds else f"{phase} -")
+        print(f"  {case['shape']:<12} " + "  ".join(ratios))
+
+
+def bench_symbols(args):
+    """Compare SymbolTable and ScopedSymbolTable on deeply nested code"""
+    generator = ProgramGenerator(args.seed, depth=args.depth, references=args.references)
+    source = generator.generate("nested", args.statements)
+    tokens = Lexer(source, engine="regex").tokenize()
+    print(f"Source: {len(tokens):,} tokens, blocks nested up to {args.depth} deep")
+    print()
+    
+    results = {}
+    for name, table_class in [("SymbolTable", SymbolTable), ("ScopedSymbolTable", ScopedSymbolTable)]:
+        def analyze():
+            analyzer = SemanticAnalyzer(tokens, table_class())
+            return analyzer.analyze(), analyzer.get_symbol_table_report()
+        results[name], elapsed = time_best(analyze, args.repeat)
+        results[name] += (elapsed,)
+        print(f"{name:<18} analyze {elapsed:.3f}s  {len(tokens) / elapsed / 1000:>8,.0f}k tokens/s")
+    
+    (errors, report, slow), (scoped_errors, scoped_report, fast) = results.values()
+    if [str(e) for e in errors] != [str(e) for e in scoped_errors] or report != scoped_report:
+        sys.exit("ScopedSymbolTable results differ from SymbolTable")
+    print()
+    print(f"ScopedSymbolTable speedup: {slow / fast:.2f}x")
+    
+    # Lookup alone: a global referenced from the innermost of depth scopes
+    print()
+    lookups = 100_000
+    for name, table_class in [("SymbolTable", SymbolTable), ("ScopedSymbolTable", ScopedSymbolTable)]:
+        table = table_class()
+        table.declare_symbol(Symbol("x", DataType.INT, 1, 1))
+        for level in range(args.depth):
+            table.enter_scope()
+            table.declare_symbol(Symbol(f"local{level}", DataType.INT, 1, 1))
+        lookup = table.lookup_symbol
+        _, elapsed = time_best(lambda: [lookup("x") for _ in range(lookups)], args.repeat)
+        print(f"{name:<18} lookup at depth {args.depth}: {elapsed / lookups * 1e9:>7.0f} ns")
+
+
+def generate_vocabulary(names, uses, seed=0):
+    """Generate declarations of names distinct identifiers, then assignments using each about uses times"""
+    rng = random.Random(seed)
+    vocabulary = [f"identifier_{rng.getrandbits(32):08x}_{i}" for i in range(names)]
+    lines = [f"var int {name} = {i};" for i, name in enumerate(vocabulary)]
+    for _ in range(names * uses // 2):
+        lines.append(f"{rng.choice(vocabulary)} = {rng.choice(vocabulary)};")
+    return "\n".join(lines) + "\n"
+
+
+def bench_names(args):
+    """Compare fresh identifier strings per token with names interned into a NameTable"""
+    source = generate_vocabulary(args.names, args.uses, args.seed)
+    print(f"Source: {len(source):,} characters, {args.names:,} distinct identifiers")
+    print()
+    
+    results = {}
+    for label, names in [("Per-token str", lambda: None), ("NameTable", NameTable)]:
+        tokens, retained = measure_retained(lambda: Lexer(source, engine=args.engine, names=names()).tokenize())
+        _, lex_time = time_best(lambda: Lexer(source, engine=args.engine, names=names()).tokenize(), args.repeat)
+        
+        def analyze():
+            analyzer = SemanticAnalyzer(tokens)
+            return analyzer.analyze()
+        errors, analyze_time = time_best(analyze, args.repeat)
+        results[label] = retained
+        print(f"{label:<14} {retained / 2**20:>7.1f} MiB tokens  tokenize {lex_time:.3f}s  "
+              f"analyze {analyze_time:.3f}s  ({len(errors)} errors)")
+        del tokens
+    
+    print()
+    print(f"NameTable keeps {results['Per-token str'] / results['NameTable']:.2f}x less memory in tokens")
+
+
+class UnmemoizedSemanticAnalyzer(SemanticAnalyzer):
+    EXPRESSION_MEMO_SIZE = 0
+
+
+def bench_expressions(args):
+    """Compare expression type inference with and without the per-expression memo"""
+    for shape in ("expressions", "patterns"):
+        generator = ProgramGenerator(args.seed, terms=args.terms)
+        tokens = Lexer(generator.generate(shape, args.statements), engine="regex").tokenize()
+        print(f"{shape}: {len(tokens):,} tokens")
+        
+        results = {}
+        for label, analyzer_class in [("not memoized", UnmemoizedSemanticAnalyzer), ("memoized", SemanticAnalyzer)]:
+            def analyze():
+                analyzer = analyzer_class(tokens)
+                return analyzer.analyze(), analyzer.memoize_expressions
+            (errors, memoizing), elapsed = time_best(analyze, args.repeat)
+            results[label] = ([str(e) for e in errors], elapsed)
+            note = "" if analyzer_class is UnmemoizedSemanticAnalyzer else \
+                "  (memo kept)" if memoizing else "  (memo dropped: few repeats)"
+            print(f"  {label:<13} analyze {elapsed:.3f}s  {len(tokens) / elapsed / 1000:>8,.0f}k tokens/s{note}")
+        
+        (plain_errors, slow), (memo_errors, fast) = results.values()
+        if plain_errors != memo_errors:
+            sys.exit("Memoized inference reports different errors")
+        print(f"  memo speedup: {slow / fast:.2f}x")
+        print()
+
+
+def bench_tokencache(args):
+    """Compare lexing a source with loading its tokens from a binary token cache"""
+    import tempfile
+    from token_cache import load_token_cache, write_token_cache
+    
+    source = ProgramGenerator(args.seed).generate(args.shape, args.statements)
+    path = os.path.join(tempfile.mkdtemp(), "source.tokc")
+    buffer = Lexer(source, engine=args.engine).tokenize_buffer()
+    analyzer = SemanticAnalyzer(buffer)
+    expected = [str(e) for e in analyzer.analyze()]
+    write_token_cache(path, source, buffer, analyzer.symbol_table.get_current_scope_symbols())
+    print(f"Source: {len(source):,} characters, {len(buffer):,} tokens, cache file {os.path.getsize(path):,} bytes")
+    print()
+    
+    _, lex_time = time_best(lambda: Lexer(source, engine=args.engine).tokenize(), args.repeat)
+    _, buffer_time = time_best(lambda: Lexer(source, engine=args.engine).tokenize_buffer(), args.repeat)
+    
+    def load():
+        cache = load_token_cache(path, source)
+        tokens = TokenBuffer.from_columns(source, cache.types, cache.starts, cache.ends)
+        return cache, tokens
+    (cache, tokens), load_time = time_best(load, args.repeat)
+    
+    actual = [str(e) for e in SemanticAnalyzer(tokens).analyze()]
+    cache.close()
+    if actual != expected:
+        sys.exit("Analyzing cached tokens gives different errors")
+    
+    print(f"{'tokenize (list)':<22} {lex_time:.4f}s")
+    print(f"{'tokenize (TokenBuffer)':<22} {buffer_time:.4f}s")
+    print(f"{'load token cache':<22} {load_time:.4f}s  (mmap, header and SHA-256 check)")
+    print()
+    print(f"Loading is {lex_time / load_time:,.0f}x faster than tokenizing to a list")
+    os.remove(path)
+
+
+def bench_parallel(args):
+    """Compare analyzing one large file in order with analyzing its function bodies in worker processes"""
+    from parallel_analyzer import analyze_in_parallel
+    
+    source = ProgramGenerator(args.seed, body=args.body).generate("functions", args.statements)
+    
+    def sequential():
+        tokens = Lexer(source, engine="regex").tokenize_buffer()
+        analyzer = SemanticAnalyzer(tokens)
+        return len(tokens), analyzer.analyze()
+    (token_count, errors), baseline = time_best(sequential, args.repeat)
+    expected = [str(e) for e in errors]
+    print(f"Source: {len(source):,} characters, {token_count:,} tokens, {os.cpu_count()} CPU(s)")
+    print()
+    print(f"{'sequential':<12} {baseline:.3f}s")
+    
+    for workers in [int(jobs) for jobs in args.jobs.split(",")]:
+        (_, analyzer), elapsed = time_best(lambda: analyze_in_parallel(source, workers), args.repeat)
+        if [str(e) for e in analyzer.errors] != expected:
+            sys.exit(f"Parallel analysis with {workers} worker(s) reports different errors")
+        print(f"{f'{workers} worker(s)':<12} {elapsed:.3f}s  {baseline / elapsed:.2f}x")
+
+
+def bench_daemon(args):
+    """Compare the latency of a cold CLI run with requests to a running analysis server"""
+    import statistics
+    import tempfile
+    
+    source = ProgramGenerator(args.seed).generate(args.shape, args.statements)
+    path = os.path.join(tempfile.mkdtemp(), "source.txt")
+    with open(path, "w") as f:
+        f.write(source)
+    here = os.path.dirname(os.path.abspath(__file__))
+    print(f"Source: {len(source):,} characters, {args.requests} request(s) per case")
+    print()
+    
+    def timed(function):
+        times = []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            result = function()
+            times.append(time.perf_counter() - start)
+        return result, times
+    
+    def cli():
+        run = subprocess.run([sys.executable, os.path.join(here, "semantic_analyzer.py"), path, "--format", "jsonl"],
+                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=False)
+        return [json.loads(line) for line in run.stdout.splitlines()]
+    records, cli_times = timed(cli)
+    expected = [(r["line"], r["column"], r["message"]) for r in records]
+    
+    server = subprocess.Popen([sys.executable, os.path.join(here, "run_analyzer.py"), "--serve"],
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    request_ids = iter(range(1, 1 << 30))
+    
+    def call(method, **params):
+        request = {"jsonrpc": "2.0", "id": next(request_ids), "method": method, "params": params}
+        server.stdin.write(json.dumps(request).encode("utf-8") + b"\n")
+        server.stdin.flush()
+        response = json.loads(server.stdout.readline())
+        if "error" in response:
+            sys.exit(f"Server error: {response['error']['message']}")
+        return response["result"]
+    
+    # The first request starts the interpreter's work on the document, like a cold run
+    start = time.perf_counter()
+    result = call("analyze", uri=path)
+    first_time = time.perf_counter() - start
+    if [(e["line"], e["column"], e["message"]) for e in result["errors"]] != expected:
+        sys.exit("The server reports different errors than the CLI")
+    
+    _, unchanged_times = timed(lambda: call("analyze", uri=path))
+    
+    # Edit one statement in the middle of the document each time
+    middle = source.index("\n", len(source) // 2) + 1
+    edits = iter(range(1 << 30))
+    _, edit_times = timed(lambda: call("analyze", uri=path,
+                                       text=f"{source[:middle]}var int edited = {next(edits)};\n{source[middle:]}"))
+    _, hover_times = timed(lambda: call("hover", uri=path, line=1, column=1))
+    
+    call("shutdown")
+    server.wait()
+    os.remove(path)
+    
+    cli_median = statistics.median(cli_times)
+    print(f"{'case':<26} {'median':>10} {'min':>10}")
+    for name, times in [("cold CLI run", cli_times), ("server, first analyze", [first_time]),
+                        ("server, unchanged file", unchanged_times), ("server, one-line edit", edit_times),
+                        ("server, hover", hover_times)]:
+        median = statistics.median(times)
+        print(f"{name:<26} {median * 1000:>8.2f}ms {min(times) * 1000:>8.2f}ms  {cli_median / median:,.1f}x")
+
+
+def bench_startup(args):
+    """Time cold CLI starts against a bare interpreter and fail above the target overhead"""
+    import statistics
+    
+    here = os.path.dirname(os.path.abspath(__file__))
+    sample = os.path.join(here, "test_no_errors.txt")
+    cases = [
+        ("python -c pass", [sys.executable, "-c", "pass"]),
+        ("semantic_analyzer.py", [sys.executable, os.path.join(here, "semantic_analyzer.py"), sample]),
+        ("run_analyzer.py -c", [sys.executable, os.path.join(here, "run_analyzer.py"), "-c", sample]),
+    ]
+    
+    medians = {}
+    for name, command in cases:
+        times = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+            times.append(time.perf_counter() - start)
+        medians[name] = statistics.median(times)
+    
+    interpreter = medians["python -c pass"]
+    print(f"{'command':<22} {'median':>9} {'overhead':>9}")
+    for name, median in medians.items():
+        print(f"{name:<22} {median * 1000:>7.1f}ms {(median - interpreter) * 1000:>7.1f}ms")
+    
+    # Slowest imports of the launcher's CLI path, from -X importtime (microseconds)
+    run = subprocess.run([sys.executable, "-X", "importtime", os.path.join(here, "run_analyzer.py"), "-c", sample],
+                         stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=False)
+    imports = []
+    for line in run.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if not name.startswith("  "):  # top-level imports only
+                imports.append((int(cumulative), name.strip()))
+    print()
+    print("Slowest top-level imports (run_analyzer.py -c):")
+    for cumulative, name in sorted(imports, reverse=True)[:args.top]:
+        print(f"  {name:<24} {cumulative / 1000:>6.1f}ms")
+    
+    overhead = (medians["run_analyzer.py -c"] - interpreter) * 1000
+    print()
+    if overhead > args.target_ms:
+        sys.exit(f"run_analyzer.py -c starts {overhead:.1f}ms after the interpreter, over the "
+                 f"{args.target_ms:.0f}ms target")
+    print(f"run_analyzer.py -c overhead {overhead:.1f}ms is within the {args.target_ms:.0f}ms target")
+
+
+def generate_literals(size, count=4):
+    """Source with count string literals of size characters and identifiers a quarter as long"""
+    blob = "x" * (size - 1) + "\n"
+    lines = []
+    for index in range(count):
+        name = f"s{index}_" + "a" * (size // 4)
+        lines.append(f'var string {name} = "{blob}";')
+        lines.append(f"{name} = {name} + {name};")
+    return "\n".join(lines) + "\n"
+
+
+def bench_literals(args):
+    """Time lexing of huge string literals and identifiers, and check it grows linearly with their size"""
+    for engine in Lexer.ENGINES:
+        costs = []
+        for size in (args.size // 4, args.size):
+            source = generate_literals(size)
+            tokens, elapsed = time_best(lambda: Lexer(source, engine=engine).tokenize(), args.repeat)
+            costs.append(elapsed / len(source))
+            print(f"{engine:<6} {size / 2**20:>6.2f} MiB literals  {len(tokens):>4} tokens  {elapsed:.4f}s  "
+                  f"{len(source) / elapsed / 2**20:>8.1f} MiB/s")
+        growth = costs[1] / costs[0]
+        print(f"{engine:<6} cost per character grew {growth:.2f}x for 4x longer literals")
+        print()
+        if growth > args.max_growth:
+            sys.exit(f"The {engine} engine lexes long literals in worse than linear time")
+
+
+def measure_retained(build):
+    """Return (result, bytes still allocated after build() returns)"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return result, after - before
+
+
+def bench_memory(args):
+    """Compare the memory held by List[Token] and TokenBuffer for the same source"""
+    source = generate_declarations(args.tokens)
+    print(f"Source: {len(source):,} characters")
+    print()
+    
+    results = {}
+    for name, build in [
+        ("List[Token]", lambda: Lexer(source, engine='regex').tokenize()),
+        ("TokenBuffer", lambda: Lexer(source).tokenize_buffer()),
+    ]:
+        start = time.perf_counter()
+        tokens, retained = measure_retained(build)
+        elapsed = time.perf_counter() - start
+        results[name] = retained
+        print(f"{name:<12} {len(tokens):>10,} tokens  {retained / 2**20:>8.1f} MiB  "
+              f"{retained / len(tokens):>6.1f} bytes/token  ({elapsed:.2f}s, traced)")
+        del tokens
+    
+    print()
+    print(f"TokenBuffer uses {results['List[Token]'] / results['TokenBuffer']:.1f}x less memory")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyzer benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    memory = subparsers.add_parser("memory", help="token storage memory: List[Token] vs TokenBuffer")
+    memory.add_argument("--tokens", type=int, default=1_000_000, help="approximate token count")
+    memory.set_defaults(func=bench_memory)
+    
+    symbols = subparsers.add_parser("symbols", help="symbol lookups: SymbolTable vs ScopedSymbolTable")
+    symbols.add_argument("--depth", type=int, default=64, help="maximum block nesting depth")
+    symbols.add_argument("--references", type=int, default=20,
+                         help="assignments to a global in each innermost block")
+    symbols.add_argument("--statements", type=int, default=50_000, help="approximate statements")
+    symbols.add_argument("--repeat", type=int, default=3, help="runs per table; the best time is reported")
+    symbols.add_argument("--seed", type=int, default=0, help="seed for the program generator")
+    symbols.set_defaults(func=bench_symbols)
+    
+    names = subparsers.add_parser("names", help="identifier strings: per token vs interned in a NameTable")
+    names.add_argument("--names", type=int, default=100_000, help="distinct identifiers")
+    names.add_argument("--uses", type=int, default=10, help="approximate references per identifier")
+    names.add_argument("--engine", choices=Lexer.ENGINES, default="regex", help="lexer engine")
+    names.add_argument("--repeat", type=int, default=3, help="runs per phase; the best time is reported")
+    names.add_argument("--seed", type=int, default=0, help="seed for the program generator")
+    names.set_defaults(func=bench_names)
+    
+    expressions = subparsers.add_parser("expressions", help="expression type inference with and without the memo")
+    expressions.add_argument("--statements", type=int, default=20_000, help="approximate statements")
+    expressions.add_argument("--terms", type=int, default=40, help="operands per unique expression")
+    expressions.add_argument("--repeat", type=int, default=3, help="runs per case; the best time is reported")
+    expressions.add_argument("--seed", type=int, default=0, help="seed for the program generator")
+    expressions.set_defaults(func=bench_expressions)
+    
+    tokencache = subparsers.add_parser("tokencache", help="tokenizing vs loading a binary token cache")
+    tokencache.add_argument("--shape", choices=ProgramGenerator.SHAPES, default="mixed", help="program shape")
+    tokencache.add_argument("--statements", type=int, default=50_000, help="approximate statements")
+    tokencache.add_argument("--engine", choices=Lexer.ENGINES, default="regex", help="lexer engine")
+    tokencache.add_argument("--repeat", type=int, default=3, help="runs per phase; the best time is reported")
+    tokencache.add_argument("--seed", type=int, default=0, help="seed for the program generator")
+    tokencache.set_defaults(func=bench_tokencache)
+    
+    literals = subparsers.add_parser("literals", help="lexing huge string literals and identifiers")
+    literals.add_argument("--size", type=int, default=2**20, help="characters per string literal (default: 1 MiB)")
+    literals.add_argument("--max-growth", type=float, default=2.0,
+                          help="fail if the cost per character grows more than this for 4x longer literals")
+    literals.add_argument("--repeat", type=int, default=3, help="runs per size; the best time is reported")
+    literals.set_defaults(func=bench_literals)
+    
+    parallel = subparsers.add_parser("parallel", help="one large file: sequential vs function bodies in a process pool")
+    parallel.add_argument("--statements", type=int, default=20_000, help="approximate top-level statements")
+    parallel.add_argument("--body", type=int, default=40, help="statements per function body")
+    parallel.add_argument("--jobs", default="1,2,4", help="comma-separated worker counts (default: 1,2,4)")
+    parallel.add_argument("--repeat", type=int, default=3, help="runs per case; the best time is reported")
+    parallel.add_argument("--seed", type=int, default=0, help="seed for the program generator")
+    parallel.set_defaults(func=bench_parallel)
+    
+    daemon = subparsers.add_parser("daemon", help="request latency: cold CLI runs vs a running analysis server")
+    daemon.add_argument("--shape", choices=ProgramGenerator.SHAPES, default="mixed", help="program shape")
+    daemon.add_argument("--statements", type=int, default=2_000, help="approximate statements")
+    daemon.add_argument("--requests", type=int, default=20, help="requests per case")
+    daemon.add_argument("--seed", type=int, default=0, help="seed for the program generator")
+    daemon.set_defaults(func=bench_daemon)
+    
+    startup = subparsers.add_parser("startup", help="cold-start time of the CLI entry points")
+    startup.add_argument("--runs", type=int, default=20, help="runs per command; the median is reported")
+    startup.add_argument("--target-ms", type=float, default=50.0,
+                         help="fail if run_analyzer.py -c takes longer than this over a bare interpreter")
+    startup.add_argument("--top", type=int, default=8, help="slowest imports to list")
+    startup.set_defaults(func=bench_startup)
+    
+    suite = subparsers.add_parser("suite", help="time each analysis phase on generated programs")
+    suite.add_argument("--shapes", default=",".join(ProgramGenerator.SHAPES),
+                       help=f"comma-separated program shapes (default: all of {', '.join(ProgramGenerator.SHAPES)})")
+    suite.add_argument("--statements", type=int, default=20_000, help="approximate statements per program")
+    suite.add_argument("--engine", choices=Lexer.ENGINES, default="char", help="lexer engine")
+    suite.add_argument("--ast", action="store_true", help="parse to a syntax tree and analyze that instead")
+    suite.add_argument("--repeat", type=int, default=3, help="runs per phase; the best time is reported")
+    suite.add_argument("--seed", type=int, default=0, help="seed for the program generator")
+    suite.add_argument("--json", metavar="FILE", help="save the results as JSON")
+    suite.add_argument("--compare", metavar="FILE", help="compare against results saved with --json")
+    suite.set_defaults(func=bench_suite)
+    
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Salida de Diagnósticos - Edwin Espinal
+Autor: Edwin Espinal
+Descripción: Escribe los errores del analizador en formatos legibles por otras herramientas
+(JSON Lines y SARIF) a medida que se encuentran, sin acumularlos en memoria.
+"""
+
+import json
+import os
+from typing import Optional, TextIO
+
+from semantic_analyzer import ANALYZER_VERSION, SemanticError
+
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_VERSION = "2.1.0"
+TOOL_NAME = "semantic_analyzer"
+
+
+class JsonLinesWriter:
+    """Writes each diagnostic as one JSON object per line.
+    
+    Every line is flushed as soon as it is written, so a reader on the other
+    end of a pipe sees diagnostics while the analysis is still running.
+    """
+    
+    def __init__(self, stream: TextIO, path: str):
+        self.stream = stream
+        self.path = path
+        self.count = 0
+    
+    def begin(self):
+        """Write whatever precedes the first diagnostic"""
+    
+    def write(self, error: SemanticError):
+        self.stream.write(json.dumps(self.record(error), ensure_ascii=False) + "\n")
+        self.stream.flush()
+        self.count += 1
+    
+    def end(self):
+        """Write whatever follows the last diagnostic"""
+        self.stream.flush()
+    
+    def record(self, error: SemanticError) -> dict:
+        return {'file': self.path, 'line': error.line, 'column': error.column, 'message': error.message}
+
+
+class SarifWriter(JsonLinesWriter):
+    """Writes a SARIF 2.1.0 log with one run whose results are streamed.
+    
+    The log is a single JSON document: begin() writes everything up to the
+    results array, each diagnostic is written as one element of it, and end()
+    closes the document.
+    """
+    
+    def begin(self):
+        header = json.dumps({
+            '$schema': SARIF_SCHEMA,
+            'version': SARIF_VERSION,
+            'runs': [{'tool': {'driver': {'name': TOOL_NAME, 'version': ANALYZER_VERSION}}, 'results': []}],
+        })
+        # Cut the document open at the empty results array
+        self.stream.write(header[:header.rindex('[]') + 1] + "\n")
+        self.stream.flush()
+    
+    def write(self, error: SemanticError):
+        separator = "," if self.count else ""
+        self.stream.write(f"{separator}{json.dumps(self.record(error), ensure_ascii=False)}\n")
+        self.stream.flush()
+        self.count += 1
+    
+    def end(self):
+        self.stream.write("]}]}\n")
+        self.stream.flush()
+    
+    def record(self, error: SemanticError) -> dict:
+        return {
+            'level': 'error',
+            'message': {'text': error.message},
+            'locations': [{'physicalLocation': {
+                'artifactLocation': {'uri': self.path.replace(os.sep, '/')},
+                'region': {'startLine': error.line, 'startColumn': error.column},
+            }}],
+        }
+
+
+DIAGNOSTIC_WRITERS = {
+    'jsonl': JsonLinesWriter,
+    'sarif': SarifWriter,
+}
+
+
+def diagnostic_writer(output_format: str, stream: TextIO, path: str) -> Optional[JsonLinesWriter]:
+    """The writer for output_format, or None for the plain text report"""
+    writer_class = DIAGNOSTIC_WRITERS.get(output_format)
+    return writer_class(stream, path) if writer_class else None
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Análisis Incremental - Edwin Espinal
+Autor: Edwin Espinal
+Descripción: Vuelve a analizar solo la parte editada de un documento, reutilizando los
+tokens y resultados de las sentencias de nivel superior que no cambiaron.
+"""
+
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from semantic_analyzer import (
+    LineIndex, Lexer, NameTable, SemanticError, StreamingSemanticAnalyzer, Symbol, SymbolTable, Token, TokenType,
+    format_symbol_table_report,
+)
+
+
+# Block size for comparing the old and new text when looking for the edit
+COMPARE_BLOCK = 1 << 16
+
+
+def common_prefix_length(a: str, b: str) -> int:
+    """Length of the common prefix of a and b, comparing whole blocks at C speed"""
+    limit = min(len(a), len(b))
+    position = 0
+    while position < limit and a[position:position + COMPARE_BLOCK] == b[position:position + COMPARE_BLOCK]:
+        position += COMPARE_BLOCK
+    position = min(position, limit)
+    end = min(position + COMPARE_BLOCK, limit)
+    while position < end and a[position] == b[position]:
+        position += 1
+    return position
+
+
+def common_suffix_length(a: str, b: str, limit: int) -> int:
+    """Length of the common suffix of a and b, at most limit characters"""
+    length = 0
+    while (length < limit and
+           a[len(a) - length - COMPARE_BLOCK:len(a) - length] == b[len(b) - length - COMPARE_BLOCK:len(b) - length]
+           and length + COMPARE_BLOCK <= min(len(a), len(b))):
+        length += COMPARE_BLOCK
+    length = min(length, limit)
+    while length < limit and a[len(a) - length - 1] == b[len(b) - length - 1]:
+        length += 1
+    return length
+
+
+def token_extent_start(token_type: TokenType, value_start: int) -> int:
+    """Offset where a token begins, given the start of its value (strings skip the quote)"""
+    return value_start - 1 if token_type == TokenType.STRING else value_start
+
+
+def token_reach(token: Token) -> int:
+    """Offset just past a token, counting a string's closing quote even when it is missing"""
+    return token.offset + len(token.value) + (2 if token.type == TokenType.STRING else 0)
+
+
+class StatementChunk:
+    """Tokens and analysis results of one top-level statement.
+    
+    The last chunk of a document holds only the EOF token. journal lists the
+    changes the statement made to the global scope, so they can be undone
+    and replayed: ('declare', symbol, signature) or ('init', name). reach is
+    the end of the furthest token the analysis read, which may belong to a
+    later statement: an edit before reach can change the chunk's results.
+    """
+    
+    __slots__ = ('start', 'captured_start', 'reach', 'tokens', 'errors', 'journal')
+    
+    def __init__(self, tokens: List[Token], errors: List[SemanticError], journal: List[tuple], reach: int):
+        self.start = tokens[0].offset           # offset of the first token
+        self.captured_start = self.start        # offset of the first token as stored in tokens
+        self.reach = reach
+        self.tokens = tokens
+        self.errors = errors
+        self.journal = journal
+    
+    def shift(self, offset_delta: int, line_delta: int):
+        """Move the chunk after an edit that happened before it on an earlier line"""
+        self.start += offset_delta
+        self.reach += offset_delta
+        if line_delta:
+            for error in self.errors:
+                error.line += line_delta
+            for entry in self.journal:
+                if entry[0] == 'declare':
+                    entry[1].line += line_delta
+    
+    def current_tokens(self, offset_delta: int = 0) -> Iterator[Token]:
+        """Yield the tokens at their offsets in the current text, moved by offset_delta"""
+        delta = self.start - self.captured_start + offset_delta
+        if not delta:
+            yield from self.tokens
+            return
+        for token in self.tokens:
+            yield Token(token.type, token.value, token.offset + delta, token.lines)
+
+
+def symbol_signature(symbol: Symbol) -> tuple:
+    """Everything about a global symbol that later statements can observe"""
+    return (symbol.data_type, symbol.is_function, symbol.return_type,
+            tuple(symbol.parameters or ()), symbol.is_initialized)
+
+
+class EffectComparison:
+    """Compares the net global scope changes of the old and new statements after an edit.
+    
+    Both sides start from the same global scope, so once their effects
+    (name -> signature) are equal the remaining old statements can be reused.
+    Differing names are tracked as entries are added, so each check is O(1).
+    """
+    
+    def __init__(self, global_scope: Dict[str, Symbol]):
+        self.global_scope = dict(global_scope)
+        self.old: Dict[str, tuple] = {}
+        self.new: Dict[str, tuple] = {}
+        self.differences = set()
+    
+    def add(self, chunk: StatementChunk, effect: Dict[str, tuple], other: Dict[str, tuple]):
+        for entry in chunk.journal:
+            if entry[0] == 'declare':
+                name, signature = entry[1].name, entry[2]
+            else:
+                name = entry[1]
+                signature = effect.get(name)
+                if signature is None:
+                    # Declared before the edit, so only is_initialized changes
+                    signature = symbol_signature(self.global_scope[name])
+                signature = signature[:-1] + (True,)
+            effect[name] = signature
+            if other.get(name) == signature:
+                self.differences.discard(name)
+            else:
+                self.differences.add(name)
+    
+    def add_old(self, chunk: StatementChunk):
+        self.add(chunk, self.old, self.new)
+    
+    def add_new(self, chunk: StatementChunk):
+        self.add(chunk, self.new, self.old)
+    
+    def equal(self) -> bool:
+        return not self.differences
+
+
+class JournaledSemanticAnalyzer(StreamingSemanticAnalyzer):
+    """Streaming analyzer that records its changes to the global scope"""
+    
+    def __init__(self, tokens, symbol_table: SymbolTable):
+        super().__init__(tokens, symbol_table)
+        self.journal: List[tuple] = []
+    
+    def declare_symbol(self, symbol: Symbol) -> bool:
+        # Journaled as it happens, so a function body's changes to the
+        # function's own symbol come after its declaration
+        declared = super().declare_symbol(symbol)
+        if declared and self.symbol_table.current_scope == 0:
+            self.journal.append(('declare', symbol, symbol_signature(symbol)))
+        return declared
+    
+    def mark_initialized(self, symbol: Symbol):
+        if not symbol.is_initialized and self.symbol_table.scopes[0].get(symbol.name) is symbol:
+            self.journal.append(('init', symbol.name))
+        super().mark_initialized(symbol)
+
+
+class IncrementalAnalyzer:
+    """Re-analyzes a document after an edit, reusing unchanged top-level statements.
+    
+    The document is kept as a list of StatementChunk. After an edit, tokens
+    are re-lexed from the first statement whose analysis read up to the edit
+    until the new token
+    stream lines up with the old one again, and statements are re-analyzed
+    until one starts past the edit with the global scope in the same state
+    as before; from there on the old chunks are reused, only moved.
+    """
+    
+    def __init__(self):
+        self.text = ""
+        # Updated in place with each edit; every token refers to it
+        self.lines = LineIndex()
+        self.chunks: List[StatementChunk] = []
+        self.symbol_table = SymbolTable()
+        # Shared by every version of the document, so reused and re-lexed
+        # tokens hold the same str for a name
+        self.names = NameTable()
+        self.errors: List[SemanticError] = []
+        self.token_count = 0
+        self.relexed_tokens = 0
+        self.reanalyzed_statements = 0
+        self.reused_statements = 0
+    
+    def update(self, text: str, cancelled: Optional[Callable[[], bool]] = None) -> Optional[List[SemanticError]]:
+        """Bring the analysis up to date with text and return all errors.
+        
+        cancelled is polled between statements; once it returns True the
+        previous analysis is restored and None is returned, so the next
+        update can still reuse it.
+        """
+        old_text = self.text
+        if self.chunks and text == old_text:
+            self.relexed_tokens = self.reanalyzed_statements = 0
+            self.reused_statements = len(self.chunks) - 1
+            return self.errors
+        
+        # Edited region: old_text[prefix:old_end] was replaced by text[prefix:new_end]
+        prefix = common_prefix_length(old_text, text)
+        suffix = common_suffix_length(old_text, text, min(len(old_text), len(text)) - prefix)
+        old_end = len(old_text) - suffix
+        new_end = len(text) - suffix
+        
+        # Start at the first statement whose analysis read up to the edit: the
+        # edit may extend the token that ends it, or change tokens it read
+        # past its end, such as the lookahead of an undefined assignment
+        first = self.chunk_at(prefix)
+        while first > 0 and self.chunks[first - 1].reach >= prefix:
+            first -= 1
+        
+        self.rollback(self.chunks[first:])
+        self.text = text
+        self.lines.update(text, prefix, old_end, new_end)
+        if not self.reanalyze(first, old_text, prefix, old_end, new_end, cancelled):
+            self.text = old_text
+            self.lines.update(old_text, prefix, new_end, old_end)
+            return None
+        
+        self.errors = [error for chunk in self.chunks for error in chunk.errors]
+        self.token_count = sum(len(chunk.tokens) for chunk in self.chunks)
+        return self.errors
+    
+    def chunk_at(self, offset: int) -> int:
+        """Index of the last chunk starting at or before offset"""
+        low, high = 0, len(self.chunks)
+        while low < high:
+            middle = (low + high) // 2
+            if self.chunks[middle].start <= offset:
+                low = middle + 1
+            else:
+                high = middle
+        return max(0, low - 1)
+    
+    def rollback(self, chunks: List[StatementChunk]):
+        """Undo the global scope changes made by chunks"""
+        global_scope = self.symbol_table.scopes[0]
+        for chunk in reversed(chunks):
+            for entry in reversed(chunk.journal):
+                if entry[0] == 'declare':
+                    del global_scope[entry[1].name]
+                else:
+                    global_scope[entry[1]].is_initialized = False
+        self.symbol_table.version += 1
+    
+    def replay(self, chunks: List[StatementChunk]):
+        """Reapply the global scope changes of chunks that are reused as they are"""
+        global_scope = self.symbol_table.scopes[0]
+        for chunk in chunks:
+            for entry in chunk.journal:
+                if entry[0] == 'declare':
+                    global_scope[entry[1].name] = entry[1]
+                else:
+                    global_scope[entry[1]].is_initialized = True
+        self.symbol_table.version += 1
+    
+    def reanalyze(self, first: int, old_text: str, prefix: int, old_end: int, new_end: int,
+                  cancelled: Optional[Callable[[], bool]] = None) -> bool:
+        """Re-analyze from chunks[first]; returns False if cancelled, leaving the chunks as they were"""
+        old_chunks = self.chunks
+        offset_delta = new_end - old_end
+        line_delta = self.text.count('\n', prefix, new_end) - old_text.count('\n', prefix, old_end)
+        
+        # Old chunks starting on a line after the edit can be reused as they are
+        line_after_edit = old_text.find('\n', old_end)
+        reusable_from = len(old_text) + 1 if line_after_edit == -1 else line_after_edit + 1
+        
+        fed: List[Token] = []
+        boundaries: Dict[int, int] = {}  # stream position -> index of the old chunk starting there
+        
+        # The first chunk starts at its first token, and the edit may be in the text before it
+        start = old_chunks[first].start if 0 < first < len(old_chunks) else 0
+        
+        def feed():
+            # Re-lex from the first affected statement until the token starts
+            # line up with the old stream again, past the edit
+            old_stream = self.old_token_starts(first)
+            old_start, old_chunk, old_index = next(old_stream, (None, None, None))
+            lexer = Lexer(self.text, engine='regex', lines=self.lines)
+            aligned = None
+            text = self.text
+            lines = self.lines
+            canonical = self.names.canonical.setdefault
+            for token_type, value_start, value_end in lexer.scan_regex_spans(start):
+                token_start = token_extent_start(token_type, value_start)
+                if token_start >= new_end:
+                    while old_start is not None and old_start + offset_delta < token_start:
+                        old_start, old_chunk, old_index = next(old_stream, (None, None, None))
+                    if old_start is not None and old_start + offset_delta == token_start and old_start >= old_end:
+                        aligned = (old_chunk, old_index)
+                        break
+                self.relexed_tokens += 1
+                value = text[value_start:value_end]
+                if token_type is TokenType.IDENTIFIER:
+                    value = canonical(value, value)
+                fed.append(Token(token_type, value, token_start, lines))
+                yield fed[-1]
+            if aligned is None:
+                return
+            
+            # Continue with the old tokens, moved by the edit
+            chunk_index, token_index = aligned
+            for index in range(chunk_index, len(old_chunks)):
+                chunk = old_chunks[index]
+                if token_index == 0 and chunk.start >= reusable_from:
+                    boundaries[len(fed)] = index
+                for token in list(chunk.current_tokens(offset_delta))[token_index:]:
+                    fed.append(token)
+                    yield token
+                token_index = 0
+        
+        self.relexed_tokens = 0
+        self.reanalyzed_statements = 0
+        analyzer = JournaledSemanticAnalyzer(feed(), self.symbol_table)
+        new_chunks: List[StatementChunk] = []
+        effects = EffectComparison(self.symbol_table.scopes[0])
+        compared_old = first
+        
+        while True:
+            chunk_position = analyzer.position
+            old_index = boundaries.get(chunk_position)
+            if old_index is not None:
+                for chunk in old_chunks[compared_old:old_index]:
+                    effects.add_old(chunk)
+                compared_old = old_index
+            if old_index is not None and effects.equal():
+                reused = old_chunks[old_index:]
+                for chunk in reused:
+                    chunk.shift(offset_delta, line_delta)
+                self.replay(reused)
+                self.chunks = old_chunks[:first] + new_chunks + reused
+                self.reused_statements = len(self.chunks) - len(new_chunks) - 1
+                return True
+            
+            if analyzer.current_token().type == TokenType.EOF:
+                end = analyzer.position + 1
+                new_chunks.append(StatementChunk(fed[chunk_position:end], [], [], token_reach(fed[end - 1])))
+                self.chunks = old_chunks[:first] + new_chunks
+                self.reused_statements = first
+                return True
+            
+            if cancelled is not None and cancelled():
+                self.rollback(new_chunks)
+                self.replay(old_chunks[first:])
+                return False
+            
+            error_count = len(analyzer.errors)
+            journal_length = len(analyzer.journal)
+            analyzer.analyze_top_level_statement()
+            self.reanalyzed_statements += 1
+            
+            end = analyzer.position
+            # Every token pulled into the lookahead window counts as read
+            new_chunks.append(StatementChunk(fed[chunk_position:end], analyzer.errors[error_count:],
+                                             analyzer.journal[journal_length:],
+                                             token_reach(fed[analyzer.tokens_read - 1])))
+            effects.add_new(new_chunks[-1])
+    
+    def old_token_starts(self, first: int) -> Iterator[Tuple[int, int, int]]:
+        """Yield (offset, chunk index, token index) for old tokens from chunks[first:]"""
+        for index in range(first, len(self.chunks)):
+            chunk = self.chunks[index]
+            for token_index, token in enumerate(chunk.current_tokens()):
+                yield token.offset, index, token_index
+    
+    def get_symbol_table_report(self) -> str:
+        return format_symbol_table_report(self.symbol_table.scopes[0])
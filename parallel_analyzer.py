@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Análisis Paralelo de Funciones - Edwin Espinal
+Autor: Edwin Espinal
+Descripción: Analiza un único archivo grande repartiendo los cuerpos de sus funciones
+entre varios procesos, una vez conocidas las declaraciones globales.
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from batch_analyzer import map_in_pool
+from semantic_analyzer import (
+    TOKEN_TYPE_IDS, DataType, Lexer, SemanticAnalyzer, SemanticError, Symbol, SymbolTable, TokenBuffer,
+    TokenType,
+)
+
+
+LBRACE_ID = TOKEN_TYPE_IDS[TokenType.LBRACE]
+RBRACE_ID = TOKEN_TYPE_IDS[TokenType.RBRACE]
+
+
+@dataclass
+class FunctionBody:
+    """A top-level function body left for a worker by the declaration pass"""
+    start: int  # index of the '{' token
+    end: int  # index where analyze_block would leave the analyzer
+    visible_globals: int  # globals declared before the body, the function included
+    return_type: DataType
+    parameters: List[Symbol] = field(default_factory=list)
+    error_index: int = 0  # where the body's errors go in the declaration pass' error list
+
+
+class DeclarationPass(SemanticAnalyzer):
+    """Analyzes top-level statements and function headers, skipping top-level function bodies.
+    
+    Skipped bodies are recorded in bodies. Braces are matched on the type ids
+    of a TokenBuffer, so skipping costs no Token objects.
+    """
+    
+    def __init__(self, tokens: TokenBuffer):
+        super().__init__(tokens)
+        self.bodies: List[FunctionBody] = []
+    
+    def analyze_function_body(self):
+        symbol_table = self.symbol_table
+        if symbol_table.current_scope != 1:
+            # Functions declared inside blocks are analyzed in place
+            super().analyze_function_body()
+            return
+        
+        start = self.position
+        types = self.tokens.types
+        last = len(types) - 1
+        position = start
+        depth = 0
+        while position < last:
+            type_id = types[position]
+            position += 1
+            if type_id == LBRACE_ID:
+                depth += 1
+            elif type_id == RBRACE_ID:
+                depth -= 1
+                if depth == 0:
+                    break
+        self.position = min(position, last)
+        
+        self.bodies.append(FunctionBody(start, self.position, len(symbol_table.scopes[0]),
+                                        self.current_function_return_type,
+                                        list(symbol_table.get_current_scope_symbols().values()),
+                                        len(self.errors)))
+
+
+class SnapshotSymbolTable(SymbolTable):
+    """Symbol table over a read-only copy of the global scope.
+    
+    Globals are kept in declaration order and only the first visible ones can
+    be looked up, so a function body sees the globals it would see when the
+    whole file is analyzed in order. The global scope itself stays empty.
+    """
+    
+    def __init__(self, global_symbols: List[Symbol]):
+        super().__init__()
+        self.globals = {symbol.name: (index, symbol) for index, symbol in enumerate(global_symbols)}
+        self.visible = len(global_symbols)
+    
+    def reset(self, visible: int):
+        """Close every scope and show only the first visible globals"""
+        self.scopes = [{}]
+        self.current_scope = 0
+        self.visible = visible
+        self.version += 1
+    
+    def lookup_symbol(self, name: str) -> Optional[Symbol]:
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        entry = self.globals.get(name)
+        if entry is not None and entry[0] < self.visible:
+            return entry[1]
+        return None
+    
+    def is_global(self, symbol: Symbol) -> bool:
+        entry = self.globals.get(symbol.name)
+        return entry is not None and entry[1] is symbol
+
+
+class BodyAnalyzer(SemanticAnalyzer):
+    """Analyzes one function body against a SnapshotSymbolTable, recording the globals it initializes"""
+    
+    def __init__(self, tokens: TokenBuffer, symbol_table: SnapshotSymbolTable):
+        super().__init__(tokens, symbol_table)
+        self.initialized_globals: List[str] = []
+    
+    def mark_initialized(self, symbol: Symbol):
+        if not symbol.is_initialized and self.symbol_table.is_global(symbol):
+            self.initialized_globals.append(symbol.name)
+        super().mark_initialized(symbol)
+
+
+# Tokens and global snapshot of this worker process, set by start_worker
+worker_state: Optional[Tuple[TokenBuffer, SnapshotSymbolTable]] = None
+
+
+def start_worker(text: str, columns: tuple, global_symbols: List[Symbol]):
+    """Rebuild the token buffer and global snapshot once per worker process"""
+    global worker_state
+    worker_state = TokenBuffer.from_columns(text, *columns), SnapshotSymbolTable(global_symbols)
+
+
+def stop_worker():
+    """Drop the worker state, which stays set in this process after an in-process run"""
+    global worker_state
+    worker_state = None
+
+
+def analyze_body(body: FunctionBody) -> Tuple[List[Tuple[str, int, int]], List[str], int]:
+    """Analyze one function body in a worker.
+    
+    Returns its errors as (message, line, column), the names of the globals
+    it initialized and the position where the analysis stopped.
+    """
+    tokens, symbol_table = worker_state
+    symbol_table.reset(body.visible_globals)
+    analyzer = BodyAnalyzer(tokens, symbol_table)
+    analyzer.in_function = True
+    analyzer.current_function_return_type = body.return_type
+    
+    symbol_table.enter_scope()
+    for parameter in body.parameters:
+        symbol_table.declare_symbol(parameter)
+    analyzer.position = body.start
+    analyzer.analyze_block()
+    
+    errors = [(error.message, error.line, error.column) for error in analyzer.errors]
+    return errors, analyzer.initialized_globals, analyzer.position
+
+
+def analyze_in_parallel(source, workers: Optional[int] = None) -> Tuple[int, SemanticAnalyzer]:
+    """Analyze source with its top-level function bodies spread over a process pool.
+    
+    A first pass analyzes everything but those bodies and collects the global
+    scope; each body is then analyzed by a worker holding a snapshot of it.
+    Errors are merged back in the order a sequential analysis reports them,
+    and globals initialized inside bodies are marked in the global scope.
+    If a body does not end at its matching '}' (e.g. an unterminated
+    statement swallows it), the file is analyzed sequentially instead.
+    
+    Returns the token count and an analyzer whose errors and symbol table
+    hold the results, like syntax_tree.analyze_source.
+    """
+    if not isinstance(source, str):
+        source = source[:].decode('utf-8')
+    tokens = Lexer(source).tokenize_buffer()
+    
+    analyzer = DeclarationPass(tokens)
+    analyzer.analyze()
+    bodies = analyzer.bodies
+    if not bodies:
+        return len(tokens), analyzer
+    
+    global_scope = analyzer.symbol_table.get_current_scope_symbols()
+    columns = (tokens.types, tokens.starts, tokens.ends, tokens.lines)
+    try:
+        results = list(map_in_pool(analyze_body, bodies, workers, initializer=start_worker,
+                                   initargs=(source, columns, list(global_scope.values()))))
+    finally:
+        stop_worker()
+    
+    if any(end != body.end for body, (_, _, end) in zip(bodies, results)):
+        analyzer = SemanticAnalyzer(tokens)
+        analyzer.analyze()
+        return len(tokens), analyzer
+    
+    errors = []
+    merged = 0
+    for body, (body_errors, initialized_globals, _) in zip(bodies, results):
+        errors.extend(analyzer.errors[merged:body.error_index])
+        merged = body.error_index
+        errors.extend(SemanticError(message, line, column) for message, line, column in body_errors)
+        for name in initialized_globals:
+            global_scope[name].is_initialized = True
+    errors.extend(analyzer.errors[merged:])
+    analyzer.errors = errors
+    
+    return len(tokens), analyzer
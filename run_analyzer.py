@@ -7,8 +7,7 @@ Descripción: Proporciona opciones para ejecutar el analizador sintáctico en mo
 
 import sys
 import os
-import subprocess
-from pathlib import Path
+from contextlib import redirect_stdout
 
 
 def print_banner():
@@ -27,7 +26,14 @@ def print_help():
     print()
     print("OPTIONS:")
     print("  -g, --gui          Launch GUI interface (default)")
-    print("  -c, --cli <file>   Run CLI analysis on file")
+    print("  -c, --cli <file> [analyzer options]")
+    print("                     Run CLI analysis on file; options such as --mmap")
+    print("                     are passed to semantic_analyzer.py")
+    print("  -b, --batch <paths...> [-j N]")
+    print("                     Analyze files, directories or globs in parallel")
+    print("  -s, --serve [--socket PATH]")
+    print("                     Keep the analyzer running and answer JSON-RPC requests")
+    print("                     on stdin/stdout or on a Unix socket")
     print("  -t, --test         Run tests on sample files")
     print("  -h, --help         Show this help message")
     print()
@@ -35,6 +41,9 @@ def print_help():
     print("  python run_analyzer.py                    # Launch GUI")
     print("  python run_analyzer.py -g                 # Launch GUI")
     print("  python run_analyzer.py -c test.txt        # Analyze test.txt")
+    print("  python run_analyzer.py -c big.txt --mmap  # Analyze a memory-mapped file")
+    print("  python run_analyzer.py -b src/ -j 8       # Analyze a project with 8 workers")
+    print("  python run_analyzer.py --serve            # Serve requests on stdin/stdout")
     print("  python run_analyzer.py -t                 # Run tests")
     print()
 
@@ -54,103 +63,90 @@ def run_gui():
         sys.exit(1)
 
 
-def run_cli(filename):
+def streams_diagnostics(options) -> bool:
+    """Whether analyzer options select a --format that writes diagnostics to stdout"""
+    output_format = 'text'
+    for index, option in enumerate(options):
+        if option == '--format' and index + 1 < len(options):
+            output_format = options[index + 1]
+        elif option.startswith('--format='):
+            output_format = option.split('=', 1)[1]
+    return output_format != 'text'
+
+
+def run_cli(filename, options=()):
     """Run CLI analysis on a file"""
+    # With --format jsonl or sarif, stdout carries only the diagnostics
+    messages = sys.stderr if streams_diagnostics(options) else sys.stdout
     if not filename:
-        print("Error: Please specify a file to analyze")
+        print("Error: Please specify a file to analyze", file=messages)
         sys.exit(1)
     
     if not os.path.exists(filename):
-        print(f"Error: File '{filename}' not found")
+        print(f"Error: File '{filename}' not found", file=messages)
         sys.exit(1)
     
-    print(f"Analyzing file: {filename}")
-    print("-" * 40)
+    print(f"Analyzing file: {filename}", file=messages)
+    print("-" * 40, file=messages)
     
     try:
         from semantic_analyzer import main as cli_main
         # Temporarily modify sys.argv to pass the filename
         original_argv = sys.argv
-        sys.argv = ['semantic_analyzer.py', filename]
+        sys.argv = ['semantic_analyzer.py', filename, *options]
         cli_main()
         sys.argv = original_argv
     except Exception as e:
-        print(f"Error during analysis: {e}")
+        print(f"Error during analysis: {e}", file=messages)
         sys.exit(1)
 
 
+def run_batch(arguments):
+    """Run batch analysis over files, directories or globs"""
+    from batch_analyzer import main as batch_main
+    batch_main(arguments)
+
+
+def run_server(arguments):
+    """Serve analysis requests until shutdown"""
+    from analysis_server import main as server_main
+    server_main(arguments)
+
+
 def run_tests():
     """Run tests on sample files"""
-    print("Running tests on sample files...")
-    print()
-    
-    test_files = [
-        ("test_with_errors.txt", "File with semantic errors"),
-        ("test_no_errors.txt", "File without errors")
-    ]
-    
-    for filename, description in test_files:
-        if os.path.exists(filename):
-            print(f"Testing: {description}")
-            print(f"File: {filename}")
-            print("-" * 50)
-            
-            try:
-                from semantic_analyzer import Lexer, SemanticAnalyzer
-                
-                with open(filename, 'r') as f:
-                    source_code = f.read()
-                
-                # Tokenize
-                lexer = Lexer(source_code)
-                tokens = lexer.tokenize()
-                
-                # Analyze
-                analyzer = SemanticAnalyzer(tokens)
-                errors = analyzer.analyze()
-                
-                print(f"Tokens processed: {len(tokens)}")
-                
-                if errors:
-                    print(f"Errors found: {len(errors)}")
-                    for i, error in enumerate(errors[:5], 1):  # Show first 5 errors
-                        print(f"  {i}. {error}")
-                    if len(errors) > 5:
-                        print(f"  ... and {len(errors) - 5} more errors")
-                else:
-                    print("✓ No semantic errors found!")
-                
-                print()
-                
-            except Exception as e:
-                print(f"Error testing {filename}: {e}")
-                print()
-        else:
-            print(f"Warning: Test file '{filename}' not found")
-            print()
+    from analyzer_checks import run_tests as run_checks
+    run_checks()
 
 
 def check_dependencies():
-    """Check if required dependencies are available"""
-    try:
-        import tkinter
-        gui_available = True
-    except ImportError:
-        gui_available = False
+    """Check if required dependencies are available.
     
-    return gui_available
+    tkinter is only located, not imported: CLI runs should not pay for it.
+    """
+    from importlib.machinery import PathFinder
+    return (PathFinder.find_spec('tkinter') is not None and
+            ('_tkinter' in sys.builtin_module_names or PathFinder.find_spec('_tkinter') is not None))
 
 
 def main():
     """Main launcher function"""
-    print_banner()
+    if len(sys.argv) > 1 and sys.argv[1] in ['-s', '--serve']:
+        # stdout carries the responses, so nothing else may be printed
+        run_server(sys.argv[2:])
+        return
     
-    gui_available = check_dependencies()
-    
-    if not gui_available:
-        print("Note: GUI interface not available (tkinter not found)")
-        print("Only CLI mode is available.")
-        print()
+    cli_options = sys.argv[3:] if sys.argv[1:2] in (['-c'], ['--cli']) else []
+    # With --format jsonl or sarif, stdout carries only the diagnostics
+    with redirect_stdout(sys.stderr if streams_diagnostics(cli_options) else sys.stdout):
+        print_banner()
+        
+        gui_available = check_dependencies()
+        
+        if not gui_available:
+            print("Note: GUI interface not available (tkinter not found)")
+            print("Only CLI mode is available.")
+            print()
     
     # Parse command line arguments
     if len(sys.argv) == 1:
@@ -182,16 +178,16 @@ def main():
             # Assume it's a filename for CLI analysis
             run_cli(arg)
     
+    elif sys.argv[1] in ['-c', '--cli']:
+        run_cli(sys.argv[2], sys.argv[3:])
+    
+    elif sys.argv[1] in ['-b', '--batch']:
+        run_batch(sys.argv[2:])
+    
     elif len(sys.argv) == 3:
-        option = sys.argv[1]
-        filename = sys.argv[2]
-        
-        if option in ['-c', '--cli']:
-            run_cli(filename)
-        else:
-            print(f"Error: Unknown option '{option}'")
-            print("Use -h for help")
-            sys.exit(1)
+        print(f"Error: Unknown option '{sys.argv[1]}'")
+        print("Use -h for help")
+        sys.exit(1)
     
     else:
         print("Error: Too many arguments")
@@ -8,72 +8,158 @@ y verificación de declaración de variables para un lenguaje de programación s
 
 import re
 import sys
-from enum import Enum
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass
+from array import array
+from bisect import bisect_right
+from collections import deque
+from enum import Enum, IntEnum, auto
+from typing import Dict, List, Optional, Any, Tuple, Iterable, Iterator, Deque, Callable
 
 
-class TokenType(Enum):
+# Part of the analysis cache key: bump whenever the tokens, diagnostics or
+# symbol table produced for a given source can change
+ANALYZER_VERSION = "1.4"
+
+
+class TokenType(IntEnum):
+    """Token kinds, numbered from 0 in the order below.
+    
+    Kinds compare and hash as the small ints they are, and the number is
+    also the id a TokenBuffer stores for the kind. Spellings are in KEYWORDS
+    and OPERATOR_TOKENS.
+    """
+    
+    def _generate_next_value_(name, start, count, last_values):
+        return count
+    
     # Literals
-    INTEGER = "INTEGER"
-    FLOAT = "FLOAT"
-    STRING = "STRING"
-    BOOLEAN = "BOOLEAN"
+    INTEGER = auto()
+    FLOAT = auto()
+    STRING = auto()
+    BOOLEAN = auto()
     
     # Identifiers
-    IDENTIFIER = "IDENTIFIER"
+    IDENTIFIER = auto()
     
     # Keywords
-    INT = "int"
-    FLOAT_TYPE = "float"
-    STRING_TYPE = "string"
-    BOOL = "bool"
-    IF = "if"
-    ELSE = "else"
-    WHILE = "while"
-    FOR = "for"
-    FUNCTION = "function"
-    RETURN = "return"
-    VAR = "var"
-    TRUE = "true"
-    FALSE = "false"
+    INT = auto()
+    FLOAT_TYPE = auto()
+    STRING_TYPE = auto()
+    BOOL = auto()
+    IF = auto()
+    ELSE = auto()
+    WHILE = auto()
+    FOR = auto()
+    FUNCTION = auto()
+    RETURN = auto()
+    VAR = auto()
+    TRUE = auto()
+    FALSE = auto()
     
     # Operators
-    ASSIGN = "="
-    PLUS = "+"
-    MINUS = "-"
-    MULTIPLY = "*"
-    DIVIDE = "/"
-    MODULO = "%"
-    EQUAL = "=="
-    NOT_EQUAL = "!="
-    LESS_THAN = "<"
-    GREATER_THAN = ">"
-    LESS_EQUAL = "<="
-    GREATER_EQUAL = ">="
-    AND = "&&"
-    OR = "||"
-    NOT = "!"
+    ASSIGN = auto()
+    PLUS = auto()
+    MINUS = auto()
+    MULTIPLY = auto()
+    DIVIDE = auto()
+    MODULO = auto()
+    EQUAL = auto()
+    NOT_EQUAL = auto()
+    LESS_THAN = auto()
+    GREATER_THAN = auto()
+    LESS_EQUAL = auto()
+    GREATER_EQUAL = auto()
+    AND = auto()
+    OR = auto()
+    NOT = auto()
     
     # Delimiters
-    SEMICOLON = ";"
-    COMMA = ","
-    LPAREN = "("
-    RPAREN = ")"
-    LBRACE = "{"
-    RBRACE = "}"
+    SEMICOLON = auto()
+    COMMA = auto()
+    LPAREN = auto()
+    RPAREN = auto()
+    LBRACE = auto()
+    RBRACE = auto()
     
     # Special
-    EOF = "EOF"
-    NEWLINE = "NEWLINE"
+    EOF = auto()
+
+
+class LineIndex:
+    """Offsets where the lines of a source start, for turning offsets into lines and columns.
+    
+    Lookups bisect the offsets, after checking the line of the previous
+    lookup: diagnostics and declarations are mostly read in source order.
+    """
+    
+    def __init__(self, text=''):
+        newline = NEWLINE_PATTERN if isinstance(text, str) else NEWLINE_PATTERN_BYTES
+        self.starts = array('i', [0])
+        self.starts.extend(match.end() for match in newline.finditer(text))
+        self.last_line = 1
+    
+    def line_of(self, offset: int) -> int:
+        starts = self.starts
+        line = self.last_line
+        if not (starts[line - 1] <= offset and (line == len(starts) or offset < starts[line])):
+            line = self.last_line = bisect_right(starts, offset)
+        return line
+    
+    def column_of(self, offset: int) -> int:
+        return offset - self.starts[self.line_of(offset) - 1] + 1
+    
+    def update(self, text: str, prefix: int, old_end: int, new_end: int):
+        """Follow an edit that replaced old_end - prefix characters at prefix with text[prefix:new_end]"""
+        starts = self.starts
+        first = bisect_right(starts, prefix)
+        last = bisect_right(starts, old_end)
+        delta = new_end - old_end
+        inserted = [match.end() for match in NEWLINE_PATTERN.finditer(text, prefix, new_end)]
+        starts[first:] = array('i', inserted) + array('i', [start + delta for start in starts[last:]])
+        self.last_line = 1
+    
+    def nbytes(self) -> int:
+        return self.starts.itemsize * len(self.starts)
 
 
-@dataclass
 class Token:
-    type: TokenType
-    value: str
-    line: int
-    column: int
+    """A token and the offset where it starts in the source (the quote, for strings).
+    
+    Line and column are looked up in the source's LineIndex only when read,
+    so lexing does no line bookkeeping. Without a LineIndex the source is
+    taken to be a single line.
+    """
+    
+    __slots__ = ('type', 'value', 'offset', 'lines')
+    
+    def __init__(self, type: 'TokenType', value: str, offset: int, lines: Optional[LineIndex] = None):
+        self.type = type
+        self.value = value
+        self.offset = offset
+        self.lines = lines
+    
+    @property
+    def line(self) -> int:
+        return 1 if self.lines is None else self.lines.line_of(self.offset)
+    
+    @property
+    def column(self) -> int:
+        return self.offset + 1 if self.lines is None else self.lines.column_of(self.offset)
+    
+    @property
+    def end_line(self) -> int:
+        """Line of the character after the token's value (the closing quote, for strings)"""
+        end = self.offset + len(self.value) + (self.type == TokenType.STRING)
+        return 1 if self.lines is None else self.lines.line_of(end)
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Token):
+            return NotImplemented
+        return (self.type, self.value, self.offset) == (other.type, other.value, other.offset)
+    
+    __hash__ = None
+    
+    def __repr__(self) -> str:
+        return f"Token(type=TokenType.{self.type.name}, value={self.value!r}, line={self.line}, column={self.column})"
 
 
 class DataType(Enum):
@@ -85,16 +171,41 @@ class DataType(Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
 class Symbol:
-    name: str
-    data_type: DataType
-    line: int
-    column: int
-    is_function: bool = False
-    parameters: List[Tuple[str, DataType]] = None
-    return_type: DataType = DataType.VOID
-    is_initialized: bool = False
+    """A declared name and what is known about it.
+    
+    A plain class rather than a dataclass, so importing this module does not
+    pull in dataclasses (and inspect) on every CLI start.
+    """
+    
+    __slots__ = ('name', 'data_type', 'line', 'column', 'is_function', 'parameters', 'return_type',
+                 'is_initialized')
+    
+    def __init__(self, name: str, data_type: DataType, line: int, column: int, is_function: bool = False,
+                 parameters: Optional[List[Tuple[str, DataType]]] = None, return_type: DataType = DataType.VOID,
+                 is_initialized: bool = False):
+        self.name = name
+        self.data_type = data_type
+        self.line = line
+        self.column = column
+        self.is_function = is_function
+        self.parameters = parameters
+        self.return_type = return_type
+        self.is_initialized = is_initialized
+    
+    def fields(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Symbol):
+            return NotImplemented
+        return self.fields() == other.fields()
+    
+    __hash__ = None
+    
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"Symbol({fields})"
 
 
 class SemanticError:
@@ -107,10 +218,59 @@ class SemanticError:
         return f"Error at line {self.line}, column {self.column}: {self.message}"
 
 
+def symbol_to_dict(symbol: Symbol) -> Dict[str, Any]:
+    """Serialize a symbol to JSON-compatible data"""
+    return {
+        'name': symbol.name,
+        'data_type': symbol.data_type.value,
+        'line': symbol.line,
+        'column': symbol.column,
+        'is_function': symbol.is_function,
+        'parameters': None if symbol.parameters is None
+                      else [[name, data_type.value] for name, data_type in symbol.parameters],
+        'return_type': symbol.return_type.value,
+        'is_initialized': symbol.is_initialized,
+    }
+
+
+def symbol_from_dict(data: Dict[str, Any]) -> Symbol:
+    """Rebuild a symbol serialized by symbol_to_dict"""
+    parameters = data['parameters']
+    return Symbol(data['name'], DataType(data['data_type']), data['line'], data['column'],
+                  is_function=data['is_function'],
+                  parameters=None if parameters is None
+                             else [(name, DataType(data_type)) for name, data_type in parameters],
+                  return_type=DataType(data['return_type']),
+                  is_initialized=data['is_initialized'])
+
+
+def format_symbol_table_report(symbols: Dict[str, Symbol]) -> str:
+    """Generate the report for a scope's symbols"""
+    report = "Reporte de Tabla de Símbolos:\n"
+    report += "=" * 50 + "\n"
+    
+    if not symbols:
+        report += "No se encontraron símbolos en el alcance global.\n"
+    else:
+        for name, symbol in symbols.items():
+            report += f"Nombre: {name}\n"
+            report += f"  Tipo: {symbol.data_type.value}\n"
+            report += f"  Línea: {symbol.line}, Columna: {symbol.column}\n"
+            report += f"  Inicializado: {'Sí' if symbol.is_initialized else 'No'}\n"
+            if symbol.is_function:
+                report += f"  Función: Sí\n"
+                report += f"  Tipo de Retorno: {symbol.return_type.value}\n"
+            report += "-" * 30 + "\n"
+    
+    return report
+
+
 class SymbolTable:
     def __init__(self):
         self.scopes: List[Dict[str, Symbol]] = [{}]  # Stack of scopes
         self.current_scope = 0
+        # Bumped whenever a lookup could start returning something else
+        self.version = 0
     
     def enter_scope(self):
         """Enter a new scope"""
@@ -122,6 +282,7 @@ class SymbolTable:
         if self.current_scope > 0:
             self.scopes.pop()
             self.current_scope -= 1
+            self.version += 1
     
     def declare_symbol(self, symbol: Symbol) -> bool:
         """Declare a symbol in current scope"""
@@ -129,6 +290,7 @@ class SymbolTable:
         if symbol.name in current_scope_dict:
             return False  # Already declared in current scope
         current_scope_dict[symbol.name] = symbol
+        self.version += 1
         return True
     
     def lookup_symbol(self, name: str) -> Optional[Symbol]:
@@ -143,28 +305,212 @@ class SymbolTable:
         return self.scopes[self.current_scope]
 
 
+class ScopedSymbolTable(SymbolTable):
+    """Symbol table whose lookups cost O(1) at any nesting depth.
+    
+    Besides the per-scope dicts, each name maps to the stack of its visible
+    declarations, innermost last. Declaring pushes onto that stack and
+    exit_scope pops the names the scope declared, so a lookup is one dict
+    probe and leaving a scope costs O(symbols declared in it).
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.bindings: Dict[str, List[Symbol]] = {}
+    
+    def exit_scope(self):
+        """Exit current scope"""
+        if self.current_scope > 0:
+            bindings = self.bindings
+            for name in self.scopes.pop():
+                shadowed = bindings[name]
+                shadowed.pop()
+                if not shadowed:
+                    del bindings[name]
+            self.current_scope -= 1
+            self.version += 1
+    
+    def declare_symbol(self, symbol: Symbol) -> bool:
+        """Declare a symbol in current scope"""
+        current_scope_dict = self.scopes[self.current_scope]
+        if symbol.name in current_scope_dict:
+            return False  # Already declared in current scope
+        current_scope_dict[symbol.name] = symbol
+        self.bindings.setdefault(symbol.name, []).append(symbol)
+        self.version += 1
+        return True
+    
+    def lookup_symbol(self, name: str) -> Optional[Symbol]:
+        """Look up the innermost visible declaration of name"""
+        shadowed = self.bindings.get(name)
+        return shadowed[-1] if shadowed else None
+
+
+class CountingSymbolTable(SymbolTable):
+    """SymbolTable that counts lookups, the scopes they walk and the deepest nesting (for --profile)"""
+    
+    def __init__(self):
+        super().__init__()
+        self.lookups = 0
+        self.scopes_walked = 0
+        self.max_depth = 0
+    
+    def enter_scope(self):
+        super().enter_scope()
+        if self.current_scope > self.max_depth:
+            self.max_depth = self.current_scope
+    
+    def lookup_symbol(self, name: str) -> Optional[Symbol]:
+        self.lookups += 1
+        walked = 0
+        for scope in reversed(self.scopes):
+            walked += 1
+            if name in scope:
+                self.scopes_walked += walked
+                return scope[name]
+        self.scopes_walked += walked
+        return None
+
+
+class NameTable:
+    """Per-compilation table of identifier names.
+    
+    intern() hands back one shared str per distinct name, so every token and
+    symbol for a name holds the same object: it is stored once, hashed once,
+    and dict probes in the symbol table match it by identity.
+    """
+    
+    def __init__(self):
+        self.canonical: Dict[str, str] = {}
+    
+    def intern(self, name: str) -> str:
+        return self.canonical.setdefault(name, name)
+    
+    def __len__(self) -> int:
+        return len(self.canonical)
+    
+    def __iter__(self) -> Iterator[str]:
+        """Names in order of first appearance"""
+        return iter(self.canonical)
+
+
+# Reserved words, shared by every Lexer
+KEYWORDS = {
+    'int': TokenType.INT,
+    'float': TokenType.FLOAT_TYPE,
+    'string': TokenType.STRING_TYPE,
+    'bool': TokenType.BOOL,
+    'if': TokenType.IF,
+    'else': TokenType.ELSE,
+    'while': TokenType.WHILE,
+    'for': TokenType.FOR,
+    'function': TokenType.FUNCTION,
+    'return': TokenType.RETURN,
+    'var': TokenType.VAR,
+    'true': TokenType.TRUE,
+    'false': TokenType.FALSE,
+}
+
+# Operator and delimiter lexemes, shared by both lexer engines
+OPERATOR_TOKENS = {
+    '==': TokenType.EQUAL,
+    '!=': TokenType.NOT_EQUAL,
+    '<=': TokenType.LESS_EQUAL,
+    '>=': TokenType.GREATER_EQUAL,
+    '&&': TokenType.AND,
+    '||': TokenType.OR,
+    ';': TokenType.SEMICOLON,
+    ',': TokenType.COMMA,
+    '(': TokenType.LPAREN,
+    ')': TokenType.RPAREN,
+    '{': TokenType.LBRACE,
+    '}': TokenType.RBRACE,
+    '+': TokenType.PLUS,
+    '-': TokenType.MINUS,
+    '*': TokenType.MULTIPLY,
+    '/': TokenType.DIVIDE,
+    '%': TokenType.MODULO,
+    '=': TokenType.ASSIGN,
+    '<': TokenType.LESS_THAN,
+    '>': TokenType.GREATER_THAN,
+    '!': TokenType.NOT,
+}
+
+# Spelling of each keyword, operator and delimiter kind, for messages
+TOKEN_LEXEMES: Dict[TokenType, str] = {token_type: lexeme
+                                       for lexeme, token_type in {**KEYWORDS, **OPERATOR_TOKENS}.items()}
+
+# Master pattern for the regex lexer engine. Alternatives never compete for
+# the same first character, except COMMENT, which must be tried before the
+# '/' operator; otherwise they are ordered by how often they occur.
+# Non-ASCII input falls through to OTHER and is handed back to the
+# character readers, which keeps both engines in agreement.
+TOKEN_PATTERN = re.compile(r"""
+    (?P<IDENTIFIER>[A-Za-z_]\w*)
+  | (?P<WHITESPACE>[ \t\r\n]+)
+  | (?P<COMMENT>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<OPERATOR>==|!=|<=|>=|&&|\|\||[;,(){}+\-*/%=<>!])
+  | (?P<NUMBER>[0-9]+(?:\.[0-9]*)?)
+  | (?P<STRING>"[^"]*"?|'[^']*'?)
+  | (?P<OTHER>.)
+""", re.VERBOSE | re.DOTALL)
+
+# Line breaks, for LineIndex
+NEWLINE_PATTERN = re.compile('\n')
+NEWLINE_PATTERN_BYTES = re.compile(b'\n')
+
+# Identifier characters for the character engine's read_identifier
+WORD_PATTERN = re.compile(r'\w+')
+
+# Byte-level variants used when the lexer scans an ASCII buffer such as an mmap
+TOKEN_PATTERN_BYTES = re.compile(TOKEN_PATTERN.pattern.encode('ascii'), re.VERBOSE | re.DOTALL)
+OPERATOR_TOKENS_BYTES = {lexeme.encode('ascii'): token_type for lexeme, token_type in OPERATOR_TOKENS.items()}
+KEYWORDS_BYTES = {word.encode('ascii'): token_type for word, token_type in KEYWORDS.items()}
+
+# Bytes that keep a file from being scanned in place: non-ASCII needs the
+# character readers, and '\r' is translated by text-mode reads
+UNMAPPABLE_BYTES = re.compile(rb'[\x80-\xff\r]')
+
+
+def map_source_file(path: str):
+    """Memory-map a source file for the regex engine.
+    
+    Returns None when the file has to be read as text instead: empty files,
+    and files with non-ASCII bytes or carriage returns.
+    """
+    import mmap
+    
+    with open(path, 'rb') as f:
+        if not f.seek(0, 2):
+            return None
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if UNMAPPABLE_BYTES.search(mapped):
+        mapped.close()
+        return None
+    return mapped
+
+
 class Lexer:
-    def __init__(self, text: str):
+    ENGINES = ('char', 'regex')
+    
+    def __init__(self, text: str, engine: str = 'char', names: Optional[NameTable] = None,
+                 lines: Optional[LineIndex] = None):
+        """text may also be an ASCII bytes-like buffer (see map_source_file) for the regex engine.
+        
+        With a NameTable, identifier values are interned into it. Tokens find
+        their line and column in lines, which is built from text if not given.
+        """
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown lexer engine '{engine}'")
+        if engine == 'char' and not isinstance(text, str):
+            raise ValueError("The character engine only accepts str input")
         self.text = text
+        self.engine = engine
         self.position = 0
-        self.line = 1
-        self.column = 1
+        self.lines = lines if lines is not None else LineIndex(text)
         self.tokens = []
-        self.keywords = {
-            'int': TokenType.INT,
-            'float': TokenType.FLOAT_TYPE,
-            'string': TokenType.STRING_TYPE,
-            'bool': TokenType.BOOL,
-            'if': TokenType.IF,
-            'else': TokenType.ELSE,
-            'while': TokenType.WHILE,
-            'for': TokenType.FOR,
-            'function': TokenType.FUNCTION,
-            'return': TokenType.RETURN,
-            'var': TokenType.VAR,
-            'true': TokenType.TRUE,
-            'false': TokenType.FALSE,
-        }
+        self.names = names
+        self.keywords = KEYWORDS
     
     def current_char(self) -> Optional[str]:
         if self.position >= len(self.text):
@@ -178,169 +524,468 @@ class Lexer:
         return self.text[peek_pos]
     
     def advance(self):
-        if self.position < len(self.text) and self.text[self.position] == '\n':
-            self.line += 1
-            self.column = 1
-        else:
-            self.column += 1
         self.position += 1
     
     def skip_whitespace(self):
-        while self.current_char() and self.current_char() in ' \t\r':
-            self.advance()
+        text = self.text
+        position = self.position
+        while position < len(text) and text[position] in ' \t\r\n':
+            position += 1
+        self.position = position
     
     def read_number(self) -> Token:
-        start_line, start_column = self.line, self.column
-        num_str = ''
+        start = self.position
+        text = self.text
+        end = start
         is_float = False
         
-        while self.current_char() and (self.current_char().isdigit() or self.current_char() == '.'):
-            if self.current_char() == '.':
+        while end < len(text) and (text[end].isdigit() or text[end] == '.'):
+            if text[end] == '.':
                 if is_float:
                     break  # Second dot, stop
                 is_float = True
-            num_str += self.current_char()
-            self.advance()
+            end += 1
         
+        self.position = end
         token_type = TokenType.FLOAT if is_float else TokenType.INTEGER
-        return Token(token_type, num_str, start_line, start_column)
+        return Token(token_type, text[start:end], start, self.lines)
     
     def read_string(self) -> Token:
-        start_line, start_column = self.line, self.column
+        quote_position = self.position
         quote_char = self.current_char()
         self.advance()  # Skip opening quote
         
-        string_value = ''
-        while self.current_char() and self.current_char() != quote_char:
-            string_value += self.current_char()
-            self.advance()
+        start = self.position
+        end = self.text.find(quote_char, start)
+        if end == -1:
+            end = len(self.text)  # Unterminated, runs to the end of the input
+        self.position = end
         
         if self.current_char() == quote_char:
             self.advance()  # Skip closing quote
         
-        return Token(TokenType.STRING, string_value, start_line, start_column)
+        return Token(TokenType.STRING, self.text[start:end], quote_position, self.lines)
     
     def read_identifier(self) -> Token:
-        start_line, start_column = self.line, self.column
-        identifier = ''
-        
-        while self.current_char() and (self.current_char().isalnum() or self.current_char() == '_'):
-            identifier += self.current_char()
-            self.advance()
+        start = self.position
+        # \w matches exactly the characters for which str.isalnum() is true, plus '_'
+        end = WORD_PATTERN.match(self.text, start).end()
+        self.position = end
+        identifier = self.text[start:end]
         
         token_type = self.keywords.get(identifier, TokenType.IDENTIFIER)
-        return Token(token_type, identifier, start_line, start_column)
+        if token_type == TokenType.IDENTIFIER and self.names is not None:
+            identifier = self.names.intern(identifier)
+        return Token(token_type, identifier, start, self.lines)
     
-    def tokenize(self) -> List[Token]:
-        while self.current_char():
+    def skip_comment(self):
+        """Skip a '//' comment up to its newline, or a '/* */' comment up to its end"""
+        text = self.text
+        if self.peek_char() == '/':
+            end = text.find('\n', self.position)
+        else:
+            end = text.find('*/', self.position + 2)
+            if end != -1:
+                end += 2
+        self.position = len(text) if end == -1 else end
+    
+    def read_non_ascii(self) -> Optional[Token]:
+        """Read a token starting at a non-ASCII character, as the character engine does"""
+        char = self.current_char()
+        if char.isdigit():
+            return self.read_number()
+        if char.isalpha():
+            return self.read_identifier()
+        self.advance()  # Unknown character, skip
+        return None
+    
+    def scan_regex(self) -> Iterator[Token]:
+        """Yield tokens using the compiled master pattern instead of per-character reads"""
+        text = self.text
+        lines = self.lines
+        identifier, string = TokenType.IDENTIFIER, TokenType.STRING
+        decode = not isinstance(text, str)
+        canonical = self.names.canonical.setdefault if self.names is not None else None
+        for token_type, start, end in self.scan_regex_spans():
+            value = text[start:end].decode('ascii') if decode else text[start:end]
+            if token_type is identifier and canonical is not None:
+                value = canonical(value, value)
+            yield Token(token_type, value, start - 1 if token_type is string else start, lines)
+    
+    def scan_regex_spans(self, position: int = 0) -> Iterator[Tuple[TokenType, int, int]]:
+        """Yield (type, value start, value end) for each token.
+        
+        The value of every token is text[start:end], so callers that keep the
+        source around do not need a string per token; a string token starts
+        one character before its value, at the quote. Scanning can resume at
+        any token boundary given its offset.
+        """
+        text = self.text
+        if isinstance(text, str):
+            pattern, keywords, operators = TOKEN_PATTERN, self.keywords, OPERATOR_TOKENS
+            high_char, high_lexeme = '\x80', '\x80'
+        else:
+            pattern, keywords, operators = TOKEN_PATTERN_BYTES, KEYWORDS_BYTES, OPERATOR_TOKENS_BYTES
+            high_char, high_lexeme = 0x80, b'\x80'
+        dot = '.' if isinstance(text, str) else b'.'
+        text_length = len(text)
+        identifier, string = TokenType.IDENTIFIER, TokenType.STRING
+        integer, floating = TokenType.INTEGER, TokenType.FLOAT
+        
+        while True:
+            for match in pattern.finditer(text, position):
+                kind = match.lastgroup
+                
+                if kind == 'IDENTIFIER':
+                    yield keywords.get(match.group(), identifier), match.start(), match.end()
+                elif kind == 'WHITESPACE' or kind == 'COMMENT':
+                    continue
+                elif kind == 'OPERATOR':
+                    yield operators[match.group()], match.start(), match.end()
+                elif kind == 'NUMBER':
+                    start, end = match.span()
+                    if end < text_length and text[end] >= high_char:
+                        # Unicode digits may continue the number
+                        position = start
+                        break
+                    yield floating if dot in match.group() else integer, start, end
+                elif kind == 'STRING':
+                    start, end = match.span()
+                    closed = end - start > 1 and text[end - 1] == text[start]
+                    yield string, start + 1, end - 1 if closed else end
+                elif match.group() >= high_lexeme:
+                    position = match.start()
+                    break
+            else:
+                break
+            
+            # Hand non-ASCII input to the character readers, then resume matching
+            self.position = position
+            token = self.read_non_ascii() if text[position] >= '\x80' else self.read_number()
+            if token:
+                yield token.type, position, self.position
+            position = self.position
+        
+        self.position = text_length
+        yield TokenType.EOF, text_length, text_length
+    
+    def scan_chars(self) -> Iterator[Token]:
+        """Yield tokens by reading the input one character at a time"""
+        text = self.text
+        operators = OPERATOR_TOKENS
+        while True:
             self.skip_whitespace()
             
-            if not self.current_char():
+            position = self.position
+            if position >= len(text):
                 break
             
-            char = self.current_char()
+            char = text[position]
             
             # Numbers
             if char.isdigit():
-                self.tokens.append(self.read_number())
+                yield self.read_number()
                 continue
             
             # Strings
             if char in '"\'':
-                self.tokens.append(self.read_string())
+                yield self.read_string()
                 continue
             
             # Identifiers and keywords
             if char.isalpha() or char == '_':
-                self.tokens.append(self.read_identifier())
+                yield self.read_identifier()
                 continue
             
-            # Single character tokens
-            single_char_tokens = {
-                ';': TokenType.SEMICOLON,
-                ',': TokenType.COMMA,
-                '(': TokenType.LPAREN,
-                ')': TokenType.RPAREN,
-                '{': TokenType.LBRACE,
-                '}': TokenType.RBRACE,
-                '+': TokenType.PLUS,
-                '-': TokenType.MINUS,
-                '*': TokenType.MULTIPLY,
-                '/': TokenType.DIVIDE,
-                '%': TokenType.MODULO,
-            }
-            
-            # Two character tokens
-            if char == '=' and self.peek_char() == '=':
-                self.tokens.append(Token(TokenType.EQUAL, '==', self.line, self.column))
-                self.advance()
-                self.advance()
-                continue
-            elif char == '!' and self.peek_char() == '=':
-                self.tokens.append(Token(TokenType.NOT_EQUAL, '!=', self.line, self.column))
-                self.advance()
-                self.advance()
-                continue
-            elif char == '<' and self.peek_char() == '=':
-                self.tokens.append(Token(TokenType.LESS_EQUAL, '<=', self.line, self.column))
-                self.advance()
-                self.advance()
-                continue
-            elif char == '>' and self.peek_char() == '=':
-                self.tokens.append(Token(TokenType.GREATER_EQUAL, '>=', self.line, self.column))
-                self.advance()
-                self.advance()
-                continue
-            elif char == '&' and self.peek_char() == '&':
-                self.tokens.append(Token(TokenType.AND, '&&', self.line, self.column))
-                self.advance()
-                self.advance()
-                continue
-            elif char == '|' and self.peek_char() == '|':
-                self.tokens.append(Token(TokenType.OR, '||', self.line, self.column))
-                self.advance()
-                self.advance()
-                continue
-            elif char in single_char_tokens:
-                self.tokens.append(Token(single_char_tokens[char], char, self.line, self.column))
-                self.advance()
-                continue
-            elif char == '=':
-                self.tokens.append(Token(TokenType.ASSIGN, '=', self.line, self.column))
-                self.advance()
-                continue
-            elif char == '<':
-                self.tokens.append(Token(TokenType.LESS_THAN, '<', self.line, self.column))
-                self.advance()
-                continue
-            elif char == '>':
-                self.tokens.append(Token(TokenType.GREATER_THAN, '>', self.line, self.column))
-                self.advance()
-                continue
-            elif char == '!':
-                self.tokens.append(Token(TokenType.NOT, '!', self.line, self.column))
-                self.advance()
-                continue
-            elif char == '\n':
-                self.tokens.append(Token(TokenType.NEWLINE, '\n', self.line, self.column))
-                self.advance()
+            # Comments
+            if char == '/' and self.peek_char() in ('/', '*'):
+                self.skip_comment()
                 continue
+            
+            # Operators and delimiters, trying the two-character lexeme first
+            lexeme = text[position:position + 2]
+            token_type = operators.get(lexeme)
+            if token_type is None:
+                lexeme = char
+                token_type = operators.get(char)
+            if token_type is not None:
+                yield Token(token_type, lexeme, position, self.lines)
+                self.position = position + len(lexeme)
             else:
                 # Unknown character, skip
                 self.advance()
         
-        self.tokens.append(Token(TokenType.EOF, '', self.line, self.column))
+        yield Token(TokenType.EOF, '', self.position, self.lines)
+    
+    def iter_tokens(self) -> Iterator[Token]:
+        """Yield tokens lazily, ending with EOF, without storing them in self.tokens"""
+        if self.engine == 'regex':
+            return self.scan_regex()
+        return self.scan_chars()
+    
+    def tokenize(self) -> List[Token]:
+        self.tokens.extend(self.iter_tokens())
         return self.tokens
+    
+    def tokenize_buffer(self) -> 'TokenBuffer':
+        """Tokenize into a compact TokenBuffer instead of a list of Token objects.
+        
+        Token spans come from the regex engine, which produces the same tokens
+        as the character engine.
+        """
+        buffer_class = TokenBuffer if isinstance(self.text, str) else ByteTokenBuffer
+        buffer = buffer_class(self.text, self.lines)
+        buffer.extend(self.scan_regex_spans())
+        return buffer
+
+
+# Token types by the small integer id stored in TokenBuffer.types, which is
+# the kind's own value
+TOKEN_TYPES: List[TokenType] = list(TokenType)
+TOKEN_TYPE_IDS: Dict[TokenType, int] = {token_type: int(token_type) for token_type in TOKEN_TYPES}
+
+
+class TokenBuffer:
+    """Struct-of-arrays token storage.
+    
+    Each token costs a type id plus two ints spread over typed arrays, and
+    lines and columns come from one LineIndex for the whole source. Values
+    are not stored: they are sliced from the source text when a token is
+    read, so indexing returns a fresh Token and the buffer can stand in for
+    the List[Token] that SemanticAnalyzer expects.
+    """
+    
+    def __init__(self, text: str, lines: Optional[LineIndex] = None):
+        self.text = text
+        self.lines = lines if lines is not None else LineIndex(text)
+        self.types = array('H')
+        self.starts = array('i')
+        self.ends = array('i')
+    
+    @classmethod
+    def from_columns(cls, text, types, starts, ends, lines: Optional[LineIndex] = None) -> 'TokenBuffer':
+        """Wrap existing columns (arrays or memoryviews, e.g. from token_cache) without copying"""
+        buffer = cls.__new__(cls)
+        buffer.text = text
+        buffer.lines = lines if lines is not None else LineIndex(text)
+        buffer.types = types
+        buffer.starts = starts
+        buffer.ends = ends
+        return buffer
+    
+    def append(self, token_type: TokenType, start: int, end: int):
+        self.types.append(token_type)
+        self.starts.append(start)
+        self.ends.append(end)
+    
+    def extend(self, spans: Iterable[Tuple[TokenType, int, int]]):
+        """Append (type, value start, value end) spans, e.g. from Lexer.scan_regex_spans()"""
+        types, starts, ends = self.types.append, self.starts.append, self.ends.append
+        for token_type, start, end in spans:
+            types(token_type)
+            starts(start)
+            ends(end)
+    
+    def __len__(self) -> int:
+        return len(self.types)
+    
+    def __getitem__(self, index: int) -> Token:
+        token_type = TOKEN_TYPES[self.types[index]]
+        start = self.starts[index]
+        return Token(token_type, self.text[start:self.ends[index]],
+                     start - 1 if token_type is TokenType.STRING else start, self.lines)
+    
+    def __iter__(self) -> Iterator[Token]:
+        for index in range(len(self.types)):
+            yield self[index]
+    
+    def type_at(self, index: int) -> TokenType:
+        return TOKEN_TYPES[self.types[index]]
+    
+    def value_at(self, index: int) -> str:
+        return self.text[self.starts[index]:self.ends[index]]
+    
+    def nbytes(self) -> int:
+        """Memory used by the token columns and the line index, excluding the source text"""
+        return self.lines.nbytes() + sum(column.itemsize * len(column)
+                                         for column in (self.types, self.starts, self.ends))
+
+
+class LazyToken:
+    """Token read from a ByteTokenBuffer; its value is decoded only when accessed"""
+    
+    __slots__ = ('type', 'offset', 'lines', 'source', 'start', 'end')
+    
+    def __init__(self, token_type: TokenType, offset: int, lines: LineIndex, source, start: int, end: int):
+        self.type = token_type
+        self.offset = offset
+        self.lines = lines
+        self.source = source
+        self.start = start
+        self.end = end
+    
+    @property
+    def value(self) -> str:
+        return self.source[self.start:self.end].decode('ascii')
+    
+    @property
+    def line(self) -> int:
+        return self.lines.line_of(self.offset)
+    
+    @property
+    def column(self) -> int:
+        return self.lines.column_of(self.offset)
+    
+    @property
+    def end_line(self) -> int:
+        return self.lines.line_of(self.end)
+
+
+class ByteTokenBuffer(TokenBuffer):
+    """TokenBuffer over an ASCII bytes-like source, such as a memory-mapped file.
+    
+    Indexing returns LazyToken views, so only the values the analyzer actually
+    reads (identifiers it looks up, tokens named in diagnostics) are decoded.
+    """
+    
+    def __getitem__(self, index: int) -> LazyToken:
+        token_type = TOKEN_TYPES[self.types[index]]
+        start = self.starts[index]
+        return LazyToken(token_type, start - 1 if token_type is TokenType.STRING else start, self.lines,
+                         self.text, start, self.ends[index])
+    
+    def value_at(self, index: int) -> str:
+        return self.text[self.starts[index]:self.ends[index]].decode('ascii')
+
+
+# Binary operators by precedence, loosest first; all are left associative
+BINARY_PRECEDENCE: Dict[TokenType, int] = {
+    TokenType.OR: 1,
+    TokenType.AND: 2,
+    TokenType.EQUAL: 3, TokenType.NOT_EQUAL: 3,
+    TokenType.LESS_THAN: 4, TokenType.GREATER_THAN: 4, TokenType.LESS_EQUAL: 4, TokenType.GREATER_EQUAL: 4,
+    TokenType.PLUS: 5, TokenType.MINUS: 5,
+    TokenType.MULTIPLY: 6, TokenType.DIVIDE: 6, TokenType.MODULO: 6,
+}
+
+LITERAL_TYPES: Dict[TokenType, DataType] = {
+    TokenType.INTEGER: DataType.INT,
+    TokenType.FLOAT: DataType.FLOAT,
+    TokenType.STRING: DataType.STRING,
+    TokenType.TRUE: DataType.BOOL,
+    TokenType.FALSE: DataType.BOOL,
+}
+
+ARITHMETIC_OPERATORS = frozenset([TokenType.PLUS, TokenType.MINUS, TokenType.MULTIPLY, TokenType.DIVIDE,
+                                  TokenType.MODULO])
+EQUALITY_OPERATORS = frozenset([TokenType.EQUAL, TokenType.NOT_EQUAL])
+LOGICAL_OPERATORS = frozenset([TokenType.AND, TokenType.OR])
+NUMERIC_TYPES = frozenset([DataType.INT, DataType.FLOAT])
+
+TYPE_KEYWORDS: Dict[TokenType, DataType] = {
+    TokenType.INT: DataType.INT,
+    TokenType.FLOAT_TYPE: DataType.FLOAT,
+    TokenType.STRING_TYPE: DataType.STRING,
+    TokenType.BOOL: DataType.BOOL,
+}
+
+# Tokens that end an expression, and prefix operators
+EXPRESSION_END = frozenset([TokenType.SEMICOLON, TokenType.EOF])
+UNARY_OPERATORS = frozenset([TokenType.NOT, TokenType.MINUS])
+# Tokens that end a block's statements
+BLOCK_END = frozenset([TokenType.RBRACE, TokenType.EOF])
+# Change in parenthesis nesting after each token
+PAREN_DEPTH = {TokenType.LPAREN: 1, TokenType.RPAREN: -1}
+# Tokens where an unrecognized statement stops being skipped
+STATEMENT_END = frozenset([TokenType.SEMICOLON, TokenType.EOF, TokenType.RBRACE])
+# Tokens where analysis resumes after a malformed parameter list
+PARAMETER_LIST_END = frozenset([TokenType.RPAREN, TokenType.LBRACE, TokenType.SEMICOLON, TokenType.EOF])
+
+
+def binary_result_type(operator: TokenType, left: DataType, right: DataType) -> Optional[DataType]:
+    """Type of `left operator right`, or None if the operand types are invalid.
+    
+    Operands of unknown type (already reported, or not checked) are accepted,
+    so one error does not cascade through the rest of the expression.
+    """
+    if operator in ARITHMETIC_OPERATORS:
+        if left == DataType.UNKNOWN or right == DataType.UNKNOWN:
+            return DataType.UNKNOWN
+        if left in NUMERIC_TYPES and right in NUMERIC_TYPES:
+            return DataType.FLOAT if DataType.FLOAT in (left, right) else DataType.INT
+        if operator == TokenType.PLUS and left == right == DataType.STRING:
+            return DataType.STRING
+        return None
+    
+    if left == DataType.UNKNOWN or right == DataType.UNKNOWN:
+        return DataType.BOOL
+    if operator in LOGICAL_OPERATORS:
+        valid = left == right == DataType.BOOL
+    elif operator in EQUALITY_OPERATORS:
+        valid = left == right or (left in NUMERIC_TYPES and right in NUMERIC_TYPES)
+    else:
+        valid = (left in NUMERIC_TYPES and right in NUMERIC_TYPES) or left == right == DataType.STRING
+    return DataType.BOOL if valid else None
+
+
+def is_assignable(target_type: DataType, value_type: DataType) -> bool:
+    """Whether a value of value_type can be stored as target_type (unknown types always can)"""
+    # Allow int to float conversion
+    return (value_type == target_type or value_type == DataType.UNKNOWN or
+            (target_type == DataType.FLOAT and value_type == DataType.INT))
+
+
+def unary_result_type(operator: TokenType, operand: DataType) -> Optional[DataType]:
+    """Type of `operator operand` for '-' and '!', or None if the operand type is invalid"""
+    if operator == TokenType.NOT:
+        return DataType.BOOL if operand in (DataType.BOOL, DataType.UNKNOWN) else None
+    if operand == DataType.UNKNOWN or operand in NUMERIC_TYPES:
+        return operand
+    return None
+
+
+# binary_result_type for every operator and pair of operand types
+BINARY_RESULT_TYPES: Dict[Tuple[TokenType, DataType, DataType], Optional[DataType]] = {
+    (operator, left, right): binary_result_type(operator, left, right)
+    for operator in BINARY_PRECEDENCE for left in DataType for right in DataType
+}
 
 
 class SemanticAnalyzer:
-    def __init__(self, tokens: List[Token]):
+    # Expressions shorter than this are cheaper to infer than to look up
+    EXPRESSION_MEMO_MIN_TOKENS = 3
+    # Entries kept before the memo is cleared, or dropped if it had fewer hits
+    # than entries; 0 disables it
+    EXPRESSION_MEMO_SIZE = 4096
+    
+    def __init__(self, tokens: List[Token], symbol_table: Optional[SymbolTable] = None):
         self.tokens = tokens
         self.position = 0
-        self.symbol_table = SymbolTable()
+        self.symbol_table = symbol_table if symbol_table is not None else SymbolTable()
         self.errors: List[SemanticError] = []
+        # Called with each error as it is found, instead of keeping it in errors
+        self.error_sink: Optional[Callable[[SemanticError], None]] = None
+        self.error_count = 0
         self.current_function_return_type = DataType.VOID
         self.in_function = False
+        # Expression tokens -> [type, symbol table version, (name, symbol) pairs it resolved]
+        self.expression_types: Dict[tuple, list] = {}
+        self.expression_memo_hits = 0
+        self.memoize_expressions = self.EXPRESSION_MEMO_SIZE > 0
+        self.resolved_names: Optional[List[Tuple[str, Symbol]]] = None
+        if isinstance(tokens, ByteTokenBuffer):
+            # Key the memo on source bytes, so LazyToken values stay undecoded
+            self.expression_key = self.source_span_key
+        # By the kind of a statement's first token; other statements are skipped
+        self.statement_handlers: Dict[TokenType, Callable[[], None]] = {
+            TokenType.VAR: self.analyze_variable_declaration,
+            TokenType.FUNCTION: self.analyze_function_declaration,
+            TokenType.IDENTIFIER: self.analyze_identifier_statement,
+            TokenType.IF: self.analyze_if_statement,
+            TokenType.WHILE: self.analyze_while_statement,
+            TokenType.RETURN: self.analyze_return_statement,
+            TokenType.LBRACE: self.analyze_block,
+        }
     
     def current_token(self) -> Token:
         if self.position >= len(self.tokens):
@@ -361,43 +1006,193 @@ class SemanticAnalyzer:
             line = self.current_token().line
         if column is None:
             column = self.current_token().column
-        self.errors.append(SemanticError(message, line, column))
+        self.error_count += 1
+        if self.error_sink is not None:
+            self.error_sink(SemanticError(message, line, column))
+        else:
+            self.errors.append(SemanticError(message, line, column))
     
     def token_type_to_data_type(self, token_type: TokenType) -> DataType:
-        mapping = {
-            TokenType.INT: DataType.INT,
-            TokenType.FLOAT_TYPE: DataType.FLOAT,
-            TokenType.STRING_TYPE: DataType.STRING,
-            TokenType.BOOL: DataType.BOOL,
-        }
-        return mapping.get(token_type, DataType.UNKNOWN)
+        return TYPE_KEYWORDS.get(token_type, DataType.UNKNOWN)
+    
+    def read_expression(self) -> List[Token]:
+        """Consume the tokens of an expression up to its ';' (or EOF)"""
+        tokens = self.tokens
+        position = self.position
+        last = len(tokens) - 1
+        expression = []
+        while position < last:
+            token = tokens[position]
+            if token.type in EXPRESSION_END:
+                break
+            expression.append(token)
+            position += 1
+        self.position = position
+        return expression
     
-    def get_expression_type(self, start_pos: int) -> DataType:
-        """Simplified expression type inference"""
-        saved_pos = self.position
-        self.position = start_pos
+    def get_expression_type(self, tokens: List[Token]) -> DataType:
+        """Infer the type of an expression, reporting undefined names and invalid operands.
         
-        expr_type = DataType.UNKNOWN
+        Expressions without errors are memoized by their tokens. An entry is
+        reused while the symbol table version is unchanged, or after checking
+        that every name it used still resolves to the same symbol.
+        """
+        if len(tokens) < self.EXPRESSION_MEMO_MIN_TOKENS or not self.memoize_expressions:
+            return self.infer_expression_type(tokens)
         
-        token = self.current_token()
+        symbol_table = self.symbol_table
+        key = self.expression_key(tokens)
+        entry = self.expression_types.get(key)
+        if entry is not None:
+            expr_type, version, resolved = entry
+            if version == symbol_table.version:
+                self.expression_memo_hits += 1
+                return expr_type
+            if all(symbol_table.lookup_symbol(name) is symbol for name, symbol in resolved):
+                entry[1] = symbol_table.version
+                self.expression_memo_hits += 1
+                return expr_type
+        
+        error_count = self.error_count
+        self.resolved_names = []
+        expr_type = self.infer_expression_type(tokens)
+        if self.error_count == error_count:
+            if len(self.expression_types) >= self.EXPRESSION_MEMO_SIZE:
+                # Expressions that rarely repeat aren't worth hashing
+                self.memoize_expressions = self.expression_memo_hits >= len(self.expression_types)
+                self.expression_types.clear()
+                self.expression_memo_hits = 0
+            if self.memoize_expressions:
+                self.expression_types[key] = [expr_type, symbol_table.version, self.resolved_names]
+        self.resolved_names = None
+        return expr_type
+    
+    def expression_key(self, tokens: List[Token]) -> tuple:
+        """Memo key of an expression's tokens"""
+        # Values tell tokens apart, except string literals from names or numbers
+        string = TokenType.STRING
+        return tuple([token.value if token.type != string else ('"', token.value) for token in tokens])
+    
+    def source_span_key(self, tokens: List[LazyToken]) -> bytes:
+        """Memo key of an expression read from a ByteTokenBuffer: the source bytes it spans.
         
-        if token.type == TokenType.INTEGER:
-            expr_type = DataType.INT
-        elif token.type == TokenType.FLOAT:
-            expr_type = DataType.FLOAT
-        elif token.type == TokenType.STRING:
-            expr_type = DataType.STRING
-        elif token.type in [TokenType.TRUE, TokenType.FALSE]:
-            expr_type = DataType.BOOL
-        elif token.type == TokenType.IDENTIFIER:
+        The bytes determine the tokens, quotes included; only expressions
+        spaced differently get different keys.
+        """
+        return bytes(tokens[0].source[tokens[0].offset:tokens[-1].end])
+    
+    def infer_expression_type(self, tokens: List[Token]) -> DataType:
+        """Type of the expression at the start of tokens; tokens after it are ignored"""
+        try:
+            return self.infer_binary(tokens, 0, 1)[0]
+        except RecursionError:
+            return DataType.UNKNOWN
+    
+    def infer_binary(self, tokens: List[Token], index: int, min_precedence: int) -> Tuple[DataType, int]:
+        """Precedence climbing over BINARY_PRECEDENCE; returns the type and the index after the operand"""
+        left, index = self.infer_unary(tokens, index)
+        while index < len(tokens):
+            operator = tokens[index]
+            precedence = BINARY_PRECEDENCE.get(operator.type)
+            if precedence is None or precedence < min_precedence:
+                break
+            right, index = self.infer_binary(tokens, index + 1, precedence + 1)
+            result = BINARY_RESULT_TYPES[operator.type, left, right]
+            if result is None:
+                self.add_error(f"Invalid operands for '{operator.value}': {left.value} and {right.value}",
+                               operator.line, operator.column)
+                result = DataType.UNKNOWN
+            left = result
+        return left, index
+    
+    def infer_unary(self, tokens: List[Token], index: int) -> Tuple[DataType, int]:
+        if index >= len(tokens):
+            return DataType.UNKNOWN, index
+        token = tokens[index]
+        token_type = token.type
+        
+        literal_type = LITERAL_TYPES.get(token_type)
+        if literal_type is not None:
+            return literal_type, index + 1
+        
+        if token_type == TokenType.IDENTIFIER:
             symbol = self.symbol_table.lookup_symbol(token.value)
             if symbol:
                 expr_type = symbol.data_type
+                if self.resolved_names is not None:
+                    self.resolved_names.append((token.value, symbol))
             else:
+                expr_type = DataType.UNKNOWN
                 self.add_error(f"Undefined variable '{token.value}'", token.line, token.column)
+            index += 1
+            if index < len(tokens) and tokens[index].type == TokenType.LPAREN:
+                arguments, index = self.infer_arguments(tokens, index + 1)
+                if symbol:
+                    self.check_call(token, symbol, arguments)
+            return expr_type, index
         
-        self.position = saved_pos
-        return expr_type
+        if token_type in UNARY_OPERATORS:
+            operand, index = self.infer_unary(tokens, index + 1)
+            result = unary_result_type(token_type, operand)
+            if result is None:
+                self.add_error(f"Invalid operand for '{token.value}': {operand.value}", token.line, token.column)
+                result = DataType.UNKNOWN
+            return result, index
+        
+        if token_type == TokenType.LPAREN:
+            expr_type, index = self.infer_binary(tokens, index + 1, 1)
+            if index < len(tokens) and tokens[index].type == TokenType.RPAREN:
+                index += 1
+            return expr_type, index
+        
+        return DataType.UNKNOWN, index
+    
+    def infer_arguments(self, tokens: List[Token], index: int) -> Tuple[List[Tuple[Token, DataType]], int]:
+        """Infer the arguments of a call after its '('; returns (first token, type) pairs and the index after ')'"""
+        arguments = []
+        if index < len(tokens) and tokens[index].type == TokenType.RPAREN:
+            return arguments, index + 1
+        while index < len(tokens):
+            first = tokens[index]
+            argument_type, index = self.infer_binary(tokens, index, 1)
+            arguments.append((first, argument_type))
+            if index < len(tokens) and tokens[index].type == TokenType.COMMA:
+                index += 1
+                continue
+            if index < len(tokens) and tokens[index].type == TokenType.RPAREN:
+                index += 1
+            break
+        return arguments, index
+    
+    def check_call(self, name_token: Token, symbol: Symbol, arguments: List[Tuple[Token, DataType]]):
+        """Check a call's arguments against the signature recorded in the function's symbol"""
+        if not symbol.is_function:
+            self.add_error(f"'{symbol.name}' is not a function", name_token.line, name_token.column)
+            return
+        parameters = symbol.parameters or []
+        if len(arguments) != len(parameters):
+            self.add_error(f"Function '{symbol.name}' expects {len(parameters)} argument(s), got {len(arguments)}",
+                           name_token.line, name_token.column)
+            return
+        for number, ((first, argument_type), (_, parameter_type)) in enumerate(zip(arguments, parameters), 1):
+            if not is_assignable(parameter_type, argument_type):
+                self.add_error(f"Argument {number} of '{symbol.name}': cannot pass {argument_type.value} "
+                               f"as {parameter_type.value}", first.line, first.column)
+    
+    def check_assignable(self, target_type: DataType, tokens: List[Token]):
+        """Report a type mismatch if the expression in tokens can't be assigned to target_type"""
+        expr_type = self.get_expression_type(tokens)
+        if not is_assignable(target_type, expr_type):
+            self.add_error(f"Type mismatch: cannot assign {expr_type.value} to {target_type.value}",
+                           tokens[0].line, tokens[0].column)
+    
+    def mark_initialized(self, symbol: Symbol):
+        """Record that an existing symbol has been assigned a value"""
+        symbol.is_initialized = True
+    
+    def declare_symbol(self, symbol: Symbol) -> bool:
+        """Declare symbol in the current scope; False if the name is taken there"""
+        return self.symbol_table.declare_symbol(symbol)
     
     def analyze_variable_declaration(self):
         """Analyze variable declaration: var type identifier = expression;"""
@@ -406,7 +1201,7 @@ class SemanticAnalyzer:
         
         # Get type
         type_token = self.current_token()
-        if type_token.type not in [TokenType.INT, TokenType.FLOAT_TYPE, TokenType.STRING_TYPE, TokenType.BOOL]:
+        if type_token.type not in TYPE_KEYWORDS:
             self.add_error(f"Expected type, got '{type_token.value}'")
             return
         
@@ -429,24 +1224,13 @@ class SemanticAnalyzer:
         if self.current_token().type == TokenType.ASSIGN:
             self.advance()  # Skip '='
             
-            # Get expression type
-            expr_start = self.position
-            expr_type = self.get_expression_type(expr_start)
-            
-            # Type compatibility check
-            if expr_type != DataType.UNKNOWN and expr_type != var_type:
-                # Allow int to float conversion
-                if not (var_type == DataType.FLOAT and expr_type == DataType.INT):
-                    self.add_error(f"Type mismatch: cannot assign {expr_type.value} to {var_type.value}")
+            # Type compatibility check, up to the semicolon
+            self.check_assignable(var_type, self.read_expression())
             
             symbol.is_initialized = True
-            
-            # Skip to semicolon
-            while self.current_token().type != TokenType.SEMICOLON and self.current_token().type != TokenType.EOF:
-                self.advance()
         
         # Declare symbol
-        if not self.symbol_table.declare_symbol(symbol):
+        if not self.declare_symbol(symbol):
             self.add_error(f"Variable '{var_name}' already declared in current scope")
     
     def analyze_assignment(self):
@@ -458,27 +1242,20 @@ class SemanticAnalyzer:
         symbol = self.symbol_table.lookup_symbol(var_name)
         if not symbol:
             self.add_error(f"Undefined variable '{var_name}'")
+            # Skip the rest of the statement unchecked, so that an unbraced
+            # if or while body is not analyzed again as the next statement
+            self.advance()
+            self.skip_statement()
             return
         
         self.advance()  # Skip identifier
         self.advance()  # Skip '='
         
-        # Get expression type
-        expr_start = self.position
-        expr_type = self.get_expression_type(expr_start)
-        
-        # Type compatibility check
-        if expr_type != DataType.UNKNOWN and expr_type != symbol.data_type:
-            # Allow int to float conversion
-            if not (symbol.data_type == DataType.FLOAT and expr_type == DataType.INT):
-                self.add_error(f"Type mismatch: cannot assign {expr_type.value} to {symbol.data_type.value}")
+        # Type compatibility check, up to the semicolon
+        self.check_assignable(symbol.data_type, self.read_expression())
         
         # Mark as initialized
-        symbol.is_initialized = True
-        
-        # Skip to semicolon
-        while self.current_token().type != TokenType.SEMICOLON and self.current_token().type != TokenType.EOF:
-            self.advance()
+        self.mark_initialized(symbol)
     
     def analyze_function_declaration(self):
         """Analyze function declaration"""
@@ -486,7 +1263,7 @@ class SemanticAnalyzer:
         
         # Get return type
         return_type_token = self.current_token()
-        if return_type_token.type not in [TokenType.INT, TokenType.FLOAT_TYPE, TokenType.STRING_TYPE, TokenType.BOOL]:
+        if return_type_token.type not in TYPE_KEYWORDS:
             self.add_error(f"Expected return type, got '{return_type_token.value}'")
             return
         
@@ -502,94 +1279,157 @@ class SemanticAnalyzer:
         func_name = name_token.value
         self.advance()
         
+        parameters = self.read_parameters()
+        
         # Create function symbol
         func_symbol = Symbol(func_name, return_type, name_token.line, name_token.column, 
-                           is_function=True, return_type=return_type, parameters=[])
+                           is_function=True, return_type=return_type,
+                           parameters=[(token.value, data_type) for token, data_type in parameters])
         
-        # Declare function
-        if not self.symbol_table.declare_symbol(func_symbol):
-            self.add_error(f"Function '{func_name}' already declared")
+        # Declare function before its body, so it can call itself
+        if not self.declare_symbol(func_symbol):
+            self.add_error(f"Function '{func_name}' already declared", name_token.line, name_token.column)
         
         # Enter function scope
         self.symbol_table.enter_scope()
+        outer_function = self.in_function, self.current_function_return_type
         self.in_function = True
         self.current_function_return_type = return_type
         
-        # Skip parameter list and function body for now
-        paren_count = 0
-        brace_count = 0
+        for token, data_type in parameters:
+            parameter = Symbol(token.value, data_type, token.line, token.column, is_initialized=True)
+            if not self.declare_symbol(parameter):
+                self.add_error(f"Parameter '{token.value}' already declared", token.line, token.column)
         
-        while self.current_token().type != TokenType.EOF:
-            token = self.current_token()
-            
-            if token.type == TokenType.LPAREN:
-                paren_count += 1
-            elif token.type == TokenType.RPAREN:
-                paren_count -= 1
-            elif token.type == TokenType.LBRACE:
-                brace_count += 1
-            elif token.type == TokenType.RBRACE:
-                brace_count -= 1
-                if brace_count == 0:
-                    break
-            
-            self.advance()
+        if self.current_token().type == TokenType.LBRACE:
+            self.analyze_function_body()
+        else:
+            self.add_error(f"Expected '{{' to start the body of '{func_name}', got '{self.current_token().value}'")
         
         # Exit function scope
         self.symbol_table.exit_scope()
-        self.in_function = False
-        self.current_function_return_type = DataType.VOID
+        self.in_function, self.current_function_return_type = outer_function
     
-    def analyze_statement(self):
-        """Analyze a single statement"""
-        token = self.current_token()
+    def analyze_function_body(self):
+        """Analyze the block of a function body; the function scope holds its parameters"""
+        self.analyze_block()
+    
+    def read_parameters(self) -> List[Tuple[Token, DataType]]:
+        """Read a parameter list '(type name, ...)' as (name token, type) pairs"""
+        if self.current_token().type != TokenType.LPAREN:
+            self.add_error(f"Expected '(' after function name, got '{self.current_token().value}'")
+            return []
+        self.advance()
         
-        if token.type == TokenType.VAR:
-            self.analyze_variable_declaration()
-        elif token.type == TokenType.FUNCTION:
-            self.analyze_function_declaration()
-        elif token.type == TokenType.IDENTIFIER:
-            # Check if it's an assignment
-            if self.peek_token().type == TokenType.ASSIGN:
-                self.analyze_assignment()
-            else:
-                # Skip expression statement
-                while self.current_token().type != TokenType.SEMICOLON and self.current_token().type != TokenType.EOF:
-                    self.advance()
-        elif token.type == TokenType.IF:
-            self.analyze_if_statement()
-        elif token.type == TokenType.WHILE:
-            self.analyze_while_statement()
-        elif token.type == TokenType.LBRACE:
-            self.analyze_block()
-        else:
-            # Skip unknown statements
-            while self.current_token().type not in [TokenType.SEMICOLON, TokenType.EOF, TokenType.RBRACE, TokenType.NEWLINE]:
+        parameters = []
+        if self.current_token().type == TokenType.RPAREN:
+            self.advance()
+            return parameters
+        
+        while True:
+            data_type = self.token_type_to_data_type(self.current_token().type)
+            if data_type == DataType.UNKNOWN:
+                self.add_error(f"Expected parameter type, got '{self.current_token().value}'")
+                break
+            self.advance()
+            
+            name_token = self.current_token()
+            if name_token.type != TokenType.IDENTIFIER:
+                self.add_error(f"Expected parameter name, got '{name_token.value}'")
+                break
+            self.advance()
+            parameters.append((name_token, data_type))
+            
+            if self.current_token().type == TokenType.COMMA:
                 self.advance()
-            # Make sure we advance past the current token if it's not EOF
-            if self.current_token().type != TokenType.EOF:
+            elif self.current_token().type == TokenType.RPAREN:
                 self.advance()
+                return parameters
+            else:
+                self.add_error(f"Expected ',' or ')' in parameter list, got '{self.current_token().value}'")
+                break
+        
+        # Resume after the parameter list, or at the body if ')' is missing
+        while self.current_token().type not in PARAMETER_LIST_END:
+            self.advance()
+        if self.current_token().type == TokenType.RPAREN:
+            self.advance()
+        return parameters
+    
+    def analyze_return_statement(self):
+        """Analyze return statement: return expression;"""
+        return_token = self.current_token()
+        self.advance()  # Skip 'return'
+        
+        tokens = self.read_expression()
+        if not self.in_function:
+            self.add_error("Return statement outside of function", return_token.line, return_token.column)
+            self.get_expression_type(tokens)
+        elif not tokens:
+            self.add_error(f"Missing return value in function returning {self.current_function_return_type.value}",
+                           return_token.line, return_token.column)
+        else:
+            expr_type = self.get_expression_type(tokens)
+            if not is_assignable(self.current_function_return_type, expr_type):
+                self.add_error(f"Type mismatch: cannot return {expr_type.value} from function returning "
+                               f"{self.current_function_return_type.value}", tokens[0].line, tokens[0].column)
+    
+    def analyze_statement(self):
+        """Analyze a single statement, through the handler for the kind of its first token"""
+        handler = self.statement_handlers.get(self.current_token().type)
+        if handler is not None:
+            handler()
+        else:
+            self.skip_statement()
+    
+    def analyze_identifier_statement(self):
+        """Analyze an assignment, or an expression statement such as a call"""
+        if self.peek_token().type == TokenType.ASSIGN:
+            self.analyze_assignment()
+        else:
+            # Expression statement, such as a call: check names and calls
+            self.get_expression_type(self.read_expression())
+    
+    def skip_statement(self):
+        """Skip an unknown statement, up to the end of its line"""
+        token = self.current_token()
+        while token.type not in STATEMENT_END:
+            end_line = token.end_line
+            self.advance()
+            token = self.current_token()
+            if token.line > end_line:
+                return
+        # Make sure we advance past the current token if it's not EOF
+        if token.type != TokenType.EOF:
+            self.advance()
+    
+    def skip_condition(self):
+        """Skip a parenthesized condition, if there is one"""
+        if self.current_token().type != TokenType.LPAREN:
+            return
+        paren_depth, eof = PAREN_DEPTH, TokenType.EOF
+        paren_count = 1
+        self.advance()
+        while paren_count > 0:
+            token_type = self.current_token().type
+            if token_type == eof:
+                break
+            paren_count += paren_depth.get(token_type, 0)
+            self.advance()
     
     def analyze_if_statement(self):
         """Analyze if statement"""
         self.advance()  # Skip 'if'
         
-        # Skip condition
-        if self.current_token().type == TokenType.LPAREN:
-            paren_count = 1
-            self.advance()
-            while paren_count > 0 and self.current_token().type != TokenType.EOF:
-                if self.current_token().type == TokenType.LPAREN:
-                    paren_count += 1
-                elif self.current_token().type == TokenType.RPAREN:
-                    paren_count -= 1
-                self.advance()
+        self.skip_condition()
         
         # Analyze then block
         if self.current_token().type == TokenType.LBRACE:
             self.analyze_block()
         else:
             self.analyze_statement()
+            if self.current_token().type == TokenType.SEMICOLON and self.peek_token().type == TokenType.ELSE:
+                self.advance()
         
         # Check for else
         if self.current_token().type == TokenType.ELSE:
@@ -603,16 +1443,7 @@ class SemanticAnalyzer:
         """Analyze while statement"""
         self.advance()  # Skip 'while'
         
-        # Skip condition
-        if self.current_token().type == TokenType.LPAREN:
-            paren_count = 1
-            self.advance()
-            while paren_count > 0 and self.current_token().type != TokenType.EOF:
-                if self.current_token().type == TokenType.LPAREN:
-                    paren_count += 1
-                elif self.current_token().type == TokenType.RPAREN:
-                    paren_count -= 1
-                self.advance()
+        self.skip_condition()
         
         # Analyze body
         if self.current_token().type == TokenType.LBRACE:
@@ -625,73 +1456,208 @@ class SemanticAnalyzer:
         self.advance()  # Skip '{'
         self.symbol_table.enter_scope()
         
-        while self.current_token().type != TokenType.RBRACE and self.current_token().type != TokenType.EOF:
-            if self.current_token().type == TokenType.NEWLINE:
-                self.advance()
-                continue
+        while self.current_token().type not in BLOCK_END:
+            old_position = self.position
             self.analyze_statement()
             if self.current_token().type == TokenType.SEMICOLON:
                 self.advance()
+            
+            # If position didn't change, force advance to prevent infinite loop
+            if self.position == old_position:
+                self.advance()
         
         if self.current_token().type == TokenType.RBRACE:
             self.advance()
         
         self.symbol_table.exit_scope()
     
+    def analyze_top_level_statement(self):
+        """Analyze one top-level statement; only the global scope is open before and after"""
+        # Store current position to detect infinite loops
+        old_position = self.position
+        
+        self.analyze_statement()
+        
+        if self.current_token().type == TokenType.SEMICOLON:
+            self.advance()
+        
+        # If position didn't change, force advance to prevent infinite loop
+        if self.position == old_position and self.current_token().type != TokenType.EOF:
+            self.advance()
+    
     def analyze(self) -> List[SemanticError]:
         """Main analysis method"""
         while self.current_token().type != TokenType.EOF:
-            if self.current_token().type == TokenType.NEWLINE:
-                self.advance()
-                continue
-            
-            # Store current position to detect infinite loops
-            old_position = self.position
-            
-            self.analyze_statement()
-            
-            if self.current_token().type == TokenType.SEMICOLON:
-                self.advance()
-            
-            # If position didn't change, force advance to prevent infinite loop
-            if self.position == old_position and self.current_token().type != TokenType.EOF:
-                self.advance()
+            self.analyze_top_level_statement()
         
         return self.errors
     
     def get_symbol_table_report(self) -> str:
         """Generate symbol table report"""
-        report = "Reporte de Tabla de Símbolos:\n"
-        report += "=" * 50 + "\n"
-        
-        symbols = self.symbol_table.get_current_scope_symbols()
-        if not symbols:
-            report += "No se encontraron símbolos en el alcance global.\n"
-        else:
-            for name, symbol in symbols.items():
-                report += f"Nombre: {name}\n"
-                report += f"  Tipo: {symbol.data_type.value}\n"
-                report += f"  Línea: {symbol.line}, Columna: {symbol.column}\n"
-                report += f"  Inicializado: {'Sí' if symbol.is_initialized else 'No'}\n"
-                if symbol.is_function:
-                    report += f"  Función: Sí\n"
-                    report += f"  Tipo de Retorno: {symbol.return_type.value}\n"
-                report += "-" * 30 + "\n"
-        
-        return report
+        return format_symbol_table_report(self.symbol_table.get_current_scope_symbols())
+
+
+class StreamingSemanticAnalyzer(SemanticAnalyzer):
+    """Semantic analyzer that pulls tokens from an iterator through a bounded window.
+    
+    Only the current token and one token of lookahead are kept alive, so memory
+    does not grow with the length of the input and analysis starts as soon as
+    the first tokens are produced (e.g. from Lexer.iter_tokens()).
+    """
+    
+    LOOKAHEAD = 2
+    
+    def __init__(self, tokens: Iterable[Token], symbol_table: Optional[SymbolTable] = None):
+        super().__init__([], symbol_table)
+        self.token_iterator = iter(tokens)
+        self.window: Deque[Token] = deque()
+        self.tokens_read = 0
+        self.fill_window()
+        if not self.window:
+            self.window.append(Token(TokenType.EOF, '', 0))
+    
+    def fill_window(self):
+        """Read tokens until the lookahead window is full or EOF has been read"""
+        window = self.window
+        while len(window) < self.LOOKAHEAD and not (window and window[-1].type == TokenType.EOF):
+            token = next(self.token_iterator, None)
+            if token is None:
+                break
+            window.append(token)
+            self.tokens_read += 1
+    
+    def current_token(self) -> Token:
+        return self.window[0]
+    
+    def advance(self):
+        # Like the list-based analyzer, never move past the last (EOF) token
+        if len(self.window) > 1:
+            self.window.popleft()
+            self.position += 1
+            self.fill_window()
+    
+    def peek_token(self) -> Token:
+        return self.window[1] if len(self.window) > 1 else self.window[0]
+    
+    def read_expression(self) -> List[Token]:
+        expression = []
+        token = self.current_token()
+        while token.type not in EXPRESSION_END:
+            expression.append(token)
+            self.advance()
+            token = self.current_token()
+        return expression
+
+
+# Statement kinds counted for --profile, by first token
+STATEMENT_KINDS = {
+    TokenType.VAR: 'declaration',
+    TokenType.FUNCTION: 'function',
+    TokenType.IF: 'if',
+    TokenType.WHILE: 'while',
+    TokenType.RETURN: 'return',
+    TokenType.LBRACE: 'block',
+}
+
+
+class StatementCounter:
+    """Mixin for SemanticAnalyzer classes that counts the statements it analyzes by kind (for --profile)"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.statement_counts: Dict[str, int] = {}
+    
+    def analyze_statement(self):
+        token_type = self.current_token().type
+        kind = STATEMENT_KINDS.get(token_type)
+        if kind is None:
+            if token_type == TokenType.IDENTIFIER:
+                kind = 'assignment' if self.peek_token().type == TokenType.ASSIGN else 'expression'
+            else:
+                kind = 'other'
+        self.statement_counts[kind] = self.statement_counts.get(kind, 0) + 1
+        super().analyze_statement()
+
+
+class CountingSemanticAnalyzer(StatementCounter, SemanticAnalyzer):
+    pass
+
+
+class CountingStreamingSemanticAnalyzer(StatementCounter, StreamingSemanticAnalyzer):
+    pass
 
 
 def main():
     """Main function to run the semantic analyzer"""
-    if len(sys.argv) != 2:
-        print("Usage: python semantic_analyzer.py <source_file>")
-        sys.exit(1)
+    import argparse
+    
+    parser = argparse.ArgumentParser(prog='semantic_analyzer.py',
+                                     description='Analizador Sintáctico - Edwin Espinal')
+    parser.add_argument('source_file', help='archivo de código fuente a analizar')
+    parser.add_argument('--engine', choices=Lexer.ENGINES,
+                        help='motor del analizador léxico (por defecto: char)')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--stream', action='store_true',
+                      help='analizar los tokens a medida que se generan, sin materializar la lista')
+    mode.add_argument('--compact', action='store_true',
+                      help='guardar los tokens en un TokenBuffer compacto en lugar de una lista')
+    mode.add_argument('--ast', action='store_true',
+                      help='construir un árbol sintáctico y analizarlo (reporta errores de sintaxis)')
+    mode.add_argument('-j', '--jobs', type=int, metavar='N',
+                      help='analizar los cuerpos de las funciones de nivel superior en N procesos')
+    parser.add_argument('--mmap', action='store_true',
+                        help='mapear el archivo en memoria y analizar sus bytes sin copiarlo '
+                             '(archivos ASCII; los demás se leen como texto)')
+    parser.add_argument('--emit-cache', metavar='FILE',
+                        help='guardar los tokens y la tabla de símbolos en FILE en formato binario')
+    parser.add_argument('--use-cache', metavar='FILE',
+                        help='cargar los tokens de FILE (escrito con --emit-cache) en lugar de tokenizar')
+    parser.add_argument('--cache-dir', metavar='DIR',
+                        help='reutilizar resultados guardados en DIR para código fuente sin cambios')
+    parser.add_argument('--cache-size', type=int, default=64, metavar='MB',
+                        help='tamaño máximo de la caché en MB (por defecto: 64)')
+    parser.add_argument('--format', choices=['text', 'jsonl', 'sarif'], default='text',
+                        help='formato de salida: text (informe completo), o jsonl y sarif, que escriben '
+                             'cada error en stdout en cuanto se encuentra (por defecto: text)')
+    parser.add_argument('--profile', action='store_true',
+                        help='mostrar el tiempo de cada fase, la memoria pico y contadores del analizador')
+    parser.add_argument('--profile-json', metavar='FILE',
+                        help='guardar el perfil (ver --profile) en FILE en formato JSON')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='incluir en el perfil la memoria pico de cada fase, medida con tracemalloc '
+                             '(hace el análisis varias veces más lento)')
+    args = parser.parse_args()
+    
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs debe ser al menos 1")
+    if args.engine and args.jobs:
+        parser.error("--engine no se puede usar con --jobs: el análisis en paralelo tokeniza con el motor regex")
+    args.engine = args.engine or 'char'
+    if (args.emit_cache or args.use_cache) and (args.stream or args.ast or args.jobs):
+        parser.error("--emit-cache y --use-cache no se pueden usar con --stream, --ast ni --jobs")
+    if (args.profile or args.profile_json or args.profile_memory) and (args.ast or args.jobs):
+        parser.error("--profile, --profile-json y --profile-memory no se pueden usar con --ast ni --jobs")
+    
+    source_file = args.source_file
     
-    source_file = sys.argv[1]
+    writer = None
+    if args.format != 'text':
+        from diagnostic_output import diagnostic_writer
+        writer = diagnostic_writer(args.format, sys.stdout, source_file)
+        # stdout carries only the diagnostics; progress messages go to stderr
+        sys.stdout = sys.stderr
+    
+    profile = None
+    if args.profile or args.profile_json or args.profile_memory:
+        from analysis_profile import AnalysisProfile
+        profile = AnalysisProfile(trace_memory=args.profile_memory)
+        profile.start('read')
     
     try:
-        with open(source_file, 'r') as f:
-            source_code = f.read()
+        source_code = map_source_file(source_file) if args.mmap else None
+        if source_code is None:
+            with open(source_file, 'r') as f:
+                source_code = f.read()
     except FileNotFoundError:
         print(f"Error: File '{source_file}' not found")
         sys.exit(1)
@@ -699,37 +1665,195 @@ def main():
         print(f"Error reading file: {e}")
         sys.exit(1)
     
-    # Tokenize
-    print("Tokenizando...")
-    lexer = Lexer(source_code)
-    tokens = lexer.tokenize()
-    
-    print(f"Se encontraron {len(tokens)} tokens")
-    
-    # Analyze
-    print("\nRealizando análisis sintáctico...")
-    analyzer = SemanticAnalyzer(tokens)
-    errors = analyzer.analyze()
-    
-    # Report results
-    print("\n" + "=" * 60)
-    print("ANALIZADOR SINTÁCTICO - EDWIN ESPINAL")
-    print("RESULTADOS DEL ANÁLISIS SINTÁCTICO")
-    print("=" * 60)
-    
-    if errors:
-        print(f"\nSe encontraron {len(errors)} errores sintácticos:")
-        print("-" * 40)
-        for error in errors:
-            print(f"  {error}")
+    mapped = not isinstance(source_code, str)
+    if profile:
+        profile.stop()
+    
+    cache = cache_key = cached = None
+    if args.cache_dir:
+        from analysis_cache import AnalysisCache
+        # Both pipelines agree on well-formed code only, so their results are cached apart
+        version = ANALYZER_VERSION + ('-ast' if args.ast else '')
+        cache = AnalysisCache(args.cache_dir, version, args.cache_size * 2**20)
+        cache_key = cache.key_for(source_code)
+        # Emitting a token cache needs the tokens, so the analysis always runs
+        cached = None if args.emit_cache else cache.get(cache_key)
+    
+    if writer:
+        writer.begin()
+    
+    if cached is not None:
+        print("Resultado obtenido de la caché")
+        print(f"Se encontraron {cached['token_count']} tokens")
+        errors = [SemanticError(message, line, column) for line, column, message in cached['errors']]
+        symbols = {data['name']: symbol_from_dict(data) for data in cached['symbols']}
+        if writer:
+            for error in errors:
+                writer.write(error)
+    else:
+        errors, symbols = run_analysis(source_code, args, cache, cache_key, writer.write if writer else None,
+                                       profile)
+    
+    if mapped:
+        source_code.close()
+    
+    if profile:
+        profile.start('report')
+    
+    if writer:
+        writer.end()
+        print(f"Se encontraron {writer.count} errores sintácticos")
+        exit_code = 1 if writer.count else 0
     else:
-        print("\n¡No se encontraron errores sintácticos!")
+        # Report results
+        print("\n" + "=" * 60)
+        print("ANALIZADOR SINTÁCTICO - EDWIN ESPINAL")
+        print("RESULTADOS DEL ANÁLISIS SINTÁCTICO")
+        print("=" * 60)
+        
+        if errors:
+            print(f"\nSe encontraron {len(errors)} errores sintácticos:")
+            print("-" * 40)
+            for error in errors:
+                print(f"  {error}")
+        else:
+            print("\n¡No se encontraron errores sintácticos!")
+        
+        # Print symbol table
+        print("\n" + format_symbol_table_report(symbols))
+        exit_code = 1 if errors else 0
+    
+    if cache:
+        print(cache.stats())
     
-    # Print symbol table
-    print("\n" + analyzer.get_symbol_table_report())
+    if profile:
+        profile.finish()
+        if args.profile or args.profile_memory:
+            print("\n" + profile.format())
+        if args.profile_json:
+            profile.dump(args.profile_json)
+            print(f"Perfil guardado en {args.profile_json}")
     
     # Exit with appropriate code
-    sys.exit(1 if errors else 0)
+    sys.exit(exit_code)
+
+
+def run_analysis(source_code, args, cache=None, cache_key=None, error_sink=None, profile=None):
+    """Tokenize and analyze source_code as selected by the CLI options.
+    
+    With error_sink, each error is passed to it as soon as it is found and
+    errors are only kept (and returned) if the cache needs them. With an
+    analysis_profile.AnalysisProfile, the phases are timed and the counting
+    analyzer and symbol table are used.
+    """
+    mapped = not isinstance(source_code, str)
+    symbol_table = CountingSymbolTable() if profile else None
+    
+    reported: List[SemanticError] = []
+    if error_sink is not None and cache:
+        write_error = error_sink
+        
+        def error_sink(error: SemanticError):
+            write_error(error)
+            reported.append(error)
+    
+    if args.ast:
+        # syntax_tree does its own lexing: when this file runs as a script its
+        # token types are not the ones the parser compares against
+        from syntax_tree import analyze_source
+        print("Tokenizando y construyendo el árbol sintáctico...")
+        token_count, _, analyzer = analyze_source(source_code, args.engine, error_sink)
+        print(f"Se encontraron {token_count} tokens")
+    elif args.jobs:
+        from parallel_analyzer import analyze_in_parallel
+        print(f"Tokenizando y analizando las funciones en {args.jobs} proceso(s)...")
+        token_count, analyzer = analyze_in_parallel(source_code, args.jobs)
+        print(f"Se encontraron {token_count} tokens")
+        if error_sink is not None:
+            # Worker errors are only in order once merged, so they are written afterwards
+            for error in analyzer.errors:
+                error_sink(error)
+    elif args.stream:
+        # Tokenize and analyze in a single pass
+        print("Realizando análisis sintáctico (modo streaming)...")
+        lexer = Lexer(source_code, engine='regex' if mapped else args.engine)
+        if profile:
+            # Tokenizing is timed as part of the analysis here
+            profile.start('analyze')
+            analyzer = CountingStreamingSemanticAnalyzer(profile.count_stream(lexer.iter_tokens()), symbol_table)
+        else:
+            analyzer = StreamingSemanticAnalyzer(lexer.iter_tokens())
+        analyzer.error_sink = error_sink
+        analyzer.analyze()
+        token_count = analyzer.tokens_read
+        if profile:
+            profile.stop()
+            profile.collect(analyzer)
+        
+        print(f"Se procesaron {token_count} tokens")
+    else:
+        if profile:
+            profile.start('tokenize')
+        tokens = token_cache = None
+        if args.use_cache:
+            from token_cache import load_token_cache
+            token_cache = load_token_cache(args.use_cache, source_code)
+            if token_cache is None:
+                print("La caché de tokens no existe o no corresponde al archivo; se vuelve a tokenizar")
+            else:
+                print(f"Cargando tokens de {args.use_cache}...")
+                buffer_class = ByteTokenBuffer if mapped else TokenBuffer
+                tokens = buffer_class.from_columns(source_code, token_cache.types, token_cache.starts,
+                                                   token_cache.ends)
+        
+        if tokens is None:
+            # Token caches are written from a TokenBuffer's columns
+            compact = args.compact or mapped or args.emit_cache
+            # Interning identifiers pays off when the whole token list is kept
+            names = None if compact else NameTable()
+            lexer = Lexer(source_code, engine='regex' if mapped else args.engine, names=names)
+            
+            # Tokenize
+            print("Tokenizando...")
+            tokens = lexer.tokenize_buffer() if compact else lexer.tokenize()
+        token_count = len(tokens)
+        if profile:
+            profile.stop()
+            profile.count_tokens(tokens)
+        
+        print(f"Se encontraron {token_count} tokens")
+        
+        # Analyze
+        print("\nRealizando análisis sintáctico...")
+        if profile:
+            profile.start('analyze')
+            analyzer = CountingSemanticAnalyzer(tokens, symbol_table)
+        else:
+            analyzer = SemanticAnalyzer(tokens)
+        analyzer.error_sink = error_sink
+        analyzer.analyze()
+        if profile:
+            profile.stop()
+            profile.collect(analyzer)
+        
+        if args.emit_cache:
+            from token_cache import write_token_cache
+            write_token_cache(args.emit_cache, source_code, tokens,
+                              analyzer.symbol_table.get_current_scope_symbols())
+            print(f"Caché de tokens guardada en {args.emit_cache}")
+        if token_cache:
+            token_cache.close()
+    
+    errors = analyzer.errors if error_sink is None else reported
+    symbols = analyzer.symbol_table.get_current_scope_symbols()
+    if cache:
+        cache.put(cache_key, {
+            'token_count': token_count,
+            'errors': [[error.line, error.column, error.message] for error in errors],
+            'symbols': [symbol_to_dict(symbol) for symbol in symbols.values()],
+        })
+    
+    return errors, symbols
 
 
 if __name__ == "__main__":
@@ -8,8 +8,24 @@ Descripción: Una interfaz gráfica de usuario para el analizador sintáctico
 import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog, messagebox
 import os
+import queue
+import re
 import sys
-from semantic_analyzer import Lexer, SemanticAnalyzer
+import threading
+from bisect import bisect_left, bisect_right
+from incremental_analyzer import IncrementalAnalyzer
+
+
+# Quiet time after the last keystroke before the source is analyzed again
+ANALYSIS_DELAY_MS = 300
+# How often the main thread checks for results while an analysis is running
+RESULT_POLL_MS = 30
+# Lines above and below the visible part of the source that get error highlights
+HIGHLIGHT_MARGIN_LINES = 100
+# Error ranges passed to a single tag_add call; more are added on later idle turns
+HIGHLIGHT_BATCH = 200
+# Location of an error as listed in the results panel (see SemanticError.__str__)
+ERROR_LOCATION_PATTERN = re.compile(r"Error at line (\d+), column (\d+)")
 
 
 class SemanticAnalyzerGUI:
@@ -18,6 +34,30 @@ class SemanticAnalyzerGUI:
         self.root.title("Analizador Sintáctico - Edwin Espinal")
         self.root.geometry("1000x800")
         
+        # Keeps the tokens and results of the last analysis so that the next
+        # one only redoes the statements around what was edited. Only the
+        # worker thread touches it once the window is up.
+        self.incremental = IncrementalAnalyzer()
+        
+        # Analysis requests go to a worker thread so typing never waits for
+        # the analyzer. Each request gets a generation number; a newer
+        # request or edit cancels older ones and their results are dropped.
+        self.generation = 0
+        self.pending_analysis = None
+        self.in_flight = 0  # requests the worker has not answered yet
+        self.poll_scheduled = False  # at most one poll_results loop runs at a time
+        self.work = None
+        self.work_ready = threading.Condition()
+        self.results = queue.Queue()
+        threading.Thread(target=self.analysis_worker, daemon=True).start()
+        
+        # Sorted (line, column) of the last analysis' errors. Only those near
+        # the viewport are tagged; scrolling tags the ones that come into view.
+        self.error_positions = []
+        self.highlighted_span = None
+        self.highlight_pass = 0
+        self.highlight_refresh = None
+        
         # Create main frame
         main_frame = ttk.Frame(root, padding="10")
         main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -67,6 +107,9 @@ class SemanticAnalyzerGUI:
                                                    width=40, height=20,
                                                    font=("Courier", 10))
         self.source_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.source_text.bind("<<Modified>>", self.on_source_modified)
+        self.source_text.configure(yscrollcommand=self.on_source_scrolled)
+        self.source_text.tag_configure("error", background="#ffd6d6", underline=True)
         
         # Results frame
         results_frame = ttk.LabelFrame(content_frame, text="Resultados del Análisis", padding="5")
@@ -80,6 +123,7 @@ class SemanticAnalyzerGUI:
                                                     font=("Courier", 10),
                                                     state=tk.DISABLED)
         self.results_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.results_text.bind("<Button-1>", self.on_results_click)
         
         # Control buttons frame
         button_frame = ttk.Frame(main_frame)
@@ -155,63 +199,184 @@ class SemanticAnalyzerGUI:
     
     def analyze_code(self):
         """Analyze the source code"""
-        source_code = self.source_text.get(1.0, tk.END).strip()
+        source_code = self.source_text.get(1.0, tk.END).rstrip()
         
         if not source_code:
             messagebox.showwarning("Warning", "Please enter some source code to analyze")
             return
         
-        self.status_var.set("Analyzing...")
-        self.root.update()
+        self.start_analysis(source_code)
+    
+    def on_source_modified(self, event=None):
+        """Restart the analysis timer whenever the source text changes"""
+        if not self.source_text.edit_modified():
+            return
+        self.source_text.edit_modified(False)
         
-        try:
-            # Tokenize
-            lexer = Lexer(source_code)
-            tokens = lexer.tokenize()
-            
-            # Analyze
-            analyzer = SemanticAnalyzer(tokens)
-            errors = analyzer.analyze()
-            
-            # Generate report
-            report = "SEMANTIC ANALYSIS RESULTS\n"
-            report += "=" * 60 + "\n\n"
-            
-            report += f"Total tokens processed: {len(tokens)}\n"
-            report += f"Analysis completed.\n\n"
-            
-            if errors:
-                report += f"SEMANTIC ERRORS FOUND ({len(errors)}):\n"
-                report += "-" * 40 + "\n"
-                for i, error in enumerate(errors, 1):
-                    report += f"{i}. {error}\n"
-            else:
-                report += "✓ NO SEMANTIC ERRORS FOUND!\n"
-                report += "The code passed all semantic checks.\n"
-            
-            report += "\n" + analyzer.get_symbol_table_report()
-            
-            # Show results
-            self.results_text.config(state=tk.NORMAL)
-            self.results_text.delete(1.0, tk.END)
-            self.results_text.insert(1.0, report)
-            self.results_text.config(state=tk.DISABLED)
+        # The running analysis, if any, is now for stale text
+        self.generation += 1
+        if self.pending_analysis is not None:
+            self.root.after_cancel(self.pending_analysis)
+        self.pending_analysis = self.root.after(ANALYSIS_DELAY_MS, self.analyze_live)
+    
+    def analyze_live(self):
+        """Analyze the source once typing has paused"""
+        self.pending_analysis = None
+        source_code = self.source_text.get(1.0, tk.END).rstrip()
+        if source_code:
+            self.start_analysis(source_code)
+        else:
+            self.show_report("")
+            self.set_error_highlights([])
+    
+    def start_analysis(self, source_code):
+        """Hand source_code to the worker thread, replacing any request not yet started"""
+        self.generation += 1
+        with self.work_ready:
+            if self.work is None:
+                self.in_flight += 1
+            self.work = (self.generation, source_code)
+            self.work_ready.notify()
+        
+        self.status_var.set("Analyzing...")
+        if not self.poll_scheduled:
+            self.poll_scheduled = True
+            self.root.after(RESULT_POLL_MS, self.poll_results)
+    
+    def analysis_worker(self):
+        """Run requested analyses one at a time; runs on its own thread"""
+        while True:
+            with self.work_ready:
+                while self.work is None:
+                    self.work_ready.wait()
+                generation, source_code = self.work
+                self.work = None
             
-            # Update status
-            if errors:
-                self.status_var.set(f"Analysis complete - {len(errors)} errors found")
-            else:
-                self.status_var.set("Analysis complete - No errors found")
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Analysis failed: {str(e)}")
-            self.status_var.set("Analysis failed")
+            try:
+                errors = self.incremental.update(source_code, lambda: self.generation != generation)
+                if errors is None:
+                    self.results.put((generation, None, None, None, None))  # cancelled
+                    continue
+                positions = sorted((error.line, error.column) for error in errors)
+                self.results.put((generation, self.format_report(errors), self.format_status(errors),
+                                  positions, None))
+            except Exception as e:
+                # Start over on the next analysis instead of reusing partial results
+                self.incremental = IncrementalAnalyzer()
+                self.results.put((generation, None, "Analysis failed", None, str(e)))
     
-    def clear_results(self):
-        """Clear the results area"""
+    def poll_results(self):
+        """Show results from the worker thread; runs on the Tk main thread"""
+        try:
+            while True:
+                generation, report, status, positions, failure = self.results.get_nowait()
+                self.in_flight -= 1
+                if generation != self.generation or status is None:
+                    continue  # the source changed after this analysis started
+                if failure:
+                    messagebox.showerror("Error", f"Analysis failed: {failure}")
+                else:
+                    self.show_report(report)
+                    self.set_error_highlights(positions)
+                self.status_var.set(status)
+        except queue.Empty:
+            pass
+        
+        if self.in_flight:
+            self.root.after(RESULT_POLL_MS, self.poll_results)
+        else:
+            self.poll_scheduled = False
+    
+    def format_report(self, errors):
+        """Build the results text for the last analysis"""
+        report = "SEMANTIC ANALYSIS RESULTS\n"
+        report += "=" * 60 + "\n\n"
+        
+        report += f"Total tokens processed: {self.incremental.token_count}\n"
+        report += f"Analysis completed.\n\n"
+        
+        if errors:
+            report += f"SEMANTIC ERRORS FOUND ({len(errors)}):\n"
+            report += "-" * 40 + "\n"
+            for i, error in enumerate(errors, 1):
+                report += f"{i}. {error}\n"
+        else:
+            report += "✓ NO SEMANTIC ERRORS FOUND!\n"
+            report += "The code passed all semantic checks.\n"
+        
+        report += "\n" + self.incremental.get_symbol_table_report()
+        return report
+    
+    def format_status(self, errors):
+        reuse = (f" ({self.incremental.reanalyzed_statements} statements re-analyzed, "
+                 f"{self.incremental.reused_statements} reused)")
+        if errors:
+            return f"Analysis complete - {len(errors)} errors found" + reuse
+        return "Analysis complete - No errors found" + reuse
+    
+    def show_report(self, report):
         self.results_text.config(state=tk.NORMAL)
         self.results_text.delete(1.0, tk.END)
+        self.results_text.insert(1.0, report)
         self.results_text.config(state=tk.DISABLED)
+    
+    def set_error_highlights(self, positions):
+        """Replace the highlighted errors with positions, a sorted list of (line, column)"""
+        self.error_positions = positions
+        self.highlighted_span = None
+        self.refresh_highlights()
+    
+    def on_source_scrolled(self, first, last):
+        """Update the scrollbar and highlight errors that scrolled into view"""
+        self.source_text.vbar.set(first, last)
+        if self.highlight_refresh is None:
+            self.highlight_refresh = self.root.after_idle(self.refresh_highlights)
+    
+    def refresh_highlights(self):
+        """Tag the errors within the viewport plus a margin, if that range changed"""
+        self.highlight_refresh = None
+        text = self.source_text
+        first_line = int(text.index("@0,0").split(".")[0]) - HIGHLIGHT_MARGIN_LINES
+        last_line = int(text.index(f"@0,{text.winfo_height()}").split(".")[0]) + HIGHLIGHT_MARGIN_LINES
+        if self.highlighted_span == (first_line, last_line):
+            return  # tags already there move with the text as it is edited
+        self.highlighted_span = (first_line, last_line)
+        
+        text.tag_remove("error", "1.0", tk.END)
+        start = bisect_left(self.error_positions, (first_line, 0))
+        end = bisect_right(self.error_positions, (last_line, sys.maxsize))
+        self.highlight_pass += 1
+        self.apply_highlights(self.highlight_pass, start, end)
+    
+    def apply_highlights(self, highlight_pass, start, end):
+        """Tag error_positions[start:end], one tag_add call per HIGHLIGHT_BATCH errors"""
+        if highlight_pass != self.highlight_pass:
+            return  # the errors or the viewport changed since this pass started
+        stop = min(end, start + HIGHLIGHT_BATCH)
+        ranges = []
+        for line, column in self.error_positions[start:stop]:
+            index = f"{line}.{max(column - 1, 0)}"
+            ranges += [index, f"{index} wordend"]
+        if ranges:
+            self.source_text.tag_add("error", *ranges)
+        if stop < end:
+            self.root.after(1, self.apply_highlights, highlight_pass, stop, end)
+    
+    def on_results_click(self, event):
+        """Move the source cursor to the error clicked in the results panel"""
+        position = f"@{event.x},{event.y}"
+        line = self.results_text.get(f"{position} linestart", f"{position} lineend")
+        match = ERROR_LOCATION_PATTERN.search(line)
+        if match:
+            index = f"{match.group(1)}.{max(int(match.group(2)) - 1, 0)}"
+            self.source_text.mark_set(tk.INSERT, index)
+            self.source_text.see(index)
+            self.source_text.focus_set()
+    
+    def clear_results(self):
+        """Clear the results area"""
+        self.show_report("")
+        self.set_error_highlights([])
         self.status_var.set("Results cleared")
     
     def load_example(self):
@@ -300,9 +465,11 @@ function int add(int a, int b) {
 
 HOW TO USE:
 1. Enter or load source code
-2. Click "Analyze" to perform semantic analysis
+2. Results update automatically when you stop typing,
+   or click "Analyze" to analyze right away
 3. View results in the right panel
-4. Errors will be highlighted with line numbers
+4. Errors are highlighted in the source; click an error
+   in the results to jump to it
 
 Author: Edwin Espinal
 Course: Compiladores - UTESA
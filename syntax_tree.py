@@ -0,0 +1,668 @@
+#!/usr/bin/env python3
+"""
+Árbol Sintáctico - Edwin Espinal
+Autor: Edwin Espinal
+Descripción: Analizador sintáctico descendente recursivo que construye un árbol compacto
+a partir de los tokens, y un recorrido semántico que verifica el árbol.
+"""
+
+from typing import Callable, List, Optional, Tuple
+
+from semantic_analyzer import (
+    BINARY_PRECEDENCE, BINARY_RESULT_TYPES, LITERAL_TYPES, TOKEN_LEXEMES, TYPE_KEYWORDS, DataType, Lexer, NameTable,
+    SemanticError, Symbol, SymbolTable, Token, TokenType, format_symbol_table_report, is_assignable,
+    unary_result_type,
+)
+
+
+# Every node records the line and column of its first token
+
+class Node:
+    __slots__ = ('line', 'column')
+    
+    def __init__(self, line: int, column: int):
+        self.line = line
+        self.column = column
+    
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.fields())
+        return f"{type(self).__name__}({fields})"
+    
+    @classmethod
+    def fields(cls):
+        return [name for klass in reversed(cls.__mro__) for name in getattr(klass, '__slots__', ())]
+    
+    def __eq__(self, other):
+        return type(self) is type(other) and all(getattr(self, name) == getattr(other, name)
+                                                 for name in self.fields())
+
+
+class Program(Node):
+    __slots__ = ('statements',)
+    
+    def __init__(self, statements: List[Node]):
+        super().__init__(1, 1)
+        self.statements = statements
+
+
+class Block(Node):
+    __slots__ = ('statements',)
+    
+    def __init__(self, line: int, column: int, statements: List[Node]):
+        super().__init__(line, column)
+        self.statements = statements
+
+
+class VarDeclaration(Node):
+    """var type name [= initializer];  positioned at the name"""
+    __slots__ = ('data_type', 'name', 'initializer', 'end_line', 'end_column')
+    
+    def __init__(self, line: int, column: int, data_type: DataType, name: str,
+                 initializer: Optional[Node], end_line: int, end_column: int):
+        super().__init__(line, column)
+        self.data_type = data_type
+        self.name = name
+        self.initializer = initializer
+        self.end_line = end_line            # the closing ';'
+        self.end_column = end_column
+
+
+class Assignment(Node):
+    """name = value;  positioned at the name"""
+    __slots__ = ('name', 'value')
+    
+    def __init__(self, line: int, column: int, name: str, value: Node):
+        super().__init__(line, column)
+        self.name = name
+        self.value = value
+
+
+class FunctionDeclaration(Node):
+    """function type name(parameters) body;  positioned at the name"""
+    __slots__ = ('return_type', 'name', 'parameters', 'body')
+    
+    def __init__(self, line: int, column: int, return_type: DataType, name: str,
+                 parameters: List['Parameter'], body: Block):
+        super().__init__(line, column)
+        self.return_type = return_type
+        self.name = name
+        self.parameters = parameters
+        self.body = body
+
+
+class Parameter(Node):
+    __slots__ = ('data_type', 'name')
+    
+    def __init__(self, line: int, column: int, data_type: DataType, name: str):
+        super().__init__(line, column)
+        self.data_type = data_type
+        self.name = name
+
+
+class If(Node):
+    __slots__ = ('condition', 'then_branch', 'else_branch')
+    
+    def __init__(self, line: int, column: int, condition: Node, then_branch: Node, else_branch: Optional[Node]):
+        super().__init__(line, column)
+        self.condition = condition
+        self.then_branch = then_branch
+        self.else_branch = else_branch
+
+
+class While(Node):
+    __slots__ = ('condition', 'body')
+    
+    def __init__(self, line: int, column: int, condition: Node, body: Node):
+        super().__init__(line, column)
+        self.condition = condition
+        self.body = body
+
+
+class Return(Node):
+    __slots__ = ('value',)
+    
+    def __init__(self, line: int, column: int, value: Optional[Node]):
+        super().__init__(line, column)
+        self.value = value
+
+
+class ExpressionStatement(Node):
+    __slots__ = ('expression',)
+    
+    def __init__(self, line: int, column: int, expression: Node):
+        super().__init__(line, column)
+        self.expression = expression
+
+
+class Invalid(Node):
+    """A statement that could not be parsed; keeps its syntax error in source order"""
+    __slots__ = ('message',)
+    
+    def __init__(self, line: int, column: int, message: str):
+        super().__init__(line, column)
+        self.message = message
+
+
+class Literal(Node):
+    __slots__ = ('data_type', 'value')
+    
+    def __init__(self, line: int, column: int, data_type: DataType, value: str):
+        super().__init__(line, column)
+        self.data_type = data_type
+        self.value = value
+
+
+class Name(Node):
+    __slots__ = ('name',)
+    
+    def __init__(self, line: int, column: int, name: str):
+        super().__init__(line, column)
+        self.name = name
+
+
+class Parenthesized(Node):
+    __slots__ = ('expression',)
+    
+    def __init__(self, line: int, column: int, expression: Node):
+        super().__init__(line, column)
+        self.expression = expression
+
+
+class Unary(Node):
+    __slots__ = ('operator', 'operand')
+    
+    def __init__(self, line: int, column: int, operator: TokenType, operand: Node):
+        super().__init__(line, column)
+        self.operator = operator
+        self.operand = operand
+
+
+class Binary(Node):
+    """left operator right;  positioned at the left operand, with the operator's own position"""
+    __slots__ = ('operator', 'left', 'right', 'operator_line', 'operator_column')
+    
+    def __init__(self, line: int, column: int, operator: TokenType, left: Node, right: Node,
+                 operator_line: int, operator_column: int):
+        super().__init__(line, column)
+        self.operator = operator
+        self.left = left
+        self.right = right
+        self.operator_line = operator_line
+        self.operator_column = operator_column
+
+
+class Call(Node):
+    __slots__ = ('name', 'arguments')
+    
+    def __init__(self, line: int, column: int, name: str, arguments: List[Node]):
+        super().__init__(line, column)
+        self.name = name
+        self.arguments = arguments
+
+
+# Tokens that can only begin a statement, where error recovery resumes
+STATEMENT_KEYWORDS = frozenset([TokenType.VAR, TokenType.FUNCTION, TokenType.IF, TokenType.WHILE,
+                                TokenType.RETURN])
+
+
+class ParseError(Exception):
+    def __init__(self, message: str, token: Token):
+        super().__init__(message)
+        self.message = message
+        self.token = token
+
+
+def describe(token: Token) -> str:
+    return "end of file" if token.type == TokenType.EOF else f"'{token.value}'"
+
+
+class Parser:
+    """Recursive-descent parser from tokens to a Program tree.
+    
+    A statement that fails to parse becomes an Invalid node and parsing
+    resumes at the next ';', '}' or statement keyword, so one mistake yields
+    one error.
+    """
+    
+    def __init__(self, tokens):
+        self.tokens = list(tokens)
+        if not self.tokens or self.tokens[-1].type != TokenType.EOF:
+            last = self.tokens[-1] if self.tokens else Token(TokenType.EOF, '', 0)
+            self.tokens.append(Token(TokenType.EOF, '', last.offset + len(last.value), last.lines))
+        self.position = 0
+    
+    def current_token(self) -> Token:
+        return self.tokens[self.position]
+    
+    def peek_token(self) -> Token:
+        return self.tokens[min(self.position + 1, len(self.tokens) - 1)]
+    
+    def advance(self) -> Token:
+        token = self.tokens[self.position]
+        if token.type != TokenType.EOF:
+            self.position += 1
+        return token
+    
+    def expect(self, token_type: TokenType, expected: str) -> Token:
+        token = self.current_token()
+        if token.type != token_type:
+            raise ParseError(f"Expected {expected}, got {describe(token)}", token)
+        return self.advance()
+    
+    def parse(self) -> Program:
+        statements = []
+        while self.current_token().type != TokenType.EOF:
+            statement = self.parse_statement()
+            if statement is not None:
+                statements.append(statement)
+        return Program(statements)
+    
+    def parse_statement(self) -> Optional[Node]:
+        """Parse one statement, or return an Invalid node after skipping past a syntax error"""
+        start = self.position
+        try:
+            return self.parse_statement_body()
+        except ParseError as error:
+            self.synchronize(start)
+            return Invalid(error.token.line, error.token.column, error.message)
+        except RecursionError:
+            token = self.tokens[start]
+            self.synchronize(start)
+            return Invalid(token.line, token.column, "Statement nested too deeply")
+    
+    def synchronize(self, start: int):
+        """Skip to a likely statement boundary, always moving past the statement's first token"""
+        if self.position == start:
+            self.advance()
+        while True:
+            token_type = self.current_token().type
+            if token_type == TokenType.SEMICOLON:
+                self.advance()
+                return
+            if token_type in (TokenType.RBRACE, TokenType.EOF) or token_type in STATEMENT_KEYWORDS:
+                return
+            self.advance()
+    
+    def parse_statement_body(self) -> Optional[Node]:
+        token = self.current_token()
+        token_type = token.type
+        
+        if token_type == TokenType.VAR:
+            return self.parse_variable_declaration()
+        if token_type == TokenType.FUNCTION:
+            return self.parse_function_declaration()
+        if token_type == TokenType.IDENTIFIER and self.peek_token().type == TokenType.ASSIGN:
+            return self.parse_assignment()
+        if token_type == TokenType.IF:
+            return self.parse_if_statement()
+        if token_type == TokenType.WHILE:
+            return self.parse_while_statement()
+        if token_type == TokenType.RETURN:
+            self.advance()
+            value = None if self.current_token().type == TokenType.SEMICOLON else self.parse_expression()
+            self.expect(TokenType.SEMICOLON, "';'")
+            return Return(token.line, token.column, value)
+        if token_type == TokenType.LBRACE:
+            return self.parse_block()
+        if token_type == TokenType.SEMICOLON:
+            self.advance()  # Empty statement
+            return None
+        
+        expression = self.parse_expression()
+        self.expect(TokenType.SEMICOLON, "';'")
+        return ExpressionStatement(token.line, token.column, expression)
+    
+    def parse_type(self, expected: str) -> DataType:
+        token = self.current_token()
+        data_type = TYPE_KEYWORDS.get(token.type)
+        if data_type is None:
+            raise ParseError(f"Expected {expected}, got '{token.value}'", token)
+        self.advance()
+        return data_type
+    
+    def parse_variable_declaration(self) -> VarDeclaration:
+        self.advance()  # Skip 'var'
+        data_type = self.parse_type("type")
+        name = self.current_token()
+        if name.type != TokenType.IDENTIFIER:
+            raise ParseError(f"Expected identifier, got '{name.value}'", name)
+        self.advance()
+        
+        initializer = None
+        if self.current_token().type == TokenType.ASSIGN:
+            self.advance()
+            initializer = self.parse_expression()
+        end = self.expect(TokenType.SEMICOLON, "';'")
+        return VarDeclaration(name.line, name.column, data_type, name.value, initializer, end.line, end.column)
+    
+    def parse_function_declaration(self) -> FunctionDeclaration:
+        self.advance()  # Skip 'function'
+        return_type = self.parse_type("return type")
+        name = self.current_token()
+        if name.type != TokenType.IDENTIFIER:
+            raise ParseError(f"Expected function name, got '{name.value}'", name)
+        self.advance()
+        
+        self.expect(TokenType.LPAREN, "'('")
+        parameters = []
+        if self.current_token().type != TokenType.RPAREN:
+            while True:
+                data_type = self.parse_type("parameter type")
+                parameter = self.expect(TokenType.IDENTIFIER, "parameter name")
+                parameters.append(Parameter(parameter.line, parameter.column, data_type, parameter.value))
+                if self.current_token().type != TokenType.COMMA:
+                    break
+                self.advance()
+        self.expect(TokenType.RPAREN, "')'")
+        
+        if self.current_token().type != TokenType.LBRACE:
+            raise ParseError(f"Expected '{{', got {describe(self.current_token())}", self.current_token())
+        body = self.parse_block()
+        return FunctionDeclaration(name.line, name.column, return_type, name.value, parameters, body)
+    
+    def parse_assignment(self) -> Assignment:
+        name = self.advance()
+        self.advance()  # Skip '='
+        value = self.parse_expression()
+        self.expect(TokenType.SEMICOLON, "';'")
+        return Assignment(name.line, name.column, name.value, value)
+    
+    def parse_condition(self) -> Node:
+        self.expect(TokenType.LPAREN, "'('")
+        condition = self.parse_expression()
+        self.expect(TokenType.RPAREN, "')'")
+        return condition
+    
+    def parse_if_statement(self) -> If:
+        token = self.advance()
+        condition = self.parse_condition()
+        then_branch = self.parse_branch()
+        else_branch = None
+        if self.current_token().type == TokenType.ELSE:
+            self.advance()
+            else_branch = self.parse_branch()
+        return If(token.line, token.column, condition, then_branch, else_branch)
+    
+    def parse_while_statement(self) -> While:
+        token = self.advance()
+        condition = self.parse_condition()
+        return While(token.line, token.column, condition, self.parse_branch())
+    
+    def parse_branch(self) -> Node:
+        """The body of an if, else or while: a block or a single statement"""
+        token = self.current_token()
+        if token.type == TokenType.EOF:
+            raise ParseError("Expected statement, got end of file", token)
+        statement = self.parse_statement()
+        return statement if statement is not None else Block(token.line, token.column, [])
+    
+    def parse_block(self) -> Block:
+        brace = self.advance()
+        statements = []
+        while self.current_token().type not in (TokenType.RBRACE, TokenType.EOF):
+            statement = self.parse_statement()
+            if statement is not None:
+                statements.append(statement)
+        if self.current_token().type == TokenType.EOF:
+            statements.append(Invalid(self.current_token().line, self.current_token().column,
+                                      "Expected '}', got end of file"))
+        else:
+            self.advance()
+        return Block(brace.line, brace.column, statements)
+    
+    def parse_expression(self, min_precedence: int = 1) -> Node:
+        """Precedence climbing over BINARY_PRECEDENCE"""
+        left = self.parse_unary()
+        while True:
+            operator = self.current_token()
+            precedence = BINARY_PRECEDENCE.get(operator.type)
+            if precedence is None or precedence < min_precedence:
+                return left
+            self.advance()
+            right = self.parse_expression(precedence + 1)
+            left = Binary(left.line, left.column, operator.type, left, right, operator.line, operator.column)
+    
+    def parse_unary(self) -> Node:
+        token = self.current_token()
+        if token.type in (TokenType.NOT, TokenType.MINUS):
+            self.advance()
+            return Unary(token.line, token.column, token.type, self.parse_unary())
+        return self.parse_primary()
+    
+    def parse_primary(self) -> Node:
+        token = self.current_token()
+        token_type = token.type
+        
+        literal_type = LITERAL_TYPES.get(token_type)
+        if literal_type is not None:
+            self.advance()
+            return Literal(token.line, token.column, literal_type, token.value)
+        
+        if token_type == TokenType.IDENTIFIER:
+            self.advance()
+            if self.current_token().type != TokenType.LPAREN:
+                return Name(token.line, token.column, token.value)
+            self.advance()
+            arguments = []
+            if self.current_token().type != TokenType.RPAREN:
+                arguments.append(self.parse_expression())
+                while self.current_token().type == TokenType.COMMA:
+                    self.advance()
+                    arguments.append(self.parse_expression())
+            self.expect(TokenType.RPAREN, "')'")
+            return Call(token.line, token.column, token.value, arguments)
+        
+        if token_type == TokenType.LPAREN:
+            self.advance()
+            expression = self.parse_expression()
+            self.expect(TokenType.RPAREN, "')'")
+            return Parenthesized(token.line, token.column, expression)
+        
+        raise ParseError(f"Expected expression, got {describe(token)}", token)
+
+
+class TreeAnalyzer:
+    """Semantic pass over a Program tree.
+    
+    Applies the same checks as SemanticAnalyzer, with the same messages and
+    positions, so both agree on well-formed programs. Syntax errors kept in
+    Invalid nodes are reported in source order along with them.
+    """
+    
+    def __init__(self, program: Program, symbol_table: Optional[SymbolTable] = None):
+        self.program = program
+        self.symbol_table = symbol_table if symbol_table is not None else SymbolTable()
+        self.errors: List[SemanticError] = []
+        # Called with each error as it is found, instead of keeping it in errors
+        self.error_sink: Optional[Callable[[SemanticError], None]] = None
+        self.error_count = 0
+        self.current_function_return_type: Optional[DataType] = None
+        self.statement_handlers = {
+            VarDeclaration: self.analyze_variable_declaration,
+            Assignment: self.analyze_assignment,
+            FunctionDeclaration: self.analyze_function_declaration,
+            Block: self.analyze_block,
+            If: self.analyze_if_statement,
+            While: self.analyze_while_statement,
+            Return: self.analyze_return_statement,
+            ExpressionStatement: self.analyze_expression_statement,
+            Invalid: self.report_invalid,
+        }
+    
+    def add_error(self, message: str, line: int, column: int):
+        self.error_count += 1
+        if self.error_sink is not None:
+            self.error_sink(SemanticError(message, line, column))
+        else:
+            self.errors.append(SemanticError(message, line, column))
+    
+    def analyze(self) -> List[SemanticError]:
+        """Main analysis method"""
+        for statement in self.program.statements:
+            self.analyze_statement(statement)
+        return self.errors
+    
+    def analyze_statement(self, statement: Node):
+        self.statement_handlers[type(statement)](statement)
+    
+    def get_expression_type(self, expression: Node) -> DataType:
+        """Infer the type of an expression, reporting undefined names and invalid operands"""
+        if isinstance(expression, Literal):
+            return expression.data_type
+        if isinstance(expression, (Name, Call)):
+            symbol = self.symbol_table.lookup_symbol(expression.name)
+            if not symbol:
+                self.add_error(f"Undefined variable '{expression.name}'", expression.line, expression.column)
+            if isinstance(expression, Call):
+                argument_types = [self.get_expression_type(argument) for argument in expression.arguments]
+                if symbol:
+                    self.check_call(expression, symbol, argument_types)
+            return symbol.data_type if symbol else DataType.UNKNOWN
+        if isinstance(expression, Parenthesized):
+            return self.get_expression_type(expression.expression)
+        if isinstance(expression, Unary):
+            operand = self.get_expression_type(expression.operand)
+            result = unary_result_type(expression.operator, operand)
+            if result is None:
+                self.add_error(f"Invalid operand for '{TOKEN_LEXEMES[expression.operator]}': {operand.value}",
+                               expression.line, expression.column)
+                return DataType.UNKNOWN
+            return result
+        if isinstance(expression, Binary):
+            # Chains like a + b + c nest to the left as deep as they are long, so walk that side iteratively
+            chain = []
+            while isinstance(expression, Binary):
+                chain.append(expression)
+                expression = expression.left
+            left = self.get_expression_type(expression)
+            for binary in reversed(chain):
+                right = self.get_expression_type(binary.right)
+                result = BINARY_RESULT_TYPES[binary.operator, left, right]
+                if result is None:
+                    self.add_error(f"Invalid operands for '{TOKEN_LEXEMES[binary.operator]}': "
+                                   f"{left.value} and {right.value}", binary.operator_line, binary.operator_column)
+                    result = DataType.UNKNOWN
+                left = result
+            return left
+        return DataType.UNKNOWN
+    
+    def check_call(self, call: Call, symbol: Symbol, argument_types: List[DataType]):
+        if not symbol.is_function:
+            self.add_error(f"'{symbol.name}' is not a function", call.line, call.column)
+            return
+        parameters = symbol.parameters or []
+        if len(argument_types) != len(parameters):
+            self.add_error(f"Function '{symbol.name}' expects {len(parameters)} argument(s), got {len(argument_types)}",
+                           call.line, call.column)
+            return
+        for number, (argument, argument_type, (_, parameter_type)) in enumerate(
+                zip(call.arguments, argument_types, parameters), 1):
+            if not is_assignable(parameter_type, argument_type):
+                self.add_error(f"Argument {number} of '{symbol.name}': cannot pass {argument_type.value} "
+                               f"as {parameter_type.value}", argument.line, argument.column)
+    
+    def check_assignable(self, target_type: DataType, expression: Node):
+        expr_type = self.get_expression_type(expression)
+        if not is_assignable(target_type, expr_type):
+            self.add_error(f"Type mismatch: cannot assign {expr_type.value} to {target_type.value}",
+                           expression.line, expression.column)
+    
+    def analyze_variable_declaration(self, declaration: VarDeclaration):
+        symbol = Symbol(declaration.name, declaration.data_type, declaration.line, declaration.column)
+        if declaration.initializer is not None:
+            self.check_assignable(declaration.data_type, declaration.initializer)
+            symbol.is_initialized = True
+        
+        if not self.symbol_table.declare_symbol(symbol):
+            self.add_error(f"Variable '{declaration.name}' already declared in current scope",
+                           declaration.end_line, declaration.end_column)
+    
+    def analyze_assignment(self, assignment: Assignment):
+        symbol = self.symbol_table.lookup_symbol(assignment.name)
+        if not symbol:
+            self.add_error(f"Undefined variable '{assignment.name}'", assignment.line, assignment.column)
+            return
+        self.check_assignable(symbol.data_type, assignment.value)
+        symbol.is_initialized = True
+    
+    def analyze_function_declaration(self, function: FunctionDeclaration):
+        symbol = Symbol(function.name, function.return_type, function.line, function.column,
+                        is_function=True, return_type=function.return_type,
+                        parameters=[(parameter.name, parameter.data_type) for parameter in function.parameters])
+        # Declared before the body, so it can call itself
+        if not self.symbol_table.declare_symbol(symbol):
+            self.add_error(f"Function '{function.name}' already declared", function.line, function.column)
+        
+        self.symbol_table.enter_scope()
+        outer_return_type = self.current_function_return_type
+        self.current_function_return_type = function.return_type
+        for parameter in function.parameters:
+            if not self.symbol_table.declare_symbol(Symbol(parameter.name, parameter.data_type, parameter.line,
+                                                           parameter.column, is_initialized=True)):
+                self.add_error(f"Parameter '{parameter.name}' already declared", parameter.line, parameter.column)
+        self.analyze_block(function.body)
+        self.current_function_return_type = outer_return_type
+        self.symbol_table.exit_scope()
+    
+    def analyze_return_statement(self, statement: Return):
+        return_type = self.current_function_return_type
+        if return_type is None:
+            self.add_error("Return statement outside of function", statement.line, statement.column)
+            if statement.value is not None:
+                self.get_expression_type(statement.value)
+        elif statement.value is None:
+            self.add_error(f"Missing return value in function returning {return_type.value}",
+                           statement.line, statement.column)
+        else:
+            expr_type = self.get_expression_type(statement.value)
+            if not is_assignable(return_type, expr_type):
+                self.add_error(f"Type mismatch: cannot return {expr_type.value} from function returning "
+                               f"{return_type.value}", statement.value.line, statement.value.column)
+    
+    def analyze_expression_statement(self, statement: ExpressionStatement):
+        self.get_expression_type(statement.expression)
+    
+    def analyze_block(self, block: Block):
+        self.symbol_table.enter_scope()
+        for statement in block.statements:
+            self.analyze_statement(statement)
+        self.symbol_table.exit_scope()
+    
+    def analyze_if_statement(self, statement: If):
+        self.analyze_statement(statement.then_branch)
+        if statement.else_branch is not None:
+            self.analyze_statement(statement.else_branch)
+    
+    def analyze_while_statement(self, statement: While):
+        self.analyze_statement(statement.body)
+    
+    def report_invalid(self, statement: Invalid):
+        self.add_error(statement.message, statement.line, statement.column)
+    
+    def get_symbol_table_report(self) -> str:
+        """Generate symbol table report"""
+        return format_symbol_table_report(self.symbol_table.get_current_scope_symbols())
+
+
+def parse_and_analyze(tokens, symbol_table: Optional[SymbolTable] = None,
+                      error_sink: Optional[Callable[[SemanticError], None]] = None) -> Tuple[Program, TreeAnalyzer]:
+    """Build the tree for tokens and run the semantic pass over it, sending errors to error_sink if given"""
+    program = Parser(tokens).parse()
+    analyzer = TreeAnalyzer(program, symbol_table)
+    analyzer.error_sink = error_sink
+    analyzer.analyze()
+    return program, analyzer
+
+
+def analyze_source(source, engine: str = 'char',
+                   error_sink: Optional[Callable[[SemanticError], None]] = None) -> Tuple[int, Program, TreeAnalyzer]:
+    """Lex, parse and analyze source (str, or ASCII bytes as from map_source_file).
+    
+    Returns the token count, the tree and the analyzer holding its results.
+    Errors go to error_sink instead of the analyzer when it is given.
+    """
+    if not isinstance(source, str):
+        engine = 'regex'
+    tokens = Lexer(source, engine=engine, names=NameTable()).tokenize()
+    program, analyzer = parse_and_analyze(tokens, error_sink=error_sink)
+    return len(tokens), program, analyzer
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Caché Binaria de Tokens - Edwin Espinal
+Autor: Edwin Espinal
+Descripción: Guarda los tokens y la tabla de símbolos global de un archivo en un formato
+binario compacto que otras herramientas pueden mapear en memoria sin volver a tokenizar.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, Optional
+
+from semantic_analyzer import ANALYZER_VERSION, DataType, Symbol
+
+
+MAGIC = b"TOKCACHE"
+FORMAT_VERSION = 2
+
+# magic, format version, byte order, analyzer version, SHA-256 of the source,
+# token count, symbol count, parameter count, string pool size
+HEADER = struct.Struct('<8sHH16s32sIIII')
+# name offset, name length, line, column, data type, return type, flags,
+# first parameter, parameter count (-1 when the symbol has no parameter list)
+SYMBOL_RECORD = struct.Struct('<IIiiBBBxii')
+# name offset, name length, data type
+PARAMETER_RECORD = struct.Struct('<IIB3x')
+
+SYMBOL_IS_FUNCTION = 1
+SYMBOL_IS_INITIALIZED = 2
+
+DATA_TYPES = list(DataType)
+DATA_TYPE_IDS = {data_type.value: index for index, data_type in enumerate(DATA_TYPES)}
+
+LITTLE_ENDIAN = 0
+BIG_ENDIAN = 1
+BYTE_ORDER = LITTLE_ENDIAN if sys.byteorder == 'little' else BIG_ENDIAN
+
+
+def source_digest(source) -> bytes:
+    """SHA-256 of a source given as str or bytes-like"""
+    return hashlib.sha256(source.encode('utf-8') if isinstance(source, str) else source).digest()
+
+
+def padding(size: int) -> bytes:
+    """Zero bytes that bring size to a multiple of 4, so every column stays aligned"""
+    return b'\0' * (-size % 4)
+
+
+def expected_size(header: tuple) -> int:
+    """Size in bytes of a cache file with the given header"""
+    *_, token_count, symbol_count, parameter_count, strings_size = header
+    types_size = 2 * token_count + len(padding(2 * token_count))
+    return (HEADER.size + types_size + 8 * token_count + SYMBOL_RECORD.size * symbol_count +
+            PARAMETER_RECORD.size * parameter_count + strings_size)
+
+
+def write_token_cache(path: str, source, tokens, symbols: Dict[str, Symbol]):
+    """Write the columns of a TokenBuffer for source and its global symbols to path.
+    
+    The file is a header followed by the token columns stored as-is (type ids,
+    value starts and ends), fixed-width symbol and parameter records, and a
+    pool of UTF-8 names. Lines are not stored: they are found again in the
+    source, which readers need anyway for token values. Columns are in native
+    byte order; readers on a machine with the other order treat the file as
+    stale.
+    """
+    strings = bytearray()
+    symbol_records = bytearray()
+    parameter_records = bytearray()
+    parameter_count = 0
+    
+    def add_string(text: str):
+        data = text.encode('utf-8')
+        strings.extend(data)
+        return len(strings) - len(data), len(data)
+    
+    for symbol in symbols.values():
+        flags = ((SYMBOL_IS_FUNCTION if symbol.is_function else 0) |
+                 (SYMBOL_IS_INITIALIZED if symbol.is_initialized else 0))
+        parameters = symbol.parameters
+        symbol_records += SYMBOL_RECORD.pack(*add_string(symbol.name), symbol.line, symbol.column,
+                                             DATA_TYPE_IDS[symbol.data_type.value],
+                                             DATA_TYPE_IDS[symbol.return_type.value], flags,
+                                             parameter_count, -1 if parameters is None else len(parameters))
+        for name, data_type in parameters or ():
+            parameter_records += PARAMETER_RECORD.pack(*add_string(name), DATA_TYPE_IDS[data_type.value])
+            parameter_count += 1
+    
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, BYTE_ORDER, ANALYZER_VERSION.encode('ascii'),
+                         source_digest(source), len(tokens), len(symbols), parameter_count, len(strings))
+    
+    temporary = f"{path}.tmp"
+    with open(temporary, 'wb') as f:
+        f.write(header)
+        f.write(tokens.types)
+        f.write(padding(tokens.types.itemsize * len(tokens)))
+        for column in (tokens.starts, tokens.ends):
+            f.write(column)
+        f.write(symbol_records)
+        f.write(parameter_records)
+        f.write(strings)
+    os.replace(temporary, path)
+
+
+class TokenCache:
+    """A token cache file mapped into memory.
+    
+    The token columns are memoryviews over the mapping, so loading creates no
+    per-token objects; pass them to TokenBuffer.from_columns together with the
+    source text to get a token sequence for SemanticAnalyzer. Symbols are
+    decoded only when symbols() is called.
+    """
+    
+    def __init__(self, mapped: mmap.mmap, header: tuple):
+        self.mapped = mapped
+        _, _, _, _, self.digest, self.token_count, self.symbol_count, self.parameter_count, _ = header
+        
+        count = self.token_count
+        view = memoryview(mapped)
+        offset = HEADER.size
+        self.types = view[offset:offset + 2 * count].cast('H')
+        offset += 2 * count + len(padding(2 * count))
+        self.starts, self.ends = (
+            view[offset + 4 * count * index:offset + 4 * count * (index + 1)].cast('i') for index in range(2))
+        offset += 8 * count
+        
+        self.symbols_offset = offset
+        self.parameters_offset = offset + SYMBOL_RECORD.size * self.symbol_count
+        self.strings_offset = self.parameters_offset + PARAMETER_RECORD.size * self.parameter_count
+        self.views = [view, self.types, self.starts, self.ends]
+    
+    def string_at(self, offset: int, length: int) -> str:
+        start = self.strings_offset + offset
+        return self.mapped[start:start + length].decode('utf-8')
+    
+    def symbols(self) -> Dict[str, Symbol]:
+        """Decode the global scope symbols stored with the tokens"""
+        symbols = {}
+        parameter_records = list(PARAMETER_RECORD.iter_unpack(
+            self.mapped[self.parameters_offset:self.strings_offset]))
+        for (name_offset, name_length, line, column, data_type, return_type, flags,
+             first_parameter, parameter_count) in SYMBOL_RECORD.iter_unpack(
+                self.mapped[self.symbols_offset:self.parameters_offset]):
+            parameters = None
+            if parameter_count >= 0:
+                parameters = [(self.string_at(offset, length), DATA_TYPES[parameter_type])
+                              for offset, length, parameter_type
+                              in parameter_records[first_parameter:first_parameter + parameter_count]]
+            name = self.string_at(name_offset, name_length)
+            symbols[name] = Symbol(name, DATA_TYPES[data_type], line, column,
+                                   is_function=bool(flags & SYMBOL_IS_FUNCTION),
+                                   parameters=parameters,
+                                   return_type=DATA_TYPES[return_type],
+                                   is_initialized=bool(flags & SYMBOL_IS_INITIALIZED))
+        return symbols
+    
+    def matches(self, source) -> bool:
+        """Whether the cache was written for this exact source"""
+        return self.digest == source_digest(source)
+    
+    def close(self):
+        # The mapping can only be closed once nothing exports its buffer
+        for view in reversed(self.views):
+            view.release()
+        self.mapped.close()
+
+
+def load_token_cache(path: str, source=None) -> Optional[TokenCache]:
+    """Map a token cache written by write_token_cache.
+    
+    Returns None if the file is missing or unreadable, was written by another
+    analyzer version or on a machine with a different byte order, or (when
+    source is given) was written for a different source. Close the cache
+    once the token columns are no longer used.
+    """
+    try:
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    
+    if len(mapped) < HEADER.size:
+        mapped.close()
+        return None
+    header = HEADER.unpack_from(mapped)
+    magic, format_version, byte_order, version = header[:4]
+    if (magic != MAGIC or format_version != FORMAT_VERSION or byte_order != BYTE_ORDER
+            or version.rstrip(b'\0') != ANALYZER_VERSION.encode('ascii')
+            or expected_size(header) != len(mapped)):
+        mapped.close()
+        return None
+    
+    cache = TokenCache(mapped, header)
+    
+    if source is not None and not cache.matches(source):
+        cache.close()
+        return None
+    return cache